@@ -0,0 +1,217 @@
+"""
+Tests for accepting bookings from concurrent requests.
+
+Accepts of the same thing are serialized by a row lock on the thing, while accepts of different
+things run in parallel. The lock tests check this directly. The benchmark accepts many bookings
+from several threads and prints the throughput. It is slow and its output depends on the
+machine, so it only runs when the THINGBOOKER_BENCHMARK environment variable is set.
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import OperationalError, connection, transaction
+from django.test import TransactionTestCase
+
+from tests.utils import BASE_TIME, create_booking, create_thing, create_user
+from thingbooker.things.enums import BookingStatusEnum
+from thingbooker.things.interface import ThingInterface
+from thingbooker.things.models import Booking
+
+THREADS = 8
+# pairs of overlapping bookings, so half of the accepts conflict
+PAIRS = 100
+# how long the lock tests let an accept wait for a row lock
+LOCK_TIMEOUT = "500ms"
+
+
+def start_in_thread(target, lock_timeout: str = LOCK_TIMEOUT) -> tuple[threading.Thread, list]:
+    """
+    Starts target in a thread with its own connection. The returned list gets the result or
+    the exception once the thread has finished.
+    """
+
+    outcome: list = []
+
+    def run():
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SET lock_timeout = '{lock_timeout}'")
+            outcome.append(target())
+        except Exception as error:
+            outcome.append(error)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, outcome
+
+
+def run_in_thread(target):
+    """Runs target in a thread with its own connection, returns its result or exception."""
+
+    thread, outcome = start_in_thread(target)
+    thread.join()
+    return outcome[0]
+
+
+def wait_for_lock_waiter(timeout: float = 5) -> bool:
+    """Returns True once another connection waits for a lock, or False after the timeout."""
+
+    deadline = time.monotonic() + timeout
+    with connection.cursor() as cursor:
+        while time.monotonic() < deadline:
+            # pg_locks is read live, unlike pg_stat_activity which is snapshotted per transaction
+            cursor.execute("SELECT count(*) FROM pg_locks WHERE NOT granted")
+            if cursor.fetchone()[0]:
+                return True
+            time.sleep(0.01)
+    return False
+
+
+@skipUnless(connection.vendor == "postgresql", "Needs row locks and lock_timeout")
+class AcceptLockTests(TransactionTestCase):
+    """Checks which accepts wait while another transaction holds the lock of a thing."""
+
+    def setUp(self):
+        """Creates two things, each with a waiting booking."""
+
+        user = create_user("a@b.no")
+        self.thing_a = create_thing(user, name="A")
+        self.thing_b = create_thing(user, name="B")
+        self.booking_a = create_booking(self.thing_a, user, 0, 1)
+        self.booking_b = create_booking(self.thing_b, user, 0, 1)
+
+    def accept(self, thing, booking):
+        """Returns a function that accepts the booking and returns the status code."""
+
+        return lambda: ThingInterface.accept_booking(thing, booking).code
+
+    def test_lock_only_blocks_the_same_thing(self):
+        """While thing A is locked, an accept on B finishes and an accept on A times out."""
+
+        with transaction.atomic():
+            ThingInterface.lock_thing(self.thing_a)
+
+            other_thing = run_in_thread(self.accept(self.thing_b, self.booking_b))
+            same_thing = run_in_thread(self.accept(self.thing_a, self.booking_a))
+
+        self.assertEqual(other_thing, 200)
+        self.assertIsInstance(same_thing, OperationalError)
+        self.assertIn("lock timeout", str(same_thing))
+        self.booking_a.refresh_from_db()
+        self.assertEqual(self.booking_a.status, BookingStatusEnum.WAITING)
+
+    def test_waiting_accept_continues_after_the_lock_is_released(self):
+        """An accept on A waits for the lock, and goes through once the other transaction ends."""
+
+        with transaction.atomic():
+            ThingInterface.lock_thing(self.thing_a)
+            thread, outcome = start_in_thread(
+                self.accept(self.thing_a, self.booking_a), lock_timeout="10s"
+            )
+            waiting = wait_for_lock_waiter()
+
+        thread.join()
+        self.assertTrue(waiting)
+        self.assertEqual(outcome, [200])
+
+
+@skipUnless(os.environ.get("THINGBOOKER_BENCHMARK"), "Set THINGBOOKER_BENCHMARK to run benchmarks")
+@skipUnless(connection.vendor == "postgresql", "Needs row locks and the exclusion constraint")
+class AcceptContentionBenchmark(TransactionTestCase):
+    """Accepts bookings from several threads at once and reports the throughput."""
+
+    def setUp(self):
+        """Creates the user that owns the things and makes the bookings."""
+
+        self.user = create_user("a@b.no")
+
+    def create_pairs(self, things) -> list[Booking]:
+        """Creates PAIRS pairs of overlapping waiting bookings, spread over the things."""
+
+        bookings = []
+        for i in range(PAIRS):
+            thing = things[i % len(things)]
+            start = 2 * i
+            bookings.append(create_booking(thing, self.user, start, start + 1))
+            bookings.append(create_booking(thing, self.user, start + 0.5, start + 1.5))
+        return bookings
+
+    def accept_concurrently(self, bookings: list[Booking]) -> tuple[dict[int, int], float]:
+        """Accepts the bookings from THREADS threads, returns the status codes and the time."""
+
+        work: queue.SimpleQueue[Booking] = queue.SimpleQueue()
+        for booking in bookings:
+            work.put(booking)
+        codes: dict[int, int] = {}
+        errors: list[Exception] = []
+        lock = threading.Lock()
+        start = threading.Barrier(THREADS + 1)
+
+        def accept():
+            try:
+                start.wait()
+                while True:
+                    try:
+                        booking = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    response = ThingInterface.accept_booking(
+                        booking.thing, booking, decline_overlapping=False
+                    )
+                    with lock:
+                        codes[response.code] = codes.get(response.code, 0) + 1
+            except Exception as error:
+                with lock:
+                    errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=accept) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        began = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        self.assertEqual(errors, [])
+        return codes, elapsed
+
+    def check_and_report(self, label: str, bookings: list[Booking]) -> None:
+        """Runs the accepts, checks that one booking per pair won, and prints the throughput."""
+
+        codes, elapsed = self.accept_concurrently(bookings)
+
+        self.assertEqual(codes, {200: PAIRS, 409: PAIRS})
+        accepted = Booking.objects.filter(status=BookingStatusEnum.ACCEPTED)
+        self.assertEqual(accepted.count(), PAIRS)
+        # each pair has its own hours, so each pair has exactly one accepted booking
+        self.assertEqual(
+            len({(b.start_date - BASE_TIME) // timedelta(hours=2) for b in accepted}), PAIRS
+        )
+
+        sys.stderr.write(
+            f"\n{label}: {len(bookings)} accepts from {THREADS} threads in {elapsed:.2f}s "
+            f"({len(bookings) / elapsed:.0f} accepts/s)\n"
+        )
+
+    def test_accepts_on_one_thing(self):
+        """All accepts contend for the lock of the same thing."""
+
+        thing = create_thing(self.user)
+        self.check_and_report("one thing", self.create_pairs([thing]))
+
+    def test_accepts_on_many_things(self):
+        """Accepts are spread over one thing per thread, so they do not wait for each other."""
+
+        things = [create_thing(self.user, name=f"Thing {i}") for i in range(THREADS)]
+        self.check_and_report(f"{THREADS} things", self.create_pairs(things))
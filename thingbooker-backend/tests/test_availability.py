@@ -0,0 +1,90 @@
+from django.test import TestCase
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APIClient
+
+from tests.utils import create_booking, create_thing, create_user, hours
+from thingbooker.things.enums import BookingStatusEnum
+
+ACCEPTED = BookingStatusEnum.ACCEPTED
+DECLINED = BookingStatusEnum.DECLINED
+
+
+class AvailabilityTests(TestCase):
+    """Tests for the free intervals of a thing without a capacity."""
+
+    def setUp(self):
+        """Creates a thing and a client for its owner."""
+
+        self.owner = create_user("owner@b.no")
+        self.thing = create_thing(self.owner)
+        self.url = f"/things/{self.thing.pk}/availability/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def get_free(self, start: float, end: float, **params) -> list[tuple[str, str]]:
+        """Returns the free intervals between start and end hours, as (start, end) pairs."""
+
+        response = self.client.get(
+            self.url, {"start": hours(start).isoformat(), "end": hours(end).isoformat(), **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [(interval["start"], interval["end"]) for interval in response.json()]
+
+    def assertFree(self, free: list[tuple[str, str]], expected: list[tuple[float, float]]):
+        """Asserts the free intervals are the given (start, end) hours."""
+
+        self.assertEqual(
+            [(parse_datetime(start), parse_datetime(end)) for start, end in free],
+            [(hours(start), hours(end)) for start, end in expected],
+        )
+
+    def test_without_bookings(self):
+        """The whole window is free."""
+
+        self.assertFree(self.get_free(0, 5), [(0, 5)])
+
+    def test_gaps_between_accepted_bookings(self):
+        """Overlapping and adjacent bookings leave no gap, and only accepted bookings count."""
+
+        create_booking(self.thing, self.owner, 1, 2, ACCEPTED)
+        create_booking(self.thing, self.owner, 3, 4, ACCEPTED)
+        create_booking(self.thing, self.owner, 4, 5, ACCEPTED)
+        create_booking(self.thing, self.owner, 2, 3, DECLINED)
+        create_booking(self.thing, self.owner, 5, 6)
+
+        self.assertFree(self.get_free(0, 7), [(0, 1), (2, 3), (5, 7)])
+
+    def test_bookings_across_the_window(self):
+        """Bookings that start before or end after the window are cut off by it."""
+
+        create_booking(self.thing, self.owner, 0, 2, ACCEPTED)
+        create_booking(self.thing, self.owner, 4, 6, ACCEPTED)
+
+        self.assertFree(self.get_free(1, 5), [(2, 4)])
+
+    def test_min_duration(self):
+        """Intervals shorter than min_duration are left out."""
+
+        create_booking(self.thing, self.owner, 1, 3, ACCEPTED)
+
+        self.assertFree(self.get_free(0, 5, min_duration="01:30:00"), [(3, 5)])
+
+    def test_end_must_be_after_start(self):
+        """A window that ends before it starts is rejected."""
+
+        response = self.client.get(
+            self.url, {"start": hours(2).isoformat(), "end": hours(1).isoformat()}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_not_visible_to_other_users(self):
+        """Users who are not members of the thing cannot see its availability."""
+
+        self.client.force_authenticate(create_user("other@b.no"))
+
+        response = self.client.get(
+            self.url, {"start": hours(0).isoformat(), "end": hours(1).isoformat()}
+        )
+
+        self.assertEqual(response.status_code, 404)
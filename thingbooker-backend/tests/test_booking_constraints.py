@@ -0,0 +1,47 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from tests.utils import create_booking, create_thing, create_user
+from thingbooker.things.enums import BookingStatusEnum
+
+ACCEPTED = BookingStatusEnum.ACCEPTED
+
+
+class BookingExclusionConstraintTests(TestCase):
+    """Tests for the constraint against overlapping accepted bookings of a thing."""
+
+    def setUp(self):
+        """Creates a thing with one accepted booking from hour 0 to 2."""
+
+        self.user = create_user("a@b.no")
+        self.thing = create_thing(self.user)
+        create_booking(self.thing, self.user, 0, 2, ACCEPTED)
+
+    def test_rejects_overlapping_accepted_booking(self):
+        """A second accepted booking that overlaps violates the constraint."""
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            create_booking(self.thing, self.user, 1, 3, ACCEPTED)
+
+    def test_allows_adjacent_booking(self):
+        """The periods are half-open, so a booking may start when another ends."""
+
+        create_booking(self.thing, self.user, 2, 4, ACCEPTED)
+
+    def test_allows_overlapping_waiting_and_declined_bookings(self):
+        """Only accepted bookings are covered."""
+
+        create_booking(self.thing, self.user, 1, 3, BookingStatusEnum.WAITING)
+        create_booking(self.thing, self.user, 1, 3, BookingStatusEnum.DECLINED)
+
+    def test_allows_overlap_on_other_things(self):
+        """Bookings of different things never conflict."""
+
+        create_booking(create_thing(self.user, name="Car"), self.user, 1, 3, ACCEPTED)
+
+    def test_allows_overlap_on_shared_things(self):
+        """Accepted bookings of a thing with a capacity may overlap."""
+
+        thing = create_thing(self.user, name="Cabin", capacity=4)
+        create_booking(thing, self.user, 0, 2, ACCEPTED)
+        create_booking(thing, self.user, 1, 3, ACCEPTED)
@@ -0,0 +1,201 @@
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.utils import BASE_TIME, create_booking, create_thing, create_user, hours
+from thingbooker.things.enums import BookingStatusEnum
+from thingbooker.things.models import Thing
+from thingbooker.things.pagination import BookingCursorPagination
+
+
+class BookingPaginationTests(TestCase):
+    """Tests for the cursor pagination and time window filter of the booking listings."""
+
+    def setUp(self):
+        """Creates a thing with waiting bookings from hour 0 to 10, and one declined booking."""
+
+        self.owner = create_user("owner@b.no")
+        self.thing = create_thing(self.owner)
+        self.bookings = [create_booking(self.thing, self.owner, i, i + 2) for i in range(10)]
+        self.declined = create_booking(
+            self.thing, self.owner, 3, 4, status=BookingStatusEnum.DECLINED
+        )
+        # the order of the listings, by start date and then id
+        self.listed = [
+            str(booking.id)
+            for booking in sorted(
+                [*self.bookings, self.declined], key=lambda b: (b.start_date, b.id)
+            )
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def get_all_pages(self, url: str, params: dict) -> tuple[list[str], int]:
+        """Follows the next links from the first page, returns the ids and the number of pages."""
+
+        ids: list[str] = []
+        pages = 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            ids.extend(booking["id"] for booking in data["results"])
+            pages += 1
+            if not data["next"]:
+                return ids, pages
+            response = self.client.get(data["next"])
+
+    def test_pages_are_in_start_order_without_gaps(self):
+        """Walking the pages gives every booking once, ordered by start date."""
+
+        ids, pages = self.get_all_pages("/bookings/", {"page_size": 3})
+
+        self.assertEqual(ids, self.listed)
+        self.assertEqual(pages, 4)
+
+    def test_new_bookings_do_not_shift_the_next_page(self):
+        """A booking created before the cursor is not repeated or skipped on the next page."""
+
+        first = self.client.get("/bookings/", {"page_size": 5}).json()
+        create_booking(self.thing, self.owner, -1, 0)
+        second = self.client.get(first["next"]).json()
+
+        self.assertEqual(
+            [booking["id"] for booking in first["results"] + second["results"]],
+            self.listed[:10],
+        )
+
+    def test_page_size_is_limited(self):
+        """The page size cannot go above the maximum."""
+
+        with mock.patch.object(BookingCursorPagination, "max_page_size", 4):
+            data = self.client.get("/bookings/", {"page_size": 100}).json()
+
+        self.assertEqual(len(data["results"]), 4)
+
+    def test_time_window(self):
+        """Only bookings overlapping [start, end) are listed."""
+
+        ids, _ = self.get_all_pages(
+            "/bookings/", {"start": hours(8).isoformat(), "end": hours(9).isoformat()}
+        )
+
+        self.assertEqual(ids, [str(booking.id) for booking in self.bookings[7:9]])
+
+    def test_open_ended_time_window(self):
+        """Either end of the window can be left out."""
+
+        after, _ = self.get_all_pages("/bookings/", {"start": hours(10).isoformat()})
+        before, _ = self.get_all_pages("/bookings/", {"end": hours(1).isoformat()})
+
+        self.assertEqual(after, [str(self.bookings[9].id)])
+        self.assertEqual(before, [str(self.bookings[0].id)])
+
+    def test_invalid_time_window(self):
+        """A window that ends before it starts is rejected."""
+
+        response = self.client.get(
+            "/bookings/", {"start": hours(2).isoformat(), "end": hours(1).isoformat()}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_all_bookings_of_a_thing(self):
+        """The bookings of a thing are paginated and leave out declined bookings."""
+
+        ids, pages = self.get_all_pages(
+            f"/things/{self.thing.pk}/all-bookings/",
+            {"page_size": 4, "start": hours(2).isoformat()},
+        )
+
+        self.assertEqual(ids, [str(booking.id) for booking in self.bookings[1:]])
+        self.assertEqual(pages, 3)
+
+
+@skipUnless(connection.vendor == "postgresql", "The plans are specific to Postgres")
+class AllBookingsPlanTests(TestCase):
+    """Tests for the plan of a page of all bookings of a thing on a seeded database."""
+
+    THINGS = 100
+    BOOKINGS = 100_000
+
+    @classmethod
+    def setUpTestData(cls):
+        """Seeds bookings of every status on many things, and updates the statistics."""
+
+        cls.owner = create_user("owner@b.no")
+        things = Thing.objects.bulk_create(
+            Thing(
+                name=f"Thing {i}",
+                description="-",
+                owner=cls.owner,
+                created_at=BASE_TIME,
+                updated_at=BASE_TIME,
+            )
+            for i in range(cls.THINGS)
+        )
+        cls.thing = things[0]
+        cls.thing.members.add(cls.owner)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO things_booking (
+                    id, created_at, updated_at, thing_id, booker_id, num_people, status,
+                    start_date, end_date, is_shared
+                )
+                SELECT
+                    gen_random_uuid(), now(), now(),
+                    (%(things)s::uuid[])[1 + i %% %(thing_count)s], %(owner)s, 1,
+                    (ARRAY['waiting', 'accepted', 'declined'])[1 + i %% 3],
+                    %(start)s + i * interval '1 minute',
+                    %(start)s + i * interval '1 minute' + interval '30 seconds',
+                    false
+                FROM generate_series(0, %(bookings)s - 1) AS i
+                """,
+                {
+                    "things": [thing.pk for thing in things],
+                    "thing_count": cls.THINGS,
+                    "owner": cls.owner.pk,
+                    "start": hours(0),
+                    "bookings": cls.BOOKINGS,
+                },
+            )
+            cursor.execute("ANALYZE things_booking")
+
+    def explain_page(self, params: dict) -> str:
+        """Fetches a page of all bookings, and explains the query that selected it."""
+
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f"/things/{self.thing.pk}/all-bookings/", params)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 20)
+        [sql] = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('SELECT "things_booking"') and "LIMIT" in query["sql"]
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}")
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def test_page_is_read_in_order_from_the_index(self):
+        """The first page is read from the partial index in (start_date, id) order, unsorted."""
+
+        plan = self.explain_page({"page_size": 20})
+
+        self.assertIn("booking_thing_active_start_idx", plan, plan)
+        self.assertNotIn("Sort", plan, plan)
+
+    def test_page_in_a_time_window_is_read_in_order_from_the_index(self):
+        """A page inside a time window is read from the same index, unsorted."""
+
+        plan = self.explain_page({"page_size": 20, "start": hours(24 * 30).isoformat()})
+
+        self.assertIn("booking_thing_active_start_idx", plan, plan)
+        self.assertNotIn("Sort", plan, plan)
@@ -0,0 +1,193 @@
+from uuid import uuid4
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tests.utils import create_booking, create_thing, create_user
+from thingbooker.mail.models import OutgoingEmail
+from thingbooker.things.enums import BookingStatusEnum, BookingStatusOutcomeEnum
+from thingbooker.things.interface import ThingInterface
+
+ACCEPTED = BookingStatusEnum.ACCEPTED
+DECLINED = BookingStatusEnum.DECLINED
+WAITING = BookingStatusEnum.WAITING
+
+
+class UpdateBookingStatusesTests(TestCase):
+    """Tests for accepting and declining several bookings of a thing at once."""
+
+    def setUp(self):
+        """Creates a thing with an owner and a member."""
+
+        self.owner = create_user("owner@b.no")
+        self.member = create_user("member@b.no")
+        self.thing = create_thing(self.owner, self.member)
+
+    def update(self, *changes, decline_overlapping: bool = True) -> dict:
+        """Applies the (booking, new status) changes and returns the outcome per booking."""
+
+        response = ThingInterface.update_booking_statuses(
+            self.thing,
+            [(booking.pk, new_status) for booking, new_status in changes],
+            decline_overlapping,
+        )
+        self.assertEqual(response.code, 200)
+        self.payload = response.payload
+        return {result["id"]: result["outcome"] for result in response.payload["results"]}
+
+    def assert_statuses(self, *expected) -> None:
+        """Checks the stored status of each (booking, status) pair."""
+
+        for booking, status in expected:
+            booking.refresh_from_db()
+            self.assertEqual(booking.status, status, booking)
+
+    def test_conflicts_are_resolved_in_request_order(self):
+        """Of two overlapping bookings in one request, the first one listed is accepted."""
+
+        first = create_booking(self.thing, self.member, 1, 3)
+        second = create_booking(self.thing, self.member, 0, 2)
+
+        outcomes = self.update((first, ACCEPTED), (second, ACCEPTED))
+
+        self.assertEqual(outcomes[first.pk], BookingStatusOutcomeEnum.ACCEPTED)
+        self.assertEqual(outcomes[second.pk], BookingStatusOutcomeEnum.CONFLICT)
+        self.assert_statuses((first, ACCEPTED), (second, WAITING))
+
+    def test_conflict_with_existing_accepted_booking(self):
+        """A booking that overlaps an accepted booking is not accepted."""
+
+        create_booking(self.thing, self.member, 0, 2, ACCEPTED)
+        waiting = create_booking(self.thing, self.member, 1, 3)
+        adjacent = create_booking(self.thing, self.member, 2, 3)
+
+        outcomes = self.update((waiting, ACCEPTED), (adjacent, ACCEPTED))
+
+        self.assertEqual(outcomes[waiting.pk], BookingStatusOutcomeEnum.CONFLICT)
+        self.assertEqual(outcomes[adjacent.pk], BookingStatusOutcomeEnum.ACCEPTED)
+
+    def test_declining_frees_the_time_in_the_same_request(self):
+        """An accepted booking declined in the request no longer blocks another booking."""
+
+        accepted = create_booking(self.thing, self.member, 0, 2, ACCEPTED)
+        waiting = create_booking(self.thing, self.member, 1, 3)
+
+        outcomes = self.update((accepted, DECLINED), (waiting, ACCEPTED))
+
+        self.assertEqual(outcomes[accepted.pk], BookingStatusOutcomeEnum.DECLINED)
+        self.assertEqual(outcomes[waiting.pk], BookingStatusOutcomeEnum.ACCEPTED)
+        self.assert_statuses((accepted, DECLINED), (waiting, ACCEPTED))
+
+    def test_declines_overlapping_waiting_bookings(self):
+        """Waiting bookings that overlap an accepted one are declined, others are left alone."""
+
+        booking = create_booking(self.thing, self.member, 0, 2)
+        overlapping = create_booking(self.thing, self.member, 1, 3)
+        later = create_booking(self.thing, self.member, 2, 3)
+
+        self.update((booking, ACCEPTED))
+
+        self.assertEqual(self.payload["num_declined"], 1)
+        self.assert_statuses((booking, ACCEPTED), (overlapping, DECLINED), (later, WAITING))
+
+    def test_keeps_overlapping_waiting_bookings(self):
+        """With decline_overlapping false, overlapping waiting bookings stay waiting."""
+
+        booking = create_booking(self.thing, self.member, 0, 2)
+        overlapping = create_booking(self.thing, self.member, 1, 3)
+
+        self.update((booking, ACCEPTED), decline_overlapping=False)
+
+        self.assertEqual(self.payload["num_declined"], 0)
+        self.assert_statuses((booking, ACCEPTED), (overlapping, WAITING))
+
+    def test_unchanged_and_not_found(self):
+        """Bookings that already have the status, or are of another thing, are reported."""
+
+        accepted = create_booking(self.thing, self.member, 0, 1, ACCEPTED)
+        other = create_booking(create_thing(self.owner, name="Car"), self.member, 0, 1)
+
+        outcomes = self.update((accepted, ACCEPTED), (other, ACCEPTED))
+
+        self.assertEqual(outcomes[accepted.pk], BookingStatusOutcomeEnum.UNCHANGED)
+        self.assertEqual(outcomes[other.pk], BookingStatusOutcomeEnum.NOT_FOUND)
+        self.assert_statuses((other, WAITING))
+
+    def test_notifies_bookers_except_the_owner(self):
+        """Each booker other than the owner gets one email about their booking."""
+
+        mine = create_booking(self.thing, self.owner, 0, 1)
+        accepted = create_booking(self.thing, self.member, 1, 2)
+        declined = create_booking(self.thing, self.member, 2, 3)
+
+        self.update((mine, ACCEPTED), (accepted, ACCEPTED), (declined, DECLINED))
+
+        self.assertEqual(
+            sorted(OutgoingEmail.objects.values_list("to_address", flat=True)),
+            ["member@b.no", "member@b.no"],
+        )
+
+
+class UpdateBookingStatusesViewTests(TestCase):
+    """Tests for the update-booking-statuses action."""
+
+    def setUp(self):
+        """Creates a thing and a client for its owner."""
+
+        self.owner = create_user("owner@b.no")
+        self.thing = create_thing(self.owner)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = f"/things/{self.thing.pk}/update-booking-statuses/"
+
+    def test_returns_results_in_request_order(self):
+        """The response lists the outcome of each booking in the order of the request."""
+
+        booking = create_booking(self.thing, self.owner, 0, 1)
+        missing = uuid4()
+
+        response = self.client.post(
+            self.url,
+            {
+                "bookings": [
+                    {"id": str(missing), "new_status": "accepted"},
+                    {"id": str(booking.pk), "new_status": "accepted"},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {"id": str(missing), "outcome": "not_found"},
+                {"id": str(booking.pk), "outcome": "accepted"},
+            ],
+        )
+
+    def test_rejects_duplicates(self):
+        """A booking can only be listed once."""
+
+        booking = create_booking(self.thing, self.owner, 0, 1)
+        change = {"id": str(booking.pk), "new_status": "accepted"}
+
+        response = self.client.post(self.url, {"bookings": [change, change]}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_permission_to_manage_bookings(self):
+        """Members that do not own the thing cannot change statuses."""
+
+        member = create_user("member@b.no")
+        self.thing.members.add(member)
+        booking = create_booking(self.thing, member, 0, 1)
+        self.client.force_authenticate(member)
+
+        response = self.client.post(
+            self.url,
+            {"bookings": [{"id": str(booking.pk), "new_status": "accepted"}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.utils import create_user
+from thingbooker.mail.models import OutgoingEmail
+from thingbooker.users.interface import ThingbookerGroupInterface
+from thingbooker.users.models import AcceptInviteToken
+
+INVITED = "The user has been invited if they are registered on thingbooker"
+
+
+class BulkInviteTests(TestCase):
+    """Tests for inviting several emails to a group at once."""
+
+    def setUp(self):
+        """Creates a group with a member, and a client for its owner."""
+
+        self.owner = create_user("owner@b.no")
+        self.member = create_user("member@b.no")
+        self.group = ThingbookerGroupInterface.create_with_group(name="Family", owner=self.owner)
+        self.group.members.add(self.member)
+        self.url = f"/groups/{self.group.pk}/invite-members/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def invite(self, emails: list[str]):
+        """Invites the emails through the API."""
+
+        return self.client.post(self.url, {"emails": emails}, format="json")
+
+    def test_result_per_email(self):
+        """Each email gets a message, and only new users are invited."""
+
+        invited = create_user("invited@b.no")
+        ThingbookerGroupInterface.invite_user_to_group(invited, self.group, self.owner)
+        create_user("new@b.no")
+
+        response = self.invite(
+            ["member@b.no", "invited@b.no", "unknown@b.no", "new@b.no", "new@b.no"]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {"email": "member@b.no", "message": "User is already a member of the group"},
+                {"email": "invited@b.no", "message": "User is already invited to the group"},
+                {"email": "unknown@b.no", "message": INVITED},
+                {"email": "new@b.no", "message": INVITED},
+            ],
+        )
+        self.assertEqual(
+            sorted(AcceptInviteToken.objects.values_list("user__username", flat=True)),
+            ["invited@b.no", "new@b.no"],
+        )
+        self.assertEqual(OutgoingEmail.objects.filter(to_address="new@b.no").count(), 1)
+
+    def test_queries_do_not_grow_with_emails(self):
+        """The users, members and invites are looked up with a fixed number of queries."""
+
+        def count_queries(new_users: int) -> int:
+            emails = [create_user(f"user{new_users}-{i}@b.no").username for i in range(new_users)]
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(self.invite([*emails, "member@b.no"]).status_code, 200)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(2), count_queries(10))
+        self.assertEqual(AcceptInviteToken.objects.count(), 12)
+
+    def test_invalid_emails(self):
+        """The list must have valid emails, and cannot be empty or too long."""
+
+        too_many = [f"user{i}@b.no" for i in range(settings.BULK_INVITE_MAX_EMAILS + 1)]
+
+        self.assertEqual(self.invite([]).status_code, 400)
+        self.assertEqual(self.invite(["not an email"]).status_code, 400)
+        self.assertEqual(self.invite(too_many).status_code, 400)
+        self.assertFalse(AcceptInviteToken.objects.exists())
+
+    def test_only_members_can_invite(self):
+        """Users outside the group cannot invite to it."""
+
+        self.client.force_authenticate(create_user("other@b.no"))
+
+        self.assertEqual(self.invite(["new@b.no"]).status_code, 404)
+        self.assertFalse(AcceptInviteToken.objects.exists())
@@ -0,0 +1,108 @@
+from datetime import UTC, datetime, timedelta, timezone
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from tests.utils import create_booking, create_thing, create_user
+from thingbooker.things.calendar import LINE_LENGTH, escape_text, fold_line, format_datetime
+from thingbooker.things.enums import BookingStatusEnum
+
+
+class FormattingTests(SimpleTestCase):
+    """Tests for formatting the content lines of the feeds."""
+
+    def test_escape_text(self):
+        """Backslashes, separators and line breaks are escaped."""
+
+        self.assertEqual(escape_text("a\\b;c,d\r\ne\nf"), "a\\\\b\\;c\\,d\\ne\\nf")
+
+    def test_short_lines_are_not_folded(self):
+        """Lines within the limit are only terminated."""
+
+        self.assertEqual(fold_line("SUMMARY:Boat"), "SUMMARY:Boat\r\n")
+
+    def test_long_lines_are_folded_by_octets(self):
+        """Folded lines stay within 75 octets and multi-byte characters are kept whole."""
+
+        line = "SUMMARY:" + "æøå" * 40
+
+        folded = fold_line(line)
+
+        parts = folded.removesuffix("\r\n").split("\r\n")
+        self.assertTrue(all(len(part.encode()) <= LINE_LENGTH for part in parts))
+        self.assertTrue(all(part.startswith(" ") for part in parts[1:]))
+        self.assertEqual(parts[0] + "".join(part[1:] for part in parts[1:]), line)
+
+    def test_format_datetime(self):
+        """Times are formatted in UTC."""
+
+        value = datetime(2024, 3, 1, 18, 30, tzinfo=timezone(timedelta(hours=1)))
+
+        self.assertEqual(format_datetime(value), "20240301T173000Z")
+        self.assertEqual(format_datetime(value.astimezone(UTC)), "20240301T173000Z")
+
+
+class CalendarFeedTests(TestCase):
+    """Tests for the calendar feeds of things and users."""
+
+    def setUp(self):
+        """Creates a thing with bookings of each status by a member."""
+
+        self.owner = create_user("owner@b.no")
+        self.member = create_user("member@b.no", first_name="Kari, Nordmann")
+        self.thing = create_thing(self.owner, self.member, name="Boat; big")
+        self.accepted = create_booking(
+            self.thing, self.member, 0, 1, status=BookingStatusEnum.ACCEPTED
+        )
+        self.waiting = create_booking(self.thing, self.member, 2, 3)
+        self.declined = create_booking(
+            self.thing, self.member, 4, 5, status=BookingStatusEnum.DECLINED
+        )
+        self.client = APIClient()
+
+    def get_feed(self, url: str) -> str:
+        """Fetches a feed, and checks it is a well-formed calendar."""
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        feed = b"".join(response.streaming_content).decode()
+        self.assertTrue(feed.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(feed.endswith("END:VCALENDAR\r\n"))
+        self.assertNotIn("\n", feed.replace("\r\n", ""))
+        return feed
+
+    def test_thing_feed(self):
+        """The feed of a thing has the accepted bookings, named after the booker."""
+
+        self.client.force_authenticate(self.owner)
+
+        feed = self.get_feed(f"/things/{self.thing.pk}/calendar.ics/")
+
+        self.assertIn("X-WR-CALNAME:Boat\\; big\r\n", feed)
+        self.assertEqual(feed.count("BEGIN:VEVENT"), 1)
+        self.assertIn(f"UID:{self.accepted.id}@thingbooker\r\n", feed)
+        self.assertIn("SUMMARY:Kari\\, Nordmann\r\n", feed)
+        self.assertIn("STATUS:CONFIRMED\r\n", feed)
+
+    def test_user_feed(self):
+        """The feed of a user has their waiting and accepted bookings, named after the thing."""
+
+        self.client.force_authenticate(self.member)
+
+        feed = self.get_feed("/bookings/calendar.ics/")
+
+        self.assertEqual(feed.count("BEGIN:VEVENT"), 2)
+        self.assertEqual(feed.count("SUMMARY:Boat\\; big\r\n"), 2)
+        self.assertIn("STATUS:TENTATIVE\r\n", feed)
+        self.assertNotIn(str(self.declined.id), feed)
+
+    def test_thing_feed_of_other_users(self):
+        """Users who are not members cannot see the feed of the thing."""
+
+        self.client.force_authenticate(create_user("other@b.no"))
+
+        response = self.client.get(f"/things/{self.thing.pk}/calendar.ics/")
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,229 @@
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from tests.utils import create_booking, create_thing, create_user, hours
+from thingbooker.things.enums import BookingStatusEnum
+from thingbooker.things.interface import ThingInterface
+from thingbooker.things.models import Booking, Thing
+from thingbooker.things.occupancy import (
+    get_free_windows,
+    get_occupancy_steps,
+    get_peak_occupancy,
+)
+
+ACCEPTED = BookingStatusEnum.ACCEPTED
+DECLINED = BookingStatusEnum.DECLINED
+WAITING = BookingStatusEnum.WAITING
+
+
+class OccupancyTests(SimpleTestCase):
+    """Tests for the sweep-line occupancy helpers."""
+
+    def test_steps(self):
+        """Overlapping intervals add up, and steps at the same instant are merged."""
+
+        steps = get_occupancy_steps([(hours(0), hours(2), 2), (hours(1), hours(3), 3)])
+
+        self.assertEqual(steps, [(hours(0), 2), (hours(1), 5), (hours(2), 3), (hours(3), 0)])
+
+    def test_adjacent_intervals_are_not_counted_together(self):
+        """An interval that ends when another starts does not overlap it."""
+
+        steps = get_occupancy_steps([(hours(1), hours(2), 1), (hours(0), hours(1), 1)])
+
+        self.assertEqual(steps, [(hours(0), 1), (hours(1), 1), (hours(2), 0)])
+        self.assertEqual(get_peak_occupancy(steps, hours(0), hours(2)), 1)
+
+    def test_peak_occupancy_within_window(self):
+        """Only the occupancy within [start, end) counts, including the one at start."""
+
+        steps = get_occupancy_steps([(hours(0), hours(4), 1), (hours(2), hours(3), 3)])
+
+        self.assertEqual(get_peak_occupancy(steps, hours(1), hours(2)), 1)
+        self.assertEqual(get_peak_occupancy(steps, hours(1), hours(5)), 4)
+        self.assertEqual(get_peak_occupancy(steps, hours(3), hours(4)), 1)
+        self.assertEqual(get_peak_occupancy(steps, hours(5), hours(6)), 0)
+
+    def test_free_windows(self):
+        """The windows are where the occupancy is at most the given maximum."""
+
+        steps = get_occupancy_steps([(hours(1), hours(2), 2), (hours(3), hours(4), 1)])
+
+        self.assertEqual(
+            get_free_windows(steps, hours(0), hours(5), 1),
+            [(hours(0), hours(1)), (hours(2), hours(5))],
+        )
+        self.assertEqual(
+            get_free_windows(steps, hours(0), hours(5), 0),
+            [(hours(0), hours(1)), (hours(2), hours(3)), (hours(4), hours(5))],
+        )
+
+
+class FitsTests(SimpleTestCase):
+    """Tests for checking whether a booking fits next to the accepted bookings."""
+
+    intervals = [(hours(0), hours(2), 2), (hours(1), hours(3), 1)]
+
+    def test_thing_with_capacity(self):
+        """The booking fits as long as the total number of people stays within the capacity."""
+
+        thing = Thing(capacity=4)
+
+        self.assertTrue(ThingInterface.fits(thing, self.intervals, hours(1), hours(2), 1))
+        self.assertFalse(ThingInterface.fits(thing, self.intervals, hours(1), hours(2), 2))
+        self.assertTrue(ThingInterface.fits(thing, self.intervals, hours(2), hours(4), 3))
+        self.assertTrue(ThingInterface.fits(thing, self.intervals, hours(3), hours(4), 4))
+
+    def test_thing_without_capacity(self):
+        """Without a capacity, a booking only fits where nothing is accepted."""
+
+        thing = Thing(capacity=None)
+        intervals = [(hours(0), hours(2), 1)]
+
+        self.assertFalse(ThingInterface.fits(thing, intervals, hours(1), hours(3), 1))
+        self.assertTrue(ThingInterface.fits(thing, intervals, hours(2), hours(3), 10))
+
+
+class CapacityTests(TestCase):
+    """Tests for accepting bookings and changing the capacity of a shared thing."""
+
+    def setUp(self):
+        """Creates a thing with room for 4 people, and a client for its owner."""
+
+        self.owner = create_user("owner@b.no")
+        self.thing = create_thing(self.owner, capacity=4)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def accept(self, booking: Booking) -> int:
+        """Accepts the booking through the API and returns the status code."""
+
+        response = self.client.post(
+            f"/things/{self.thing.pk}/update-booking-status/{booking.pk}/",
+            {"new_status": "accepted"},
+            format="json",
+        )
+        return response.status_code
+
+    def test_accepts_overlapping_bookings_that_fit(self):
+        """Overlapping bookings are accepted until the capacity is reached."""
+
+        create_booking(self.thing, self.owner, 0, 2, ACCEPTED, num_people=3)
+        fits = create_booking(self.thing, self.owner, 1, 3, num_people=1)
+        too_many = create_booking(self.thing, self.owner, 1, 2, num_people=1)
+
+        self.assertEqual(self.accept(fits), 200)
+        self.assertEqual(self.accept(too_many), 409)
+
+    def test_declines_only_bookings_that_no_longer_fit(self):
+        """After accepting, overlapping waiting bookings are declined only if they do not fit."""
+
+        booking = create_booking(self.thing, self.owner, 0, 2, num_people=3)
+        still_fits = create_booking(self.thing, self.owner, 1, 3, num_people=1)
+        no_room = create_booking(self.thing, self.owner, 1, 3, num_people=2)
+
+        self.assertEqual(self.accept(booking), 200)
+
+        still_fits.refresh_from_db()
+        no_room.refresh_from_db()
+        self.assertEqual((still_fits.status, no_room.status), (WAITING, DECLINED))
+
+    def test_declining_a_single_booking(self):
+        """The single status action declines a booking."""
+
+        booking = create_booking(self.thing, self.owner, 0, 1)
+
+        response = self.client.post(
+            f"/things/{self.thing.pk}/update-booking-status/{booking.pk}/",
+            {"new_status": "declined"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, DECLINED)
+
+    def test_availability_for_a_number_of_people(self):
+        """The free intervals are those where num_people more people fit."""
+
+        create_booking(self.thing, self.owner, 1, 2, ACCEPTED, num_people=3)
+        url = f"/things/{self.thing.pk}/availability/"
+        window = {"start": hours(0).isoformat(), "end": hours(3).isoformat()}
+
+        one = self.client.get(url, {**window, "num_people": 1}).json()
+        two = self.client.get(url, {**window, "num_people": 2}).json()
+
+        self.assertEqual(len(one), 1)
+        self.assertEqual(len(two), 2)
+
+    def change_capacity(self, capacity: int | None):
+        """Changes the capacity through the API."""
+
+        return self.client.patch(f"/things/{self.thing.pk}/", {"capacity": capacity}, format="json")
+
+    def test_lower_capacity_must_fit_upcoming_bookings(self):
+        """The capacity cannot go below the people of the upcoming accepted bookings."""
+
+        create_booking(self.thing, self.owner, 0, 2, ACCEPTED, num_people=2)
+        create_booking(self.thing, self.owner, 1, 3, ACCEPTED, num_people=1)
+
+        self.assertEqual(self.change_capacity(2).status_code, 400)
+        self.assertEqual(self.change_capacity(3).status_code, 200)
+
+    def test_capacity_can_only_be_removed_without_overlaps(self):
+        """Removing the capacity requires that no accepted bookings overlap."""
+
+        first = create_booking(self.thing, self.owner, 0, 2, ACCEPTED)
+        create_booking(self.thing, self.owner, 1, 3, ACCEPTED)
+
+        self.assertEqual(self.change_capacity(None).status_code, 400)
+
+        Booking.objects.exclude(pk=first.pk).update(status=DECLINED)
+        self.assertEqual(self.change_capacity(None).status_code, 200)
+        self.assertFalse(Booking.objects.filter(is_shared=True).exists())
+
+    def test_adding_capacity_marks_bookings_as_shared(self):
+        """Bookings of a thing that gets a capacity are exempt from the exclusion constraint."""
+
+        thing = create_thing(self.owner, name="Car")
+        booking = create_booking(thing, self.owner, 0, 1, ACCEPTED)
+
+        response = self.client.patch(f"/things/{thing.pk}/", {"capacity": 2}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        booking.refresh_from_db()
+        self.assertTrue(booking.is_shared)
+
+    def test_accept_uses_the_locked_capacity(self):
+        """A capacity lowered after the thing was loaded is respected when accepting."""
+
+        create_booking(self.thing, self.owner, 0, 2, ACCEPTED)
+        booking = create_booking(self.thing, self.owner, 1, 3)
+        # like a change committed by another request after this one loaded the thing
+        Thing.objects.filter(pk=self.thing.pk).update(capacity=1)
+
+        response = ThingInterface.accept_booking(self.thing, booking)
+
+        self.assertEqual(response.code, 409)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, WAITING)
+
+    def test_accept_after_the_capacity_was_removed(self):
+        """A booking is not marked as shared when the capacity was removed in the meantime."""
+
+        accepted = create_booking(self.thing, self.owner, 0, 2, ACCEPTED)
+        booking = create_booking(self.thing, self.owner, 1, 3)
+        booking_after = create_booking(self.thing, self.owner, 2, 3)
+        Thing.objects.filter(pk=self.thing.pk).update(capacity=None)
+        Booking.objects.filter(thing=self.thing).update(is_shared=False)
+
+        overlapping = ThingInterface.accept_booking(self.thing, booking)
+        bulk = ThingInterface.update_booking_statuses(self.thing, [(booking_after.pk, ACCEPTED)])
+
+        self.assertEqual(overlapping.code, 409)
+        self.assertEqual(bulk.code, 200)
+        self.assertFalse(Booking.objects.filter(is_shared=True).exists())
+        self.assertEqual(
+            set(Booking.objects.filter(status=ACCEPTED).values_list("pk", flat=True)),
+            {accepted.pk, booking_after.pk},
+        )
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from tests.utils import create_booking, create_thing, create_user
+from thingbooker.things.models import Thing
+from thingbooker.users.interface import ThingbookerGroupInterface
+
+
+class ConditionalGetTests(TestCase):
+    """Tests for the ETag validators of things, bookings and groups."""
+
+    def setUp(self):
+        """Creates a thing with a booking, and a client for its owner."""
+
+        self.owner = create_user("owner@b.no")
+        self.member = create_user("member@b.no")
+        self.thing = create_thing(self.owner, self.member)
+        self.booking = create_booking(self.thing, self.owner, 0, 1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def get(self, url: str, **headers):
+        """Fetches the url, with If-Modified-Since set to a minute from now."""
+
+        later = http_date((timezone.now() + timedelta(minutes=1)).timestamp())
+        return self.client.get(url, HTTP_IF_MODIFIED_SINCE=later, **headers)
+
+    def test_not_modified(self):
+        """A client with the current ETag gets 304, Last-Modified is not used."""
+
+        url = f"/things/{self.thing.pk}/"
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Last-Modified"))
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.get(url).status_code, 200)
+
+    def test_changes_change_the_etag(self):
+        """Changing the thing or one of its bookings gives a new ETag."""
+
+        url = f"/things/{self.thing.pk}/"
+        first = self.client.get(url)["ETag"]
+
+        Thing.objects.filter(pk=self.thing.pk).update(name="Ship", updated_at=timezone.now())
+        second = self.client.get(url)["ETag"]
+        create_booking(self.thing, self.member, 2, 3)
+        third = self.client.get(url)["ETag"]
+
+        self.assertEqual(len({first, second, third}), 3)
+
+    def test_deletions_change_the_etag(self):
+        """Deleting a booking that is not the newest changes the ETag of the listing."""
+
+        create_booking(self.thing, self.owner, 2, 3)
+        etag = self.client.get("/bookings/")["ETag"]
+        self.booking.delete()
+
+        response = self.get("/bookings/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_thing_members_change_the_etag(self):
+        """Adding a member to a thing gives it a new ETag, within the same second."""
+
+        url = f"/things/{self.thing.pk}/"
+        etag = self.client.get(url)["ETag"]
+
+        self.thing.members.add(create_user("new@b.no"))
+
+        response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["members"]), 3)
+
+    def test_etag_depends_on_the_user(self):
+        """Users who see the same things get different ETags."""
+
+        owner = self.client.get("/things/")["ETag"]
+        self.client.force_authenticate(self.member)
+        member = self.client.get("/things/", HTTP_IF_NONE_MATCH=owner)
+
+        self.assertEqual(member.status_code, 200)
+        self.assertNotEqual(member["ETag"], owner)
+
+    def test_group_members_change_the_etag(self):
+        """Adding a member to a group gives the group a new ETag."""
+
+        group = ThingbookerGroupInterface.create_with_group(name="Family", owner=self.owner)
+        url = f"/groups/{group.pk}/"
+        etag = self.client.get(url)["ETag"]
+
+        group.members.add(self.member)
+
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unsafe_methods_have_no_validators(self):
+        """Changes are not answered with validators."""
+
+        response = self.client.patch(f"/things/{self.thing.pk}/", {"name": "Ship"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
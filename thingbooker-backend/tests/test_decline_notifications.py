@@ -0,0 +1,93 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_booking, create_thing, create_user
+from thingbooker.mail.models import OutgoingEmail
+from thingbooker.things.enums import BookingStatusEnum
+from thingbooker.things.interface import ThingInterface
+from thingbooker.things.models import Booking
+
+DECLINED_SUBJECT = "[Thingbooker] Bookingen din er avist"
+ACCEPTED_SUBJECT = "[Thingbooker] Bookingen din er godtatt"
+
+
+class DeclineNotificationTests(TestCase):
+    """Tests for the notifications queued when accepting a booking declines the overlapping."""
+
+    def setUp(self):
+        """Creates a thing with an owner and a member."""
+
+        self.owner = create_user("owner@b.no")
+        self.member = create_user("member@b.no")
+        self.thing = create_thing(self.owner, self.member)
+
+    def get_emails(self) -> list[tuple[str, str]]:
+        """Returns the subject and address of the queued emails."""
+
+        return sorted(OutgoingEmail.objects.values_list("subject", "to_address"))
+
+    def test_declines_and_notifies_overlapping_bookers(self):
+        """Each overlapping booker except the owner gets a decline email."""
+
+        booking = create_booking(self.thing, self.member, 0, 4)
+        overlapping = [
+            create_booking(self.thing, create_user(f"user{i}@b.no"), i, i + 2) for i in range(3)
+        ]
+        own = create_booking(self.thing, self.owner, 3, 5)
+        adjacent = create_booking(self.thing, create_user("adjacent@b.no"), 4, 5)
+
+        response = ThingInterface.accept_booking(self.thing, booking)
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.payload["num_declined"], 4)
+        self.assertEqual(
+            set(
+                Booking.objects.filter(status=BookingStatusEnum.DECLINED).values_list(
+                    "pk", flat=True
+                )
+            ),
+            {b.pk for b in [*overlapping, own]},
+        )
+        adjacent.refresh_from_db()
+        self.assertEqual(adjacent.status, BookingStatusEnum.WAITING)
+        self.assertEqual(
+            self.get_emails(),
+            [
+                (DECLINED_SUBJECT, "user0@b.no"),
+                (DECLINED_SUBJECT, "user1@b.no"),
+                (DECLINED_SUBJECT, "user2@b.no"),
+                (ACCEPTED_SUBJECT, "member@b.no"),
+            ],
+        )
+
+    def test_queries_do_not_grow_with_declined_bookings(self):
+        """The declined bookings are updated and notified with a fixed number of queries."""
+
+        def count_queries(overlapping: int) -> int:
+            Booking.objects.all().delete()
+            booking = create_booking(self.thing, self.member, 0, 1)
+            for i in range(overlapping):
+                create_booking(self.thing, create_user(f"user{overlapping}-{i}@b.no"), 0, 1)
+            with CaptureQueriesContext(connection) as context:
+                ThingInterface.accept_booking(self.thing, booking)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(2), count_queries(10))
+        self.assertEqual(
+            OutgoingEmail.objects.filter(subject=DECLINED_SUBJECT).count(),
+            12,
+        )
+
+    def test_without_declining_overlapping(self):
+        """Overlapping bookings are kept waiting, and only the accepted booker is notified."""
+
+        booking = create_booking(self.thing, self.member, 0, 2)
+        other = create_booking(self.thing, create_user("other@b.no"), 1, 3)
+
+        response = ThingInterface.accept_booking(self.thing, booking, decline_overlapping=False)
+
+        self.assertEqual(response.code, 200)
+        other.refresh_from_db()
+        self.assertEqual(other.status, BookingStatusEnum.WAITING)
+        self.assertEqual(self.get_emails(), [(ACCEPTED_SUBJECT, "member@b.no")])
@@ -0,0 +1,79 @@
+import json
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from thingbooker.things.models import Booking, Thing
+from thingbooker.users.models import ThingbookerUser
+
+
+class BookingExportTests(TestCase):
+    """Tests for the streaming export of bookings."""
+
+    def setUp(self):
+        """Creates two bookings and a client for an admin user."""
+
+        self.admin = ThingbookerUser.objects.create(
+            username="admin@b.no", first_name="Admin", is_staff=True
+        )
+        thing = Thing.objects.create(name="Boat", description="A boat", owner=self.admin)
+        start = timezone.now() + timedelta(days=1)
+        for hours in (0, 2):
+            Booking.objects.create(
+                thing=thing,
+                booker=self.admin,
+                start_date=start + timedelta(hours=hours),
+                end_date=start + timedelta(hours=hours + 1),
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    @staticmethod
+    def read(response) -> str:
+        """Returns the whole body of a streaming response."""
+
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_by_default(self):
+        """Without a format, the bookings are exported as CSV with a header row."""
+
+        response = self.client.get("/bookings/export/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        lines = self.read(response).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith("id,thing_id,thing_name"))
+
+    def test_ndjson(self):
+        """?format=ndjson exports one JSON object per line."""
+
+        response = self.client.get("/bookings/export/", {"format": "ndjson"})
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row["thing_name"] for row in rows], ["Boat", "Boat"])
+
+    def test_json_is_not_acceptable(self):
+        """Asking for JSON gives 406 instead of CSV labelled as JSON."""
+
+        response = self.client.get("/bookings/export/", HTTP_ACCEPT="application/json")
+
+        self.assertEqual(response.status_code, 406)
+
+    def test_invalid_filter(self):
+        """Invalid filters give 400."""
+
+        response = self.client.get("/bookings/export/", {"status": "nonsense"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("status", response.content.decode())
+
+    def test_requires_admin(self):
+        """Users that are not admins cannot export."""
+
+        self.client.force_authenticate(ThingbookerUser.objects.create(username="u@b.no"))
+
+        self.assertEqual(self.client.get("/bookings/export/").status_code, 403)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from thingbooker.jobs import QueuedJobInterface
+from thingbooker.mail.interface import EmailInterface
+from thingbooker.media.interface import MediaDeletionInterface
+from thingbooker.media.models import MediaDeletionJob
+
+
+class QueuedJobTests(TestCase):
+    """Tests for the helpers shared by the outbox and the media deletions."""
+
+    def test_failures_back_off_until_attempts_run_out(self):
+        """Retries are scheduled with a doubled backoff, and the last failure gives up."""
+
+        job = MediaDeletionInterface.queue_deletion(["a.png"])[0]
+        now = timezone.now()
+        backoff = timedelta(minutes=1)
+
+        for attempts, delay in [(1, 1), (2, 2)]:
+            job.attempts = attempts
+            QueuedJobInterface.register_failure(job, OSError("Full"), now, 3, backoff)
+            self.assertEqual(job.next_attempt_at, now + backoff * delay)
+            self.assertEqual(job.status, QueuedJobInterface.QUEUED)
+
+        job.attempts = 3
+        QueuedJobInterface.register_failure(job, OSError("Full"), now, 3, backoff)
+
+        self.assertEqual(job.status, QueuedJobInterface.FAILED)
+        self.assertEqual(job.last_error, "Full")
+
+    def test_only_due_jobs_are_processed(self):
+        """Jobs that are scheduled for later are left out of the batch."""
+
+        due, later = MediaDeletionInterface.queue_deletion(["a.png", "b.png"])
+        MediaDeletionJob.objects.filter(pk=later.pk).update(
+            next_attempt_at=timezone.now() + timedelta(hours=1)
+        )
+
+        batch = QueuedJobInterface.process_batch(
+            MediaDeletionJob, 10, lambda jobs, now: ([job.pk for job in jobs], 0)
+        )
+
+        self.assertEqual(batch, ([due.pk], 0))
+
+    def test_commands_drain_the_queues(self):
+        """Both worker commands process their queue and exit with --once."""
+
+        MediaDeletionInterface.queue_deletion(["a.png"])
+        EmailInterface.queue_mass_mail(
+            template_name="invite_user_to_group",
+            recipients=[({"group": {"name": "Group"}}, "a@b.no")],
+            subject="Invite",
+        )
+        media, mail = StringIO(), StringIO()
+
+        call_command("delete_media", "--once", stdout=media)
+        call_command("send_queued_mail", "--once", stdout=mail)
+
+        self.assertEqual(media.getvalue(), "Deleted 1 file(s), 0 failed.\n")
+        self.assertEqual(mail.getvalue(), "Sent 1 email(s), 0 failed.\n")
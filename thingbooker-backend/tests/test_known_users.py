@@ -0,0 +1,124 @@
+import threading
+import time
+
+from django.contrib.auth.models import Group
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+
+from thingbooker.users.interface import KnownUserInterface
+from thingbooker.users.models import KnownUser, ThingbookerUser
+
+
+def get_pairs() -> dict[tuple[str, str], int]:
+    """Returns the shared groups per pair of usernames."""
+
+    return {
+        (known.user.username, known.known_user.username): known.shared_groups
+        for known in KnownUser.objects.select_related("user", "known_user")
+    }
+
+
+def create_users(*usernames: str) -> list[ThingbookerUser]:
+    """Creates users with the given usernames."""
+
+    return [ThingbookerUser.objects.create(username=name, first_name=name) for name in usernames]
+
+
+class KnownUserTests(TestCase):
+    """Tests for keeping the known users in sync with the group memberships."""
+
+    def setUp(self):
+        """Creates three users and two groups."""
+
+        self.a, self.b, self.c = create_users("a", "b", "c")
+        self.first = Group.objects.create(name="first")
+        self.second = Group.objects.create(name="second")
+
+    def test_adding_members_makes_them_known(self):
+        """Members of a group know each other and themselves."""
+
+        self.first.user_set.add(self.a, self.b)
+
+        self.assertEqual(get_pairs(), {("a", "a"): 1, ("a", "b"): 1, ("b", "a"): 1, ("b", "b"): 1})
+        self.assertEqual(set(self.a.get_all_known_users()), {self.a, self.b})
+        self.assertEqual(set(self.c.get_all_known_users()), set())
+
+    def test_counts_shared_groups_from_both_sides(self):
+        """Adding through user.groups and group.user_set counts the same way."""
+
+        self.first.user_set.add(self.a, self.b)
+        self.b.groups.add(self.second)
+        self.a.groups.add(self.second)
+
+        self.assertEqual(get_pairs()[("a", "b")], 2)
+        self.assertEqual(get_pairs()[("b", "b")], 2)
+
+    def test_removing_members(self):
+        """A pair is forgotten once it no longer shares any group."""
+
+        self.first.user_set.add(self.a, self.b, self.c)
+        self.second.user_set.add(self.a, self.b)
+
+        self.first.user_set.remove(self.b)
+        self.assertEqual(get_pairs()[("a", "b")], 1)
+        self.assertNotIn(("b", "c"), get_pairs())
+
+        self.b.groups.clear()
+        self.assertNotIn(("a", "b"), get_pairs())
+        self.assertNotIn(("b", "b"), get_pairs())
+        self.assertEqual(get_pairs()[("a", "c")], 1)
+
+    def test_deleting_a_group(self):
+        """Deleting a group forgets the pairs that only shared that group."""
+
+        self.first.user_set.add(self.a, self.b)
+        self.second.user_set.add(self.a, self.c)
+
+        self.first.delete()
+
+        self.assertEqual(get_pairs(), {("a", "a"): 1, ("a", "c"): 1, ("c", "a"): 1, ("c", "c"): 1})
+
+    def test_rebuild_matches_incremental_updates(self):
+        """Rebuilding the table gives the same rows as the signal receivers."""
+
+        self.first.user_set.add(self.a, self.b, self.c)
+        self.second.user_set.add(self.b, self.c)
+        self.first.user_set.remove(self.a)
+        expected = get_pairs()
+
+        KnownUserInterface.rebuild()
+
+        self.assertEqual(get_pairs(), expected)
+
+
+class ConcurrentKnownUserTests(TransactionTestCase):
+    """Tests for membership changes in concurrent transactions."""
+
+    def test_concurrent_adds_to_the_same_group(self):
+        """Users added to a group in two open transactions still get to know each other."""
+
+        a, b, c = create_users("a", "b", "c")
+        group = Group.objects.create(name="group")
+        group.user_set.add(a)
+        start = threading.Barrier(2)
+
+        def add(user: ThingbookerUser):
+            try:
+                start.wait()
+                with transaction.atomic():
+                    group.user_set.add(user)
+                    # keep the transaction open, so the other one runs before this commits
+                    time.sleep(0.3)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=add, args=(user,)) for user in (b, c)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        pairs = get_pairs()
+        self.assertEqual(pairs[("b", "c")], 1)
+        self.assertEqual(pairs[("c", "b")], 1)
+        self.assertEqual(len(pairs), 9)
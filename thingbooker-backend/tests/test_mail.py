@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from thingbooker.mail.enums import OutgoingEmailStatusEnum
+from thingbooker.mail.interface import EmailInterface
+from thingbooker.mail.models import OutgoingEmail
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    """Email backend that fails to send anything."""
+
+    def send_messages(self, email_messages):
+        """Raises like an SMTP server that refuses the messages"""
+
+        raise ConnectionError("Refused")
+
+
+class OutboxTests(TestCase):
+    """Tests for queueing emails in the outbox and sending them with the worker."""
+
+    def queue(self, *addresses: str) -> list[OutgoingEmail]:
+        """Queues an invite email to each address."""
+
+        return EmailInterface.queue_mass_mail(
+            template_name="invite_user_to_group",
+            recipients=[({"group": {"name": "Group"}}, address) for address in addresses],
+            subject="Invite",
+        )
+
+    def send(self) -> tuple[int, int]:
+        """Runs one batch of the worker."""
+
+        return EmailInterface.send_queued_mail(
+            batch_size=10, max_attempts=2, retry_backoff=timedelta(minutes=1)
+        )
+
+    def test_queueing_does_not_send(self):
+        """Queued emails are rendered and stored, but not sent."""
+
+        self.queue("a@b.no", "c@d.no")
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            set(OutgoingEmail.objects.values_list("to_address", "status")),
+            {("a@b.no", "queued"), ("c@d.no", "queued")},
+        )
+
+    def test_worker_sends_queued_emails_once(self):
+        """The worker sends each queued email and marks it as sent."""
+
+        self.queue("a@b.no", "c@d.no")
+
+        self.assertEqual(self.send(), (2, 0))
+        self.assertEqual(self.send(), (0, 0))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["a@b.no", "c@d.no"])
+        email = OutgoingEmail.objects.first()
+        self.assertEqual(email.status, OutgoingEmailStatusEnum.SENT)
+        self.assertEqual(email.attempts, 1)
+        self.assertIsNotNone(email.sent_at)
+
+    @override_settings(EMAIL_BACKEND="tests.test_mail.FailingEmailBackend")
+    def test_failures_are_retried_with_backoff_and_then_given_up(self):
+        """A failed email is retried later, and marked as failed after max_attempts."""
+
+        (email,) = self.queue("a@b.no")
+
+        self.assertEqual(self.send(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmailStatusEnum.QUEUED)
+        self.assertEqual(email.last_error, "Refused")
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        # not due yet
+        self.assertEqual(self.send(), (0, 0))
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(self.send(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmailStatusEnum.FAILED)
+        self.assertEqual(email.attempts, 2)
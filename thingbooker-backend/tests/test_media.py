@@ -0,0 +1,92 @@
+import tempfile
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from thingbooker.media.interface import ImageVariantInterface, MediaDeletionInterface
+from thingbooker.media.models import MediaDeletionJob
+from thingbooker.users.models import ThingbookerUser
+
+
+class ImageVariantNameTests(SimpleTestCase):
+    """Tests for the storage names of image variants."""
+
+    def test_variant_name_includes_extension(self):
+        """The variant directory is named after the full file name of the original."""
+
+        self.assertEqual(
+            ImageVariantInterface.get_variant_name("pictures/abc.jpg", "small", "webp"),
+            "pictures/variants/abc.jpg/small.webp",
+        )
+
+    def test_images_with_different_extensions_do_not_share_variants(self):
+        """Originals that only differ in their extension get separate variants."""
+
+        jpg = set(ImageVariantInterface.get_variant_names("pictures/abc.jpg").values())
+        png = set(ImageVariantInterface.get_variant_names("pictures/abc.png").values())
+        self.assertFalse(jpg & png)
+
+
+class MediaDeletionTests(TestCase):
+    """Tests for the worker that deletes queued files."""
+
+    def setUp(self):
+        """Stores files in a temporary media root."""
+
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def store(self, name: str) -> list[str]:
+        """Stores an original and all its variants, and returns their names."""
+
+        names = [name, *ImageVariantInterface.get_variant_names(name).values()]
+        for stored_name in names:
+            default_storage.save(stored_name, ContentFile(b"image"))
+        return names
+
+    def process(self) -> tuple[int, int]:
+        """Runs one batch of the deletion worker."""
+
+        return MediaDeletionInterface.process_deletion_jobs(
+            batch_size=10, max_attempts=3, retry_backoff=timedelta(seconds=1)
+        )
+
+    def test_deletes_file_and_variants(self):
+        """A queued file that is no longer used is removed along with its variants."""
+
+        names = self.store("users/avatars/1.png")
+        MediaDeletionInterface.queue_deletion(["users/avatars/1.png"])
+
+        self.assertEqual(self.process(), (1, 0))
+        self.assertFalse(any(default_storage.exists(name) for name in names))
+        self.assertFalse(MediaDeletionJob.objects.exists())
+
+    def test_keeps_variants_of_live_image_with_other_extension(self):
+        """Deleting <id>.png leaves the variants of a referenced <id>.jpg alone."""
+
+        user = ThingbookerUser.objects.create(username="a@b.no", first_name="A")
+        live = f"users/avatars/{user.id}.jpg"
+        ThingbookerUser.objects.filter(pk=user.pk).update(avatar=live)
+        live_names = self.store(live)
+        old_names = self.store(f"users/avatars/{user.id}.png")
+        MediaDeletionInterface.queue_deletion([old_names[0]])
+
+        self.assertEqual(self.process(), (1, 0))
+        self.assertTrue(all(default_storage.exists(name) for name in live_names))
+        self.assertFalse(any(default_storage.exists(name) for name in old_names))
+
+    def test_keeps_file_that_is_used_again(self):
+        """A queued file that an image field uses again is not deleted."""
+
+        user = ThingbookerUser.objects.create(username="a@b.no", first_name="A")
+        ThingbookerUser.objects.filter(pk=user.pk).update(avatar="users/avatars/1.png")
+        names = self.store("users/avatars/1.png")
+        MediaDeletionInterface.queue_deletion(["users/avatars/1.png"])
+
+        self.assertEqual(self.process(), (1, 0))
+        self.assertTrue(all(default_storage.exists(name) for name in names))
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tests.utils import create_booking, create_thing, create_user
+from thingbooker.things.models import Booking
+from thingbooker.things.permissions import ThingAccess, get_thing_access
+
+
+class ThingAccessTests(TestCase):
+    """Tests for the things a user is a member or owner of."""
+
+    def setUp(self):
+        """Creates a thing with an owner and a member, and a thing of someone else."""
+
+        self.owner = create_user("owner@b.no")
+        self.member = create_user("member@b.no")
+        self.thing = create_thing(self.owner, self.member)
+        self.other_thing = create_thing(create_user("other@b.no"), name="Car")
+
+    def test_memberships(self):
+        """Owners and members are members, and only owners are owners."""
+
+        owner, member = ThingAccess(self.owner), ThingAccess(self.member)
+
+        self.assertTrue(owner.is_member(self.thing.pk))
+        self.assertTrue(owner.is_owner(self.thing.pk))
+        self.assertTrue(member.is_member(self.thing.pk))
+        self.assertFalse(member.is_owner(self.thing.pk))
+        self.assertFalse(member.is_member(self.other_thing.pk))
+
+    def test_cached_for_the_request(self):
+        """The memberships are fetched once per request and user."""
+
+        request = SimpleNamespace(user=self.member)
+
+        with self.assertNumQueries(1):
+            first = get_thing_access(request)
+            second = get_thing_access(request)
+
+        self.assertIs(first, second)
+
+        request.user = self.owner
+        with self.assertNumQueries(1):
+            self.assertTrue(get_thing_access(request).is_owner(self.thing.pk))
+
+
+class ObjectPermissionTests(TestCase):
+    """Tests for the object permissions of things and bookings through the API."""
+
+    def setUp(self):
+        """Creates a thing with an owner and a member, with a booking of each."""
+
+        self.owner = create_user("owner@b.no")
+        self.member = create_user("member@b.no")
+        self.thing = create_thing(self.owner, self.member)
+        self.owner_booking = create_booking(self.thing, self.owner, 0, 1)
+        self.member_booking = create_booking(self.thing, self.member, 2, 3)
+        self.client = APIClient()
+
+    def test_member_can_only_delete_own_bookings(self):
+        """A member can delete their own booking, but not the bookings of others."""
+
+        self.client.force_authenticate(self.member)
+
+        own = self.client.delete(f"/bookings/{self.member_booking.pk}/")
+        other = self.client.delete(f"/bookings/{self.owner_booking.pk}/")
+
+        self.assertEqual((own.status_code, other.status_code), (204, 403))
+
+    def test_owner_can_delete_all_bookings(self):
+        """The owner of the thing can delete the bookings of members."""
+
+        self.client.force_authenticate(self.owner)
+
+        response = self.client.delete(f"/bookings/{self.member_booking.pk}/")
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Booking.objects.filter(pk=self.member_booking.pk).exists())
+
+    def test_only_owner_can_change_the_thing(self):
+        """Members can see the thing, but only the owner can change it."""
+
+        self.client.force_authenticate(self.member)
+
+        self.assertEqual(self.client.get(f"/things/{self.thing.pk}/").status_code, 200)
+        response = self.client.patch(f"/things/{self.thing.pk}/", {"name": "Ship"}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_outsiders_cannot_see_the_thing(self):
+        """Users who are not members cannot see the thing or its bookings."""
+
+        self.client.force_authenticate(create_user("other@b.no"))
+
+        self.assertEqual(self.client.get(f"/things/{self.thing.pk}/").status_code, 404)
+        self.assertEqual(self.client.get(f"/bookings/{self.member_booking.pk}/").status_code, 404)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from tests.utils import create_user
+from thingbooker.users.interface import ThingbookerGroupInterface
+from thingbooker.users.models import AcceptInviteToken
+
+
+class PruneTokensTests(TestCase):
+    """Tests for the prune_tokens management command."""
+
+    def setUp(self):
+        """Creates expired, used and pending invite tokens, and expired and valid JWT tokens."""
+
+        user = create_user("a@b.no")
+        group = ThingbookerGroupInterface.create_with_group(name="Group", owner=user)
+        now = timezone.now()
+
+        tokens = []
+        for _ in range(5):
+            tokens.append(AcceptInviteToken(user=user, group=group, expires_at=now - timedelta(1)))
+            tokens.append(AcceptInviteToken(user=user, group=group, used_at=now))
+        tokens.append(AcceptInviteToken(user=user, group=group))
+        for token in tokens:
+            token.set_defaults()
+        AcceptInviteToken.objects.bulk_create(tokens)
+        self.pending = tokens[-1]
+
+        for i in range(3):
+            expired = OutstandingToken.objects.create(
+                user=user, jti=f"expired{i}", token="-", expires_at=now - timedelta(1)
+            )
+            BlacklistedToken.objects.create(token=expired)
+        self.valid = OutstandingToken.objects.create(
+            user=user, jti="valid", token="-", expires_at=now + timedelta(1)
+        )
+
+    def test_prunes_in_chunks(self):
+        """Expired and used tokens are deleted over several chunks, and others are kept."""
+
+        out = StringIO()
+        call_command("prune_tokens", "--chunk-size", "3", stdout=out)
+
+        self.assertEqual(
+            list(AcceptInviteToken.objects.values_list("pk", flat=True)), [self.pending.pk]
+        )
+        self.assertEqual(list(OutstandingToken.objects.all()), [self.valid])
+        self.assertFalse(BlacklistedToken.objects.exists())
+        self.assertIn("Deleted 10 invite token(s)", out.getvalue())
+        # the blacklist entries are deleted with their outstanding tokens, and counted
+        self.assertIn("Deleted 6 outstanding and blacklisted JWT token(s)", out.getvalue())
+
+    def test_nothing_to_prune(self):
+        """Running it again deletes nothing."""
+
+        call_command("prune_tokens", stdout=StringIO())
+        out = StringIO()
+        call_command("prune_tokens", stdout=out)
+
+        self.assertIn("Deleted 0 invite token(s)", out.getvalue())
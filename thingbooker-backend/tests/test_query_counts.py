@@ -0,0 +1,64 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tests.utils import create_booking, create_thing, create_user
+from thingbooker.things.interface import ThingInterface
+from thingbooker.users.interface import ThingbookerGroupInterface
+
+# the number of queries per list, including the ones for the conditional GET validators
+QUERY_COUNTS = {"/things/": 8, "/bookings/": 2, "/rules/": 1, "/groups/": 4, "/accounts/": 2}
+
+
+class ListQueryCountTests(TestCase):
+    """The number of queries of the list endpoints does not grow with the number of rows."""
+
+    def setUp(self):
+        """Creates the user the lists are fetched for."""
+
+        self.user = create_user("user@b.no")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.rows = 0
+
+    def add_rows(self, count: int) -> None:
+        """Adds count things with members, rules and bookings, and groups with members."""
+
+        for _ in range(count):
+            self.rows += 1
+            other = create_user(f"other{self.rows}@b.no")
+            thing = create_thing(self.user, other, name=f"Thing {self.rows}")
+            ThingInterface.create_rules(thing, [{"short": "Rule", "description": "-"}] * 2)
+            create_booking(thing, other, 0, 1)
+            create_booking(thing, self.user, 2, 3)
+            group = ThingbookerGroupInterface.create_with_group(
+                name=f"Group {self.rows}", owner=self.user
+            )
+            group.members.add(other)
+
+    def assert_query_counts(self) -> None:
+        """Fetches each list, and checks its number of queries."""
+
+        for url, count in QUERY_COUNTS.items():
+            with self.subTest(url=url, rows=self.rows), self.assertNumQueries(count):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_query_count_is_constant(self):
+        """The lists take the same number of queries for 2 and for 12 rows of each kind."""
+
+        self.add_rows(2)
+        self.assert_query_counts()
+        self.add_rows(10)
+        self.assert_query_counts()
+
+    def test_accounts_link_to_groups(self):
+        """The prefetched groups give the same links as the groups of the user."""
+
+        self.add_rows(2)
+
+        response = self.client.get("/accounts/")
+        account = next(a for a in response.json() if a["id"] == str(self.user.pk))
+        self.assertEqual(
+            account["thingbooker_groups"],
+            [f"http://testserver/groups/{group.pk}/" for group in self.user.thingbooker_groups],
+        )
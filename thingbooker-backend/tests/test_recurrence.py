@@ -0,0 +1,175 @@
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from thingbooker.mail.models import OutgoingEmail
+from thingbooker.things.models import Booking, Thing
+from thingbooker.things.recurrence import expand, parse_rrule
+from thingbooker.users.models import ThingbookerUser
+
+# a friday
+START = datetime(2026, 10, 23, 18, tzinfo=UTC)
+END = START + timedelta(hours=3)
+
+
+def get_starts(rule: str, start: datetime = START, end: datetime = END) -> list[datetime]:
+    """Expands the rule and returns the start of each occurrence."""
+
+    return [occurrence[0] for occurrence in expand(parse_rrule(rule), start, end, 200)]
+
+
+class ParseRruleTests(SimpleTestCase):
+    """Tests for parsing recurrence rules."""
+
+    def test_parses_supported_parts(self):
+        """All supported parts are parsed, and an RRULE: prefix is allowed."""
+
+        rule = parse_rrule("RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=FR,MO;COUNT=4")
+        self.assertEqual(rule.freq, "WEEKLY")
+        self.assertEqual(rule.interval, 2)
+        self.assertEqual(rule.count, 4)
+        self.assertEqual(rule.by_day, (0, 4))
+
+    def test_rejects_invalid_rules(self):
+        """Unsupported or incomplete rules raise ValueError."""
+
+        for rule in [
+            "FREQ=YEARLY;COUNT=2",
+            "FREQ=DAILY",
+            "FREQ=DAILY;COUNT=2;UNTIL=20270101",
+            "FREQ=DAILY;BYDAY=MO;COUNT=2",
+            "FREQ=WEEKLY;BYDAY=XX;COUNT=1",
+            "FREQ=DAILY;COUNT=0",
+            "FREQ=DAILY;COUNT=2;COUNT=3",
+            "FREQ=DAILY;BYHOUR=2;COUNT=2",
+        ]:
+            with self.subTest(rule=rule), self.assertRaises(ValueError):
+                parse_rrule(rule)
+
+
+class ExpandTests(SimpleTestCase):
+    """Tests for expanding recurrence rules into occurrences."""
+
+    def test_weekly_by_day(self):
+        """Weekly rules with BYDAY start with the first occurrence and follow the weekdays."""
+
+        self.assertEqual(
+            get_starts("FREQ=WEEKLY;BYDAY=MO,FR;UNTIL=20261102"),
+            [
+                START,
+                START + timedelta(days=3),
+                START + timedelta(days=7),
+                START + timedelta(days=10),
+            ],
+        )
+
+    def test_daily_interval(self):
+        """INTERVAL skips periods."""
+
+        self.assertEqual(
+            get_starts("FREQ=DAILY;INTERVAL=2;COUNT=3"),
+            [START, START + timedelta(days=2), START + timedelta(days=4)],
+        )
+
+    def test_monthly_skips_missing_days(self):
+        """Monthly rules skip months that do not have the day of the first occurrence."""
+
+        start = datetime(2026, 1, 31, tzinfo=UTC)
+        self.assertEqual(
+            get_starts("FREQ=MONTHLY;COUNT=3", start, start + timedelta(hours=1)),
+            [start, datetime(2026, 3, 31, tzinfo=UTC), datetime(2026, 5, 31, tzinfo=UTC)],
+        )
+
+    @override_settings(TIME_ZONE="Europe/Oslo")
+    def test_keeps_wall_clock_time_across_daylight_saving(self):
+        """Occurrences keep the local time when daylight saving time ends."""
+
+        oslo = ZoneInfo("Europe/Oslo")
+        start = datetime(2026, 10, 23, 18, tzinfo=oslo)
+        starts = get_starts("FREQ=WEEKLY;COUNT=2", start, start + timedelta(hours=1))
+        self.assertEqual([timezone.localtime(s).hour for s in starts], [18, 18])
+        self.assertEqual(
+            starts[1].astimezone(UTC) - starts[0].astimezone(UTC), timedelta(days=7, hours=1)
+        )
+
+    def test_rejects_too_many_occurrences(self):
+        """More occurrences than the limit raise ValueError."""
+
+        with self.assertRaisesMessage(ValueError, "more than 200"):
+            get_starts("FREQ=DAILY;COUNT=201")
+
+    def test_rejects_overlapping_occurrences(self):
+        """Occurrences that overlap each other raise ValueError."""
+
+        with self.assertRaisesMessage(ValueError, "overlap"):
+            get_starts("FREQ=DAILY;COUNT=3", START, START + timedelta(days=2))
+
+    def test_rejects_until_before_start(self):
+        """A rule that ends before the first occurrence gives no occurrences."""
+
+        with self.assertRaisesMessage(ValueError, "no occurrences"):
+            get_starts("FREQ=DAILY;UNTIL=20200101")
+
+    def test_rejects_intervals_past_the_latest_date(self):
+        """A huge INTERVAL raises ValueError instead of OverflowError."""
+
+        for rule in [
+            "FREQ=DAILY;INTERVAL=999999999;COUNT=3",
+            "FREQ=WEEKLY;INTERVAL=99999999;COUNT=3",
+            "FREQ=MONTHLY;INTERVAL=999999999;COUNT=3",
+        ]:
+            with self.subTest(rule=rule), self.assertRaisesMessage(ValueError, "latest"):
+                get_starts(rule)
+
+
+class AddRecurringBookingTests(TestCase):
+    """Tests for the add-recurring-booking action."""
+
+    def setUp(self):
+        """Creates a thing and an authenticated client for one of its members."""
+
+        self.user = ThingbookerUser.objects.create(username="a@b.no", first_name="A")
+        self.other = ThingbookerUser.objects.create(username="c@d.no", first_name="C")
+        self.thing = Thing.objects.create(name="Boat", description="A boat", owner=self.other)
+        self.thing.members.add(self.user, self.other)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.start = (timezone.now() + timedelta(days=2)).replace(microsecond=0)
+
+    def post(self, recurrence: str):
+        """Posts a recurring booking of three hours with the given rule."""
+
+        return self.client.post(
+            f"/things/{self.thing.pk}/add-recurring-booking/",
+            {
+                "start_date": self.start.isoformat(),
+                "end_date": (self.start + timedelta(hours=3)).isoformat(),
+                "num_people": 1,
+                "recurrence": recurrence,
+            },
+            format="json",
+        )
+
+    def test_creates_all_occurrences_and_notifies_owner_once(self):
+        """Each occurrence becomes a waiting booking, with a single mail to the owner."""
+
+        response = self.post("FREQ=WEEKLY;COUNT=4")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Booking.objects.filter(thing=self.thing).count(), 4)
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+
+    def test_rejects_invalid_rules_without_side_effects(self):
+        """Rules without occurrences or with huge intervals give 400, not bookings or errors."""
+
+        for recurrence in ["FREQ=DAILY;UNTIL=20200101", "FREQ=DAILY;INTERVAL=999999999;COUNT=3"]:
+            with self.subTest(recurrence=recurrence):
+                response = self.post(recurrence)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("recurrence", response.json())
+
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(OutgoingEmail.objects.exists())
@@ -0,0 +1,88 @@
+import importlib.util
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from thingbooker.settings import settings as settings_module
+from thingbooker.things.cache import thing_responses
+from thingbooker.things.interface import ThingInterface
+from thingbooker.things.models import Rule, Thing
+from thingbooker.users.models import ThingbookerUser
+
+
+class ThingResponseCacheTests(TestCase):
+    """Tests for the cached rule and booking responses of a thing."""
+
+    def setUp(self):
+        """Creates a thing with a rule, and a client for its owner."""
+
+        self.user = ThingbookerUser.objects.create(username="a@b.no", first_name="A")
+        self.thing = Thing.objects.create(name="Boat", description="A boat", owner=self.user)
+        self.thing.members.add(self.user)
+        ThingInterface.create_rules(self.thing, [{"short": "old", "description": "-"}])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f"/things/{self.thing.pk}/all-rules//"
+
+    def test_repeated_requests_hit_the_cache(self):
+        """The second identical request is served from the cache."""
+
+        hits = thing_responses.stats()["hits"]
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(thing_responses.stats()["hits"], hits + 1)
+
+    def test_change_without_local_bump_is_not_served_stale(self):
+        """A change whose version bump this process never saw still gives the new body."""
+
+        first = self.client.get(self.url)
+        # like a change made by another worker, which only bumps the version in its own cache
+        Rule.objects.filter(thing=self.thing).update(short="new", updated_at=timezone.now())
+        second = self.client.get(self.url)
+
+        self.assertNotEqual(first["ETag"], second["ETag"])
+        self.assertEqual([rule["short"] for rule in second.json()], ["new"])
+
+    def test_not_modified(self):
+        """A client with the current ETag gets 304."""
+
+        etag = self.client.get(self.url)["ETag"]
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class CacheSettingsTests(SimpleTestCase):
+    """Tests for the cache settings of the configured backends."""
+
+    def get_cache_settings(self, backend: str) -> dict:
+        """Evaluates a fresh copy of the settings with the given cache backend."""
+
+        spec = importlib.util.spec_from_file_location("cache_settings", settings_module.__file__)
+        module = importlib.util.module_from_spec(spec)
+        with mock.patch.dict(os.environ, {"CACHE_BACKEND": backend}):
+            spec.loader.exec_module(module)
+        return module.CACHES["default"]
+
+    def test_culled_backends_get_the_limits(self):
+        """The local memory and file based caches are limited to CACHE_MAX_ENTRIES."""
+
+        for backend in [
+            "thingbooker.cache_backends.CountingLocMemCache",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ]:
+            options = self.get_cache_settings(backend)["OPTIONS"]
+            self.assertEqual(options["MAX_ENTRIES"], options["CULL_FREQUENCY"])
+
+    def test_external_backends_get_no_limits(self):
+        """Redis and Memcached are not given options their clients do not accept."""
+
+        for backend in [
+            "django.core.cache.backends.redis.RedisCache",
+            "django.core.cache.backends.memcached.PyMemcacheCache",
+        ]:
+            self.assertNotIn("OPTIONS", self.get_cache_settings(backend))
@@ -0,0 +1,75 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from thingbooker.things.interface import ThingInterface
+from thingbooker.things.models import Rule, Thing
+from thingbooker.users.models import ThingbookerUser
+
+
+class RuleTests(TestCase):
+    """Tests for creating and ordering the rules of a thing."""
+
+    def setUp(self):
+        """Creates a thing owned by an authenticated user."""
+
+        self.user = ThingbookerUser.objects.create(username="a@b.no", first_name="A")
+        self.thing = Thing.objects.create(name="Boat", description="A boat", owner=self.user)
+        self.thing.members.add(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_rules(self, *shorts: str) -> list[Rule]:
+        """Creates rules with the given short descriptions."""
+
+        return ThingInterface.create_rules(
+            self.thing, [{"short": short, "description": "-"} for short in shorts]
+        )
+
+    def get_shorts(self) -> list[str]:
+        """Returns the short descriptions of the rules, in order."""
+
+        return list(self.thing.rules.values_list("short", flat=True))
+
+    def test_creates_rules_in_order(self):
+        """Rules are created in the order they are given."""
+
+        self.create_rules("a", "b", "c")
+        self.assertEqual(self.get_shorts(), ["a", "b", "c"])
+        self.assertEqual(list(self.thing.get_rule_order()), [r.pk for r in self.thing.rules.all()])
+
+    def test_new_rules_come_after_a_gap(self):
+        """After a rule is deleted, new rules still come after the remaining ones."""
+
+        first, _, _ = self.create_rules("a", "b", "c")
+        first.delete()
+        self.create_rules("d")
+
+        self.assertEqual(self.get_shorts(), ["b", "c", "d"])
+        self.assertEqual(self.thing.rules.filter(_order=2).count(), 1)
+
+    def test_reorder_rules(self):
+        """The rules can be put in any order that lists each rule once."""
+
+        rules = self.create_rules("a", "b", "c")
+        ids = [str(rule.pk) for rule in rules]
+
+        response = self.client.post(
+            f"/things/{self.thing.pk}/reorder-rules/", {"rules": ids[::-1]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_shorts(), ["c", "b", "a"])
+
+    def test_reorder_rules_requires_all_rules(self):
+        """A missing or repeated rule is rejected and the order is kept."""
+
+        rules = self.create_rules("a", "b", "c")
+        ids = [str(rule.pk) for rule in rules]
+
+        for rule_ids in [ids[:2], [*ids[:2], ids[0]]]:
+            with self.subTest(rule_ids=rule_ids):
+                response = self.client.post(
+                    f"/things/{self.thing.pk}/reorder-rules/", {"rules": rule_ids}, format="json"
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.get_shorts(), ["a", "b", "c"])
@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.template import TemplateDoesNotExist
+from django.test import SimpleTestCase, override_settings
+
+from thingbooker.mail import template_registry
+from thingbooker.mail.interface import EmailInterface
+from thingbooker.mail.template_registry import MailTemplateRegistry
+
+MISSING = "mail/does_not_exist.html"
+
+
+class MailTemplateRegistryTests(SimpleTestCase):
+    """Tests for the registry of compiled mail templates."""
+
+    def setUp(self):
+        """Creates an empty registry, and counts the templates loaded through Django."""
+
+        self.registry = MailTemplateRegistry(prefix="mail/")
+        patcher = mock.patch.object(
+            template_registry, "get_template", wraps=template_registry.get_template
+        )
+        self.get_template = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_preload(self):
+        """All templates under the prefix are compiled up front."""
+
+        loaded = self.registry.preload()
+        self.get_template.reset_mock()
+
+        template = self.registry.get("mail/things/notify_booking_status_changed.txt")
+
+        self.assertEqual(loaded, 8)
+        self.assertIsNotNone(template)
+        self.get_template.assert_not_called()
+        self.assertEqual(self.registry.stats()["templates"], 8)
+
+    def test_templates_are_compiled_once(self):
+        """A template is only loaded on the first lookup."""
+
+        first = self.registry.get("mail/invite_user_to_group.txt")
+        second = self.registry.get("mail/invite_user_to_group.txt")
+
+        self.assertIs(first, second)
+        self.assertEqual(self.get_template.call_count, 1)
+        self.assertEqual(
+            self.registry.stats(), {"hits": 1, "misses": 1, "templates": 1, "missing": 0}
+        )
+
+    def test_missing_templates_are_remembered(self):
+        """A template that does not exist is only looked up once."""
+
+        self.assertIsNone(self.registry.get(MISSING))
+        self.assertIsNone(self.registry.get(MISSING))
+
+        self.assertEqual(self.get_template.call_count, 1)
+        self.assertEqual(self.registry.stats()["missing"], 1)
+
+    @override_settings(DEBUG=True)
+    def test_bypassed_in_debug(self):
+        """Templates are loaded on every lookup when DEBUG is on."""
+
+        self.registry.get("mail/invite_user_to_group.txt")
+        self.registry.get("mail/invite_user_to_group.txt")
+
+        self.assertEqual(self.get_template.call_count, 2)
+        self.assertEqual(self.registry.stats()["templates"], 0)
+
+    def test_clear(self):
+        """Clearing forgets the templates and resets the counters."""
+
+        self.registry.get(MISSING)
+        self.registry.clear()
+
+        self.assertEqual(
+            self.registry.stats(), {"hits": 0, "misses": 0, "templates": 0, "missing": 0}
+        )
+
+    def test_mail_without_txt_template(self):
+        """Queueing a mail requires the txt version of the template."""
+
+        with self.assertRaises(TemplateDoesNotExist):
+            EmailInterface._get_templates("does_not_exist")
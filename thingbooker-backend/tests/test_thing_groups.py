@@ -0,0 +1,90 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tests.utils import create_user
+from thingbooker.things.models import Thing
+from thingbooker.users.interface import ThingbookerGroupInterface
+
+
+class ThingGroupTests(TestCase):
+    """Tests for sharing things with a group and keeping their members in sync."""
+
+    def setUp(self):
+        """Creates two groups of the owner, with different members."""
+
+        self.owner = create_user("owner@b.no")
+        self.a, self.b, self.c = create_user("a@b.no"), create_user("b@b.no"), create_user("c@b.no")
+        self.family = ThingbookerGroupInterface.create_with_group(name="Family", owner=self.owner)
+        self.family.members.add(self.a, self.b)
+        self.friends = ThingbookerGroupInterface.create_with_group(name="Friends", owner=self.owner)
+        self.friends.members.add(self.b, self.c)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(
+            "/things/",
+            {"name": "Boat", "description": "A boat", "group": str(self.family.pk)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.thing = Thing.objects.get(name="Boat")
+
+    def get_members(self) -> set[str]:
+        """Returns the usernames of the members of the thing."""
+
+        return set(self.thing.members.values_list("username", flat=True))
+
+    def test_members_of_the_group_are_added(self):
+        """A thing shared with a group gets the group's members."""
+
+        self.assertEqual(self.get_members(), {"owner@b.no", "a@b.no", "b@b.no"})
+
+    def test_users_that_join_or_leave_the_group(self):
+        """Joining the group adds the user to the thing, and leaving removes them."""
+
+        self.family.members.add(self.c)
+        self.assertIn("c@b.no", self.get_members())
+
+        self.a.groups.remove(self.family.group)
+        self.assertNotIn("a@b.no", self.get_members())
+
+    def test_owner_is_never_removed(self):
+        """The owner stays a member when they leave the group."""
+
+        self.family.members.remove(self.owner)
+
+        self.assertIn("owner@b.no", self.get_members())
+
+    def test_changing_the_group(self):
+        """Members of the old group are replaced, except those that are also in the new one."""
+
+        response = self.client.patch(
+            f"/things/{self.thing.pk}/",
+            {"group": f"http://testserver/groups/{self.friends.pk}/"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_members(), {"owner@b.no", "b@b.no", "c@b.no"})
+
+    def test_removing_the_group(self):
+        """A thing that is no longer shared keeps only the owner."""
+
+        response = self.client.patch(f"/things/{self.thing.pk}/", {"group": None}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_members(), {"owner@b.no"})
+
+    def test_can_only_share_with_own_groups(self):
+        """A user cannot share a thing with a group they are not a member of."""
+
+        self.client.force_authenticate(self.c)
+
+        response = self.client.post(
+            "/things/",
+            {"name": "Car", "description": "A car", "group": str(self.family.pk)},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("group", response.json())
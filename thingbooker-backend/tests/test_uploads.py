@@ -0,0 +1,122 @@
+import tempfile
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.client import RequestFactory
+from PIL import Image
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from thingbooker.media.uploadhandlers import ImageUploadHandler, get_image_probe
+from thingbooker.users.models import ThingbookerGroup, ThingbookerUser
+
+
+def make_image(image_format: str, size: tuple[int, int] = (40, 30)) -> bytes:
+    """Returns an encoded image in the given Pillow format."""
+
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+class ImageUploadHandlerTests(SimpleTestCase):
+    """Tests for the upload handler that checks images while they are received."""
+
+    def setUp(self):
+        """Creates a request for the handler."""
+
+        self.request = RequestFactory().post("/")
+
+    def upload(self, field_name: str, file_name: str, data: bytes, chunk_size: int = 1024):
+        """Feeds the data to a new handler in chunks, like the multipart parser does."""
+
+        handler = ImageUploadHandler(self.request)
+        handler.new_file(field_name, file_name, "application/octet-stream", None)
+        for start in range(0, len(data), chunk_size):
+            chunk = data[start : start + chunk_size]
+            self.assertEqual(handler.receive_data_chunk(chunk, start), chunk)
+        handler.file_complete(len(data))
+
+    def test_probes_allowed_image(self):
+        """An allowed image is passed on, and its format and dimensions are stored."""
+
+        self.upload("picture", "boat.jpg", make_image("JPEG"))
+
+        probe = get_image_probe(self.request, "picture")
+        self.assertEqual((probe.format, probe.width, probe.height), ("JPEG", 40, 30))
+
+    def test_rejects_extension_that_does_not_match_format(self):
+        """A PNG named .jpg is rejected."""
+
+        with self.assertRaisesMessage(serializers.ValidationError, "does not match"):
+            self.upload("avatar", "me.jpg", make_image("PNG"))
+
+    def test_rejects_unsupported_format(self):
+        """Formats that are not in IMAGE_UPLOAD_FORMATS are rejected."""
+
+        with self.assertRaisesMessage(serializers.ValidationError, "Unsupported image format"):
+            self.upload("avatar", "me.bmp", make_image("BMP"))
+
+    def test_rejects_files_that_are_not_images(self):
+        """A file in an image field that Pillow does not recognize is rejected."""
+
+        with self.assertRaisesMessage(serializers.ValidationError, "Upload a valid image"):
+            self.upload("group_picture", "group.png", b"not an image")
+
+    @override_settings(MEGABYTE_LIMIT=0.01)
+    def test_rejects_oversized_image(self):
+        """An image is rejected as soon as it passes the limit."""
+
+        with self.assertRaisesMessage(serializers.ValidationError, "max file size"):
+            self.upload("picture", "boat.png", make_image("PNG") + bytes(20 * 1024))
+
+    @override_settings(MEGABYTE_LIMIT=0.01)
+    def test_ignores_other_fields(self):
+        """Files in fields that do not take images are neither limited nor probed."""
+
+        self.upload("attachment", "notes.txt", bytes(20 * 1024))
+
+        self.assertIsNone(get_image_probe(self.request, "attachment"))
+
+
+class ImageUploadTests(TestCase):
+    """Tests for image uploads through the API."""
+
+    def setUp(self):
+        """Stores files in a temporary media root, and creates an authenticated client."""
+
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(ThingbookerUser.objects.create(username="a@b.no"))
+
+    def create_group(self, file_name: str, data: bytes):
+        """Creates a group with the given group picture."""
+
+        return self.client.post(
+            "/groups/",
+            {"name": "Group", "group_picture": SimpleUploadedFile(file_name, data)},
+            format="multipart",
+        )
+
+    def test_accepts_valid_image(self):
+        """A valid image is stored."""
+
+        response = self.create_group("group.png", make_image("PNG"))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(ThingbookerGroup.objects.get().group_picture)
+
+    def test_rejects_mismatched_image(self):
+        """An image with the wrong extension gives 400 for the field."""
+
+        response = self.create_group("group.png", make_image("JPEG"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("group_picture", response.json())
+        self.assertFalse(ThingbookerGroup.objects.exists())
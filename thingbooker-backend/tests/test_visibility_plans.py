@@ -0,0 +1,189 @@
+"""
+Checks the query plans of the visibility filters on a seeded database.
+
+Things and rules are filtered with EXISTS on the membership table instead of joining through
+the members relation, so their plans must not contain joins, and should look memberships up by
+index. Bookings are the union of the bookings the user made and the bookings of their things,
+so each branch must be answered by its own index instead of testing every booking.
+
+The bookings are seeded with one INSERT ... SELECT, as creating model instances would take too
+long. The full million bookings are seeded when the THINGBOOKER_BENCHMARK environment variable
+is set, otherwise a tenth of them. The proportions are the same, so a user can see about 150
+bookings either way.
+"""
+
+import os
+import re
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from tests.utils import BASE_TIME, create_user
+from thingbooker.things.interface import ThingInterface
+from thingbooker.things.models import Booking, Rule, Thing
+from thingbooker.users.models import ThingbookerUser
+
+# seeding a million bookings takes about two minutes, so it is only done for benchmark runs
+BOOKINGS = 1_000_000 if os.environ.get("THINGBOOKER_BENCHMARK") else 100_000
+BOOKINGS_PER_THING = 100
+THINGS = BOOKINGS // BOOKINGS_PER_THING
+# each user makes 50 bookings and is a member of one thing on average
+USERS = BOOKINGS // 50
+MEMBERS_PER_THING = 2
+RULES = THINGS * 2
+
+MEMBERSHIP_INDEX = re.compile(r"Index (Only )?Scan (using|on) things_thing_members_\w+")
+BOOKER_INDEX = re.compile(r"Index (Only )?Scan (using|on) things_booking_booker_id_\w+")
+THING_INDEX = re.compile(
+    r"Index (Only )?Scan (using|on) (things_booking_thing_id_\w+|booking_thing_)"
+)
+
+
+@skipUnless(connection.vendor == "postgresql", "The plans are specific to Postgres")
+class VisibilityPlanTests(TestCase):
+    """Tests for the plans of ThingInterface.get_visible_things, bookings and rules."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Seeds the bookings and updates the statistics.
+
+        The regular user is like most users, a member of one thing and the booker of 50
+        bookings. The selective user is a member of a single thing and has only made a few
+        bookings on it.
+        """
+
+        users = ThingbookerUser.objects.bulk_create(
+            ThingbookerUser(
+                username=f"user{i}@b.no",
+                first_name=f"User {i}",
+                created_at=BASE_TIME,
+                updated_at=BASE_TIME,
+            )
+            for i in range(USERS)
+        )
+        things = Thing.objects.bulk_create(
+            Thing(
+                name=f"Thing {i}",
+                description="-",
+                owner=users[i % USERS],
+                created_at=BASE_TIME,
+                updated_at=BASE_TIME,
+            )
+            for i in range(THINGS)
+        )
+        Thing.members.through.objects.bulk_create(
+            Thing.members.through(thing_id=thing.pk, thingbookeruser_id=users[(i + k) % USERS].pk)
+            for i, thing in enumerate(things)
+            for k in range(MEMBERS_PER_THING)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO things_booking (
+                    id, created_at, updated_at, thing_id, booker_id, num_people, status,
+                    start_date, end_date, is_shared
+                )
+                SELECT
+                    gen_random_uuid(), %(now)s, %(now)s,
+                    (%(things)s::uuid[])[1 + i %% %(thing_count)s],
+                    (%(users)s::uuid[])[1 + i %% %(user_count)s],
+                    1, 'waiting',
+                    %(now)s + i * interval '1 minute',
+                    %(now)s + i * interval '1 minute' + interval '30 seconds',
+                    false
+                FROM generate_series(0, %(bookings)s - 1) AS i
+                """,
+                {
+                    "now": BASE_TIME,
+                    "things": [thing.pk for thing in things],
+                    "thing_count": THINGS,
+                    "users": [user.pk for user in users],
+                    "user_count": USERS,
+                    "bookings": BOOKINGS,
+                },
+            )
+        Rule.objects.bulk_create(
+            Rule(
+                thing=things[i % THINGS],
+                short="Rule",
+                description="-",
+                _order=i,
+                created_at=BASE_TIME,
+                updated_at=BASE_TIME,
+            )
+            for i in range(RULES)
+        )
+
+        cls.user = users[0]
+        cls.thing = things[1]
+        cls.selective_user = create_user("selective@b.no")
+        things[2].members.add(cls.selective_user)
+        Booking.objects.bulk_create(
+            Booking(
+                thing=things[2],
+                booker=cls.selective_user,
+                start_date=BASE_TIME - timedelta(days=i + 1),
+                end_date=BASE_TIME - timedelta(days=i + 1) + timedelta(hours=1),
+                created_at=BASE_TIME,
+                updated_at=BASE_TIME,
+            )
+            for i in range(5)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assert_uses_exists(self, plan: str) -> None:
+        """Checks that memberships are looked up with an indexed subquery, not joined."""
+
+        self.assertTrue("SubPlan" in plan or "Semi Join" in plan, plan)
+        self.assertNotRegex(plan, r"(Hash|Merge|Nested Loop) Join", plan)
+        self.assertRegex(plan, MEMBERSHIP_INDEX, plan)
+
+    def assert_bookings_by_index(self, plan: str) -> None:
+        """Checks that both branches of the visible bookings are answered by an index."""
+
+        self.assertNotIn("Seq Scan on things_booking", plan)
+        self.assertRegex(plan, BOOKER_INDEX, plan)
+        self.assertRegex(plan, MEMBERSHIP_INDEX, plan)
+        self.assertRegex(plan, THING_INDEX, plan)
+
+    def test_visible_things(self):
+        """Things are filtered with EXISTS on the membership table."""
+
+        self.assert_uses_exists(ThingInterface.get_visible_things(self.user).explain())
+
+    def test_visible_bookings_page(self):
+        """The first page of bookings is built from the two branches, not from every booking."""
+
+        bookings = ThingInterface.get_visible_bookings(self.user).order_by("start_date", "id")
+        plan = bookings[:50].explain()
+
+        self.assert_bookings_by_index(plan)
+        self.assertNotIn("booking_start_id_idx", plan)
+
+    def test_visible_bookings_page_of_selective_user(self):
+        """A user who can see a few bookings only reads those bookings."""
+
+        bookings = ThingInterface.get_visible_bookings(self.selective_user)
+        plan = bookings.order_by("start_date", "id")[:50].explain()
+
+        self.assert_bookings_by_index(plan)
+        self.assertNotIn("booking_start_id_idx", plan)
+        self.assertEqual(bookings.count(), BOOKINGS_PER_THING + 5)
+
+    def test_visible_bookings_of_a_thing(self):
+        """The bookings of one thing are found through an index on the thing."""
+
+        plan = ThingInterface.get_visible_bookings(self.user).filter(thing=self.thing).explain()
+
+        self.assertNotIn("Seq Scan on things_booking", plan)
+        self.assertRegex(plan, THING_INDEX, plan)
+
+    def test_visible_rules(self):
+        """Rules are filtered with EXISTS on the things and the membership table."""
+
+        self.assert_uses_exists(ThingInterface.get_visible_rules(self.user).explain())
@@ -0,0 +1,62 @@
+"""Helpers for creating the objects the tests need."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from django.utils import timezone
+
+from thingbooker.things.enums import BookingStatusEnum
+from thingbooker.things.models import Booking, Thing
+from thingbooker.users.models import ThingbookerUser
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+# a whole hour a day ahead, so bookings relative to it are in the future
+BASE_TIME = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+
+
+def create_user(username: str, **fields) -> ThingbookerUser:
+    """Creates a user with the given username."""
+
+    fields.setdefault("first_name", username)
+    return ThingbookerUser.objects.create(username=username, **fields)
+
+
+def create_thing(owner: ThingbookerUser, *members: ThingbookerUser, **fields) -> Thing:
+    """Creates a thing, with the owner and the given users as members."""
+
+    fields.setdefault("name", "Boat")
+    fields.setdefault("description", "A boat")
+    thing = Thing.objects.create(owner=owner, **fields)
+    thing.members.add(owner, *members)
+    return thing
+
+
+def hours(value: float) -> datetime:
+    """Returns the time the given number of hours after BASE_TIME."""
+
+    return BASE_TIME + timedelta(hours=value)
+
+
+def create_booking(
+    thing: Thing,
+    booker: ThingbookerUser,
+    start: float,
+    end: float,
+    status: BookingStatusEnum = BookingStatusEnum.WAITING,
+    num_people: int = 1,
+) -> Booking:
+    """Creates a booking from start to end hours after BASE_TIME."""
+
+    return Booking.objects.create(
+        thing=thing,
+        booker=booker,
+        start_date=hours(start),
+        end_date=hours(end),
+        status=status,
+        num_people=num_people,
+        is_shared=thing.capacity is not None,
+    )
@@ -0,0 +1,116 @@
+"""This contains base classes and mixins used by the views in the app."""
+
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING
+
+from django.db.models import Count, Max
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+if TYPE_CHECKING:
+    from django.db.models.query import QuerySet
+    from django.http import HttpResponseBase
+
+    from thingbooker.base_types import ThingbookerRequest
+
+
+class NotModified(Exception):
+    """Raised to short-circuit a request that can be answered with 304 Not Modified."""
+
+    def __init__(self, response: HttpResponseBase) -> None:
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Adds an ETag header to GET and HEAD requests, and answers 304 Not Modified before anything
+    is serialized when the client already has the current representation.
+
+    Views define get_conditional_querysets, which returns the querysets a response is built
+    from. The ETag is derived from max(updated_at) and the row count of each queryset, so both
+    changes and deletions change it. Querysets of models without updated_at, like many-to-many
+    through tables, use the highest primary key instead.
+
+    Last-Modified is not sent and If-Modified-Since is ignored. A timestamp cannot tell about
+    deleted rows or membership changes, and has a resolution of whole seconds, so it would give
+    stale 304 responses.
+    """
+
+    def get_conditional_querysets(self) -> list[QuerySet] | None:
+        """Returns the querysets the response depends on, or None to skip conditional GET."""
+
+        return None
+
+    def get_conditional_object(self):
+        """
+        Fetches and checks permissions for the object like get_object, but without the
+        prefetches that are only needed when the object is serialized.
+        """
+
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    def get_conditional_etag(self, request: ThingbookerRequest) -> str | None:
+        """Computes the ETag for the current request."""
+
+        querysets = self.get_conditional_querysets()
+        if querysets is None:
+            return None
+
+        parts = [
+            request.get_host(),
+            request.get_full_path(),
+            str(request.user.pk),
+            getattr(request, "accepted_media_type", ""),
+        ]
+
+        for queryset in querysets:
+            model = queryset.model
+            has_updated_at = any(field.name == "updated_at" for field in model._meta.fields)
+            field = "updated_at" if has_updated_at else "pk"
+            result = queryset.order_by().aggregate(latest=Max(field), count=Count("pk"))
+            parts.append(f"{model._meta.label}:{result['count']}:{result['latest']}")
+
+        etag = hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:32]
+        return quote_etag(etag)
+
+    def initial(self, request: ThingbookerRequest, *args, **kwargs):
+        """Raises NotModified when the ETag matches the request headers."""
+
+        super().initial(request, *args, **kwargs)
+
+        self.conditional_etag = None
+        if request.method not in ("GET", "HEAD"):
+            return
+
+        etag = self.get_conditional_etag(request)
+        if etag is None:
+            return
+
+        self.conditional_etag = etag
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc: Exception):
+        """Returns the 304 response instead of treating NotModified as an error."""
+
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request: ThingbookerRequest, response, *args, **kwargs):
+        """Adds the ETag to successful responses."""
+
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, "conditional_etag", None)
+        if etag is not None and (200 <= response.status_code < 300 or response.status_code == 304):
+            response.headers.setdefault("ETag", etag)
+        return response
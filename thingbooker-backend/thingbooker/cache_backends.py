@@ -0,0 +1,28 @@
+"""This contains cache backends used in the app."""
+
+import threading
+
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class CountingLocMemCache(LocMemCache):
+    """
+    Local memory cache that counts how many entries have been evicted.
+
+    The local memory cache is already an LRU, reads move an entry to the end and culling
+    removes entries from the front. With CULL_FREQUENCY set to MAX_ENTRIES, one entry is evicted
+    at a time.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._evictions_lock = threading.Lock()
+        self.evictions = 0
+
+    def _cull(self):
+        """Evicts the least recently used entries, and counts them."""
+
+        size = len(self._cache)
+        super()._cull()
+        with self._evictions_lock:
+            self.evictions += size - len(self._cache)
@@ -0,0 +1,148 @@
+"""
+This contains the shared parts of the queued jobs, like the email outbox and media deletions.
+
+Jobs are rows with a status, the number of attempts, when the next attempt is due and the last
+error. Workers lock a batch of due jobs with SKIP LOCKED, so several of them can run at the same
+time, and failed jobs are retried with exponential backoff until they run out of attempts.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING, TypeVar
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.utils import timezone
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from datetime import datetime
+
+JobT = TypeVar("JobT", bound=models.Model)
+
+
+class QueuedJobInterface:
+    """Helper methods for processing queued jobs."""
+
+    QUEUED = "queued"
+    FAILED = "failed"
+
+    @classmethod
+    def register_failure(
+        cls,
+        job: models.Model,
+        error: Exception,
+        now: datetime,
+        max_attempts: int,
+        retry_backoff: timedelta,
+    ):
+        """Marks an attempt as failed, and either schedules a retry or gives up."""
+
+        job.last_error = str(error)
+        if job.attempts >= max_attempts:
+            job.status = cls.FAILED
+        else:
+            job.next_attempt_at = now + retry_backoff * 2 ** (job.attempts - 1)
+
+    @classmethod
+    def process_batch(
+        cls,
+        model: type[JobT],
+        batch_size: int,
+        process: Callable[[list[JobT], datetime], tuple[int, int]],
+    ) -> tuple[int, int]:
+        """
+        Locks a batch of due jobs and hands them to process, in one transaction.
+
+        The jobs are locked with SKIP LOCKED, so jobs held by other workers are left out of the
+        batch instead of waiting for them. Returns the result of process, or (0, 0) if no jobs
+        are due.
+        """
+
+        now = timezone.now()
+
+        with transaction.atomic():
+            jobs = list(
+                model.objects.select_for_update(skip_locked=True)
+                .filter(status=cls.QUEUED, next_attempt_at__lte=now)
+                .order_by("next_attempt_at")[:batch_size]
+            )
+            if not jobs:
+                return 0, 0
+
+            return process(jobs, now)
+
+
+class QueueWorkerCommand(BaseCommand):
+    """
+    Base for the management commands that drain a job queue.
+
+    Subclasses set settings_prefix to read the defaults from settings, like
+    <prefix>_BATCH_SIZE, and implement process_batch and get_report.
+    """
+
+    settings_prefix: str
+    batch_help = "Number of jobs processed per transaction."
+
+    def get_setting(self, name: str):
+        """Returns the worker setting with the given name."""
+
+        return getattr(settings, f"{self.settings_prefix}_{name}")
+
+    def add_arguments(self, parser):
+        """Adds arguments for batch size, polling interval and running once."""
+
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=self.get_setting("BATCH_SIZE"),
+            help=self.batch_help,
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=self.get_setting("POLL_INTERVAL"),
+            help="Seconds to wait before polling again when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue has been drained instead of polling for new jobs.",
+        )
+
+    def process_batch(
+        self, *, batch_size: int, max_attempts: int, retry_backoff: timedelta
+    ) -> tuple[int, int]:
+        """Processes one batch, and returns the number of processed and failed jobs."""
+
+        raise NotImplementedError
+
+    def get_report(self, done: int, failed: int) -> str:
+        """Returns the line written after a batch with jobs."""
+
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        """Processes batches until the queue is empty, then sleeps or exits."""
+
+        batch_size: int = options["batch_size"]
+        retry_backoff = timedelta(seconds=self.get_setting("RETRY_BACKOFF"))
+
+        while True:
+            done, failed = self.process_batch(
+                batch_size=batch_size,
+                max_attempts=self.get_setting("MAX_ATTEMPTS"),
+                retry_backoff=retry_backoff,
+            )
+            if done or failed:
+                self.stdout.write(self.get_report(done, failed))
+
+            if done + failed >= batch_size:
+                # there are probably more jobs waiting
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from thingbooker.mail.models import OutgoingEmail
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Admin for the email outbox"""
+
+    list_display = ["subject", "to_address", "status", "attempts", "next_attempt_at", "sent_at"]
+    list_filter = ["status"]
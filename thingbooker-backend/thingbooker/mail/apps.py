@@ -6,3 +6,10 @@ class MailConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "thingbooker.mail"
+
+    def ready(self) -> None:
+        """Compiles the mail templates up front"""
+
+        from thingbooker.mail.template_registry import mail_templates
+
+        mail_templates.preload()
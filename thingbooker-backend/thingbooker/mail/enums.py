@@ -0,0 +1,9 @@
+from django.db.models import TextChoices
+
+
+class OutgoingEmailStatusEnum(TextChoices):
+    """Enum for the delivery status of an email in the outbox"""
+
+    QUEUED = ("queued", "Email is waiting to be sent")
+    SENT = ("sent", "Email has been sent")
+    FAILED = ("failed", "Email could not be sent and will not be retried")
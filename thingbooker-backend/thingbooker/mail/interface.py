@@ -2,11 +2,17 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import get_connection
 from django.template import TemplateDoesNotExist
-from django.template.loader import get_template
+from django.utils import timezone
+
+from thingbooker.jobs import QueuedJobInterface
+from thingbooker.mail.enums import OutgoingEmailStatusEnum
+from thingbooker.mail.models import OutgoingEmail
+from thingbooker.mail.template_registry import mail_templates
 
 if TYPE_CHECKING:
+    from datetime import datetime, timedelta
     from typing import Any
 
     from django.template import Template
@@ -23,15 +29,16 @@ class EmailInterface:
 
         templates: dict[str, Template] = {}
 
-        txt_template: Template = get_template(cls.TEMPLATE_PREFIX + template_name + ".txt")
+        txt_name = cls.TEMPLATE_PREFIX + template_name + ".txt"
+        txt_template = mail_templates.get(txt_name)
+        if txt_template is None:
+            raise TemplateDoesNotExist(txt_name)
         templates["txt"] = txt_template
 
-        # try fetching html version as well
-        try:
-            html_template: Template = get_template(cls.TEMPLATE_PREFIX + template_name + ".html")
+        # the html version is optional
+        html_template = mail_templates.get(cls.TEMPLATE_PREFIX + template_name + ".html")
+        if html_template is not None:
             templates["html"] = html_template
-        except TemplateDoesNotExist:
-            pass
 
         return templates
 
@@ -48,7 +55,7 @@ class EmailInterface:
         return rendered_templates
 
     @classmethod
-    def send_mail(
+    def queue_mail(
         cls,
         *,
         template_name: str,
@@ -56,16 +63,114 @@ class EmailInterface:
         to_address: str,
         subject: str,
         from_address: str = "tb@thingbooker.no",
-    ):
-        """Fetches and renders the templates, then sends them to the receiver"""
+    ) -> OutgoingEmail:
+        """
+        Fetches and renders the templates, then puts the email in the outbox.
+
+        Nothing is sent here. Call this inside the transaction that makes the change the email
+        is about, so the email is only queued if the change is committed.
+        """
 
         templates = cls._get_templates(template_name)
         messages = cls._render_templates(templates, context)
 
-        msg = EmailMultiAlternatives(
-            subject=subject, body=messages["txt"], from_email=from_address, to=[to_address]
+        return OutgoingEmail.objects.create(
+            subject=subject,
+            body=messages["txt"],
+            html_body=messages.get("html", ""),
+            from_address=from_address,
+            to_address=to_address,
         )
-        if "html" in messages:
-            msg.attach_alternative(messages["html"], "text/html")
 
-        return msg.send()
+    @classmethod
+    def queue_mass_mail(
+        cls,
+        *,
+        template_name: str,
+        recipients: list[tuple[dict[str, Any], str]],
+        subject: str,
+        from_address: str = "tb@thingbooker.no",
+    ) -> list[OutgoingEmail]:
+        """
+        Puts one email per recipient in the outbox, rendered from the same template.
+
+        Recipients is a list of (context, to_address) tuples. The templates are fetched once and
+        all emails are inserted in a single statement. The worker later delivers them over one
+        connection.
+        """
+
+        if not recipients:
+            return []
+
+        templates = cls._get_templates(template_name)
+        now = timezone.now()
+
+        emails: list[OutgoingEmail] = []
+        for context, to_address in recipients:
+            messages = cls._render_templates(templates, context)
+            emails.append(
+                OutgoingEmail(
+                    subject=subject,
+                    body=messages["txt"],
+                    html_body=messages.get("html", ""),
+                    from_address=from_address,
+                    to_address=to_address,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+
+        return OutgoingEmail.objects.bulk_create(emails)
+
+    @classmethod
+    def send_queued_mail(
+        cls, *, batch_size: int, max_attempts: int, retry_backoff: timedelta
+    ) -> tuple[int, int]:
+        """
+        Sends a batch of queued emails over a single connection to the email backend.
+
+        Rows are locked with SKIP LOCKED, so several workers can drain the outbox at the same
+        time. Failed emails are retried with exponential backoff until max_attempts is reached.
+        Returns a tuple with the number of sent and failed emails.
+        """
+
+        def send(emails: list[OutgoingEmail], now: datetime) -> tuple[int, int]:
+            sent = failed = 0
+            for email in emails:
+                email.attempts += 1
+                email.updated_at = now
+
+            connection = get_connection()
+            try:
+                connection.open()
+            except Exception as error:
+                for email in emails:
+                    QueuedJobInterface.register_failure(
+                        email, error, now, max_attempts, retry_backoff
+                    )
+                failed = len(emails)
+            else:
+                try:
+                    for email in emails:
+                        try:
+                            connection.send_messages([email.to_message()])
+                        except Exception as error:
+                            QueuedJobInterface.register_failure(
+                                email, error, now, max_attempts, retry_backoff
+                            )
+                            failed += 1
+                        else:
+                            email.status = OutgoingEmailStatusEnum.SENT
+                            email.sent_at = timezone.now()
+                            email.last_error = ""
+                            sent += 1
+                finally:
+                    connection.close()
+
+            OutgoingEmail.objects.bulk_update(
+                emails,
+                ["status", "attempts", "next_attempt_at", "sent_at", "last_error", "updated_at"],
+            )
+            return sent, failed
+
+        return QueuedJobInterface.process_batch(OutgoingEmail, batch_size, send)
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from thingbooker.jobs import QueueWorkerCommand
+from thingbooker.mail.interface import EmailInterface
+
+
+class Command(QueueWorkerCommand):
+    """Delivers the emails in the outbox."""
+
+    help = "Sends queued emails in batches. Runs until stopped unless --once is given."
+    settings_prefix = "MAIL_OUTBOX"
+    batch_help = "Number of emails sent over one connection."
+
+    def process_batch(
+        self, *, batch_size: int, max_attempts: int, retry_backoff: timedelta
+    ) -> tuple[int, int]:
+        """Sends one batch of queued emails."""
+
+        return EmailInterface.send_queued_mail(
+            batch_size=batch_size, max_attempts=max_attempts, retry_backoff=retry_backoff
+        )
+
+    def get_report(self, done: int, failed: int) -> str:
+        """Reports the number of sent and failed emails."""
+
+        return f"Sent {done} email(s), {failed} failed."
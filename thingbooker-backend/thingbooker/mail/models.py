@@ -0,0 +1,58 @@
+from django.core.mail import EmailMultiAlternatives
+from django.db import models
+from django.utils import timezone
+
+from thingbooker.base_models import ThingbookerModel
+from thingbooker.mail.enums import OutgoingEmailStatusEnum
+
+
+class OutgoingEmail(ThingbookerModel):
+    """
+    Model for an email in the outbox.
+
+    The email is rendered and stored in the same transaction as the change that caused it,
+    and is delivered later by the send_queued_mail management command.
+    """
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_address = models.EmailField()
+    to_address = models.EmailField()
+
+    status = models.TextField(
+        max_length=10,
+        choices=OutgoingEmailStatusEnum.choices,
+        default=OutgoingEmailStatusEnum.QUEUED,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["next_attempt_at"]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status=OutgoingEmailStatusEnum.QUEUED),
+                name="outgoing_email_queued_idx",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.subject} to {self.to_address} ({self.status})"
+
+    def to_message(self) -> EmailMultiAlternatives:
+        """Builds the email message that is handed to the email backend."""
+
+        msg = EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_address,
+            to=[self.to_address],
+        )
+        if self.html_body:
+            msg.attach_alternative(self.html_body, "text/html")
+
+        return msg
@@ -0,0 +1,116 @@
+"""Process-level registry of compiled mail templates."""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, engines
+from django.template.loader import get_template
+from django.template.utils import get_app_template_dirs
+
+if TYPE_CHECKING:
+    from django.template.backends.django import Template
+
+
+class MailTemplateRegistry:
+    """
+    Keeps compiled mail templates in memory, along with the names that do not exist.
+
+    Remembering missing names means optional variants, like the HTML version of a mail, are only
+    looked up through the template loaders once per process. The registry is bypassed when
+    DEBUG is on, so template changes are picked up without a restart.
+    """
+
+    def __init__(self, prefix: str) -> None:
+        self.prefix = prefix
+        self._templates: dict[str, Template | None] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _load(name: str) -> Template | None:
+        """Loads and compiles a template, returns None if it does not exist."""
+
+        try:
+            return get_template(name)
+        except TemplateDoesNotExist:
+            return None
+
+    def _template_dirs(self):
+        """Returns the directories the django template engine looks for templates in."""
+
+        engine = engines["django"].engine
+        dirs = list(engine.dirs)
+        if engine.app_dirs:
+            dirs.extend(get_app_template_dirs("templates"))
+        return dirs
+
+    def preload(self) -> int:
+        """
+        Compiles all templates under the prefix, and marks missing .html variants of .txt
+        templates as non-existent. Returns the number of templates that were compiled.
+        """
+
+        names: set[str] = set()
+        for template_dir in self._template_dirs():
+            root = os.path.join(template_dir, self.prefix)
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = os.path.relpath(os.path.join(dirpath, filename), template_dir)
+                    names.add(path.replace(os.sep, "/"))
+
+        for name in list(names):
+            if name.endswith(".txt"):
+                names.add(name.removesuffix(".txt") + ".html")
+
+        loaded = {name: self._load(name) for name in names}
+        with self._lock:
+            self._templates.update(loaded)
+
+        return sum(1 for template in loaded.values() if template is not None)
+
+    def get(self, name: str) -> Template | None:
+        """Returns the compiled template with the given name, or None if it does not exist."""
+
+        if settings.DEBUG:
+            return self._load(name)
+
+        try:
+            template = self._templates[name]
+        except KeyError:
+            template = self._load(name)
+            with self._lock:
+                self._templates[name] = template
+                self.misses += 1
+        else:
+            with self._lock:
+                self.hits += 1
+
+        return template
+
+    def clear(self):
+        """Forgets all templates and resets the counters."""
+
+        with self._lock:
+            self._templates.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """Returns the hit and miss counters, and the number of known and missing templates."""
+
+        with self._lock:
+            missing = sum(1 for template in self._templates.values() if template is None)
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "templates": len(self._templates) - missing,
+                "missing": missing,
+            }
+
+
+mail_templates = MailTemplateRegistry(prefix="mail/")
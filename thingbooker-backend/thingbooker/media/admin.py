@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from thingbooker.media.models import MediaDeletionJob
+
+
+@admin.register(MediaDeletionJob)
+class MediaDeletionJobAdmin(admin.ModelAdmin):
+    """Admin for the queued file deletions"""
+
+    list_display = ["name", "status", "attempts", "next_attempt_at", "created_at"]
+    list_filter = ["status"]
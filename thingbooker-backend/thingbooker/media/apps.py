@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class MediaConfig(AppConfig):
+    """Config for the media app"""
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "thingbooker.media"
+
+    def ready(self) -> None:
+        """Connects the signal receivers"""
+
+        from thingbooker.media import signals  # noqa: F401
@@ -0,0 +1,8 @@
+from django.db.models import TextChoices
+
+
+class MediaDeletionStatusEnum(TextChoices):
+    """Enum for the status of a queued file deletion"""
+
+    QUEUED = ("queued", "File is waiting to be deleted")
+    FAILED = ("failed", "File could not be deleted and will not be retried")
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from rest_framework import serializers
+
+from thingbooker.media.interface import ImageVariantInterface
+
+if TYPE_CHECKING:
+    from django.db.models.fields.files import FieldFile
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    Read only field with the URLs of the resized variants of an image.
+
+    The source is the image field. The value is None when there is no image, otherwise the URLs
+    keyed by size label and format.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value: FieldFile) -> dict[str, dict[str, str]] | None:
+        """Returns the variant URLs, absolute if there is a request in the context"""
+
+        if not value:
+            return None
+
+        urls = ImageVariantInterface.get_variant_urls(value.name)
+
+        request = self.context.get("request", None)
+        if request is not None:
+            for formats in urls.values():
+                for image_format, url in formats.items():
+                    formats[image_format] = request.build_absolute_uri(url)
+
+        return urls
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from thingbooker.jobs import QueuedJobInterface
+from thingbooker.media.models import MediaDeletionJob
+from thingbooker.media.processing import render_variants
+from thingbooker.things.models import Thing
+from thingbooker.users.models import ThingbookerGroup, ThingbookerUser
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from concurrent.futures import Future
+    from datetime import datetime, timedelta
+
+    from django.db.models import Model
+
+logger = logging.getLogger(__name__)
+
+# the image fields that get variants and are cleaned up, per model
+IMAGE_FIELDS: dict[type[Model], list[str]] = {
+    Thing: ["picture"],
+    ThingbookerUser: ["avatar"],
+    ThingbookerGroup: ["group_picture"],
+}
+
+_executor_lock = threading.Lock()
+_process_pool: ProcessPoolExecutor | None = None
+_scheduler: ThreadPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Returns the process pool that renders the variants, creating it on first use."""
+
+    global _process_pool
+    with _executor_lock:
+        if _process_pool is None:
+            # spawn instead of fork, forking a process with running threads is unsafe
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_PROCESSING_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def get_scheduler() -> ThreadPoolExecutor:
+    """Returns the thread that reads originals and stores variants, creating it on first use."""
+
+    global _scheduler
+    with _executor_lock:
+        if _scheduler is None:
+            _scheduler = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-variants")
+        return _scheduler
+
+
+class ImageVariantInterface:
+    """
+    Helper methods for the resized variants of uploaded images.
+
+    Variants are stored next to the original, under a name that is derived from the name of
+    the original. This means the URLs of the variants are known without looking anything up.
+    The full file name, including the extension, is part of the variant name, so images that
+    only differ in their extension never share variants.
+    """
+
+    @staticmethod
+    def get_variant_name(name: str, label: str, image_format: str) -> str:
+        """Returns the storage name of a variant of the image with the given name."""
+
+        directory, filename = posixpath.split(name)
+        return posixpath.join(directory, "variants", filename, f"{label}.{image_format}")
+
+    @classmethod
+    def get_variant_names(cls, name: str) -> dict[tuple[str, str], str]:
+        """Returns the storage names of all variants, keyed by (label, format)."""
+
+        return {
+            (label, image_format): cls.get_variant_name(name, label, image_format)
+            for label in settings.IMAGE_VARIANT_SIZES
+            for image_format in settings.IMAGE_VARIANT_FORMATS
+        }
+
+    @classmethod
+    def get_variant_urls(cls, name: str) -> dict[str, dict[str, str]]:
+        """Returns the URLs of the variants, keyed by label and then format."""
+
+        urls: dict[str, dict[str, str]] = {}
+        for (label, image_format), variant_name in cls.get_variant_names(name).items():
+            urls.setdefault(label, {})[image_format] = default_storage.url(variant_name)
+        return urls
+
+    @classmethod
+    def has_variants(cls, name: str) -> bool:
+        """Returns True if all variants of the image exist in the storage."""
+
+        return all(default_storage.exists(n) for n in cls.get_variant_names(name).values())
+
+    @classmethod
+    def submit_render(cls, name: str) -> Future:
+        """Reads the original from the storage and submits it to the process pool."""
+
+        with default_storage.open(name, "rb") as file:
+            data = file.read()
+
+        return get_process_pool().submit(
+            render_variants,
+            data,
+            dict(settings.IMAGE_VARIANT_SIZES),
+            list(settings.IMAGE_VARIANT_FORMATS),
+        )
+
+    @classmethod
+    def save_variants(cls, name: str, variants: dict[tuple[str, str], bytes]) -> None:
+        """Stores rendered variants, replacing older versions with the same name."""
+
+        for key, variant_name in cls.get_variant_names(name).items():
+            if default_storage.exists(variant_name):
+                default_storage.delete(variant_name)
+            default_storage.save(variant_name, ContentFile(variants[key]))
+
+    @classmethod
+    def generate_variants(cls, name: str) -> None:
+        """Renders and stores the variants of an image, waiting for the result."""
+
+        cls.save_variants(name, cls.submit_render(name).result())
+
+    @classmethod
+    def _generate_in_background(cls, name: str) -> None:
+        try:
+            cls.generate_variants(name)
+        except Exception:
+            logger.exception("Could not generate variants for %s", name)
+
+    @classmethod
+    def schedule_variants(cls, names: Iterable[str]) -> None:
+        """
+        Generates the variants in the background once the current transaction commits.
+
+        The request does not wait for the images to be rendered. The variants appear in the
+        storage shortly after, until then clients should fall back to the original.
+        """
+
+        for name in names:
+            transaction.on_commit(
+                lambda name=name: get_scheduler().submit(cls._generate_in_background, name)
+            )
+
+
+class MediaDeletionInterface:
+    """Helper methods for removing files that are no longer used from the storage."""
+
+    @staticmethod
+    def queue_deletion(names: Iterable[str]) -> list[MediaDeletionJob]:
+        """
+        Queues the files for deletion, along with their variants.
+
+        Call this inside the transaction that stops using the files, so they are only deleted
+        if the change is committed. Nothing is removed from the storage here.
+        """
+
+        now = timezone.now()
+        jobs = [MediaDeletionJob(name=name, created_at=now, updated_at=now) for name in names]
+        if not jobs:
+            return []
+        return MediaDeletionJob.objects.bulk_create(jobs)
+
+    @staticmethod
+    def get_referenced_names(names: set[str]) -> set[str]:
+        """Returns the names that are still used by an image field."""
+
+        referenced: set[str] = set()
+        for model, field_names in IMAGE_FIELDS.items():
+            for field_name in field_names:
+                referenced.update(
+                    model.objects.filter(**{f"{field_name}__in": names}).values_list(
+                        field_name, flat=True
+                    )
+                )
+        return referenced
+
+    @staticmethod
+    def get_all_referenced_names() -> set[str]:
+        """Returns the names of all stored images and their variants."""
+
+        referenced: set[str] = set()
+        for model, field_names in IMAGE_FIELDS.items():
+            for field_name in field_names:
+                names = (
+                    model.objects.exclude(**{field_name: ""})
+                    .exclude(**{f"{field_name}__isnull": True})
+                    .values_list(field_name, flat=True)
+                )
+                for name in names.iterator():
+                    referenced.add(name)
+                    referenced.update(ImageVariantInterface.get_variant_names(name).values())
+        return referenced
+
+    @classmethod
+    def walk_storage(cls, path: str = "") -> Iterator[str]:
+        """Yields the names of all files in the storage below the given path."""
+
+        directories, files = default_storage.listdir(path)
+        for filename in files:
+            yield posixpath.join(path, filename)
+        for directory in directories:
+            yield from cls.walk_storage(posixpath.join(path, directory))
+
+    @classmethod
+    def process_deletion_jobs(
+        cls, *, batch_size: int, max_attempts: int, retry_backoff: timedelta
+    ) -> tuple[int, int]:
+        """
+        Deletes a batch of queued files and their variants from the storage.
+
+        Works with any storage backend. Jobs are locked with SKIP LOCKED, so several workers
+        can run at the same time. Files that are used by an image field again are left alone.
+        Returns a tuple with the number of processed and failed jobs.
+        """
+
+        def delete(jobs: list[MediaDeletionJob], now: datetime) -> tuple[int, int]:
+            referenced = cls.get_referenced_names({job.name for job in jobs})
+
+            done: list[MediaDeletionJob] = []
+            failed: list[MediaDeletionJob] = []
+            for job in jobs:
+                if job.name in referenced:
+                    done.append(job)
+                    continue
+
+                names = [job.name, *ImageVariantInterface.get_variant_names(job.name).values()]
+                try:
+                    for name in names:
+                        default_storage.delete(name)
+                except Exception as error:
+                    job.attempts += 1
+                    job.updated_at = now
+                    QueuedJobInterface.register_failure(
+                        job, error, now, max_attempts, retry_backoff
+                    )
+                    failed.append(job)
+                else:
+                    done.append(job)
+
+            MediaDeletionJob.objects.filter(pk__in=[job.pk for job in done]).delete()
+            MediaDeletionJob.objects.bulk_update(
+                failed, ["status", "attempts", "next_attempt_at", "last_error", "updated_at"]
+            )
+            return len(done), len(failed)
+
+        return QueuedJobInterface.process_batch(MediaDeletionJob, batch_size, delete)
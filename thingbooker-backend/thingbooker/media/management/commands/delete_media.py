@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from thingbooker.jobs import QueueWorkerCommand
+from thingbooker.media.interface import MediaDeletionInterface
+
+
+class Command(QueueWorkerCommand):
+    """Deletes the files that are queued for deletion."""
+
+    help = "Deletes queued files from the storage in batches. Runs until stopped unless --once."
+    settings_prefix = "MEDIA_DELETION"
+    batch_help = "Number of files deleted per transaction."
+
+    def process_batch(
+        self, *, batch_size: int, max_attempts: int, retry_backoff: timedelta
+    ) -> tuple[int, int]:
+        """Deletes one batch of queued files."""
+
+        return MediaDeletionInterface.process_deletion_jobs(
+            batch_size=batch_size, max_attempts=max_attempts, retry_backoff=retry_backoff
+        )
+
+    def get_report(self, done: int, failed: int) -> str:
+        """Reports the number of deleted and failed files."""
+
+        return f"Deleted {done} file(s), {failed} failed."
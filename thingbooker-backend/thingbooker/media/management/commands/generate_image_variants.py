@@ -0,0 +1,77 @@
+from collections import deque
+
+from django.core.management.base import BaseCommand
+
+from thingbooker.media.interface import IMAGE_FIELDS, ImageVariantInterface
+
+
+class Command(BaseCommand):
+    """Generates variants for images that were uploaded before variants existed."""
+
+    help = "Generates the resized variants of all existing images."
+
+    def add_arguments(self, parser):
+        """Adds arguments for regenerating existing variants and the number of images in flight."""
+
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate variants that already exist.",
+        )
+        parser.add_argument(
+            "--max-pending",
+            type=int,
+            default=8,
+            help="Number of images that are read ahead of the process pool.",
+        )
+
+    def get_image_names(self):
+        """Yields the names of all stored images."""
+
+        for model, field_names in IMAGE_FIELDS.items():
+            for field_name in field_names:
+                names = (
+                    model.objects.exclude(**{field_name: ""})
+                    .exclude(**{f"{field_name}__isnull": True})
+                    .values_list(field_name, flat=True)
+                )
+                yield from names.iterator()
+
+    def handle(self, *args, **options):
+        """Renders the images in the process pool, keeping a bounded number of them in flight."""
+
+        pending = deque()
+        generated = skipped = failed = 0
+
+        def finish_oldest():
+            nonlocal generated, failed
+            name, future = pending.popleft()
+            try:
+                ImageVariantInterface.save_variants(name, future.result())
+            except Exception as error:
+                self.stderr.write(f"Could not generate variants for {name}: {error}")
+                failed += 1
+            else:
+                generated += 1
+
+        for name in self.get_image_names():
+            if not options["force"] and ImageVariantInterface.has_variants(name):
+                skipped += 1
+                continue
+
+            try:
+                pending.append((name, ImageVariantInterface.submit_render(name)))
+            except Exception as error:
+                self.stderr.write(f"Could not read {name}: {error}")
+                failed += 1
+                continue
+
+            if len(pending) >= options["max_pending"]:
+                finish_oldest()
+
+        while pending:
+            finish_oldest()
+
+        self.stdout.write(
+            f"Generated variants for {generated} image(s), skipped {skipped}, {failed} failed."
+        )
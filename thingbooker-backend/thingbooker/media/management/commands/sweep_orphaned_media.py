@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from thingbooker.media.interface import MediaDeletionInterface
+
+
+class Command(BaseCommand):
+    """Deletes files in the storage that no image field refers to."""
+
+    help = "Finds and deletes files in the media storage that are not used by any row."
+
+    def add_arguments(self, parser):
+        """Adds arguments for a dry run and the minimum age of deleted files."""
+
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the orphaned files.",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=24,
+            help="Only delete files older than this many hours, to leave uploads in progress.",
+        )
+
+    def handle(self, *args, **options):
+        """Walks the storage once and deletes the difference with the referenced names."""
+
+        referenced = MediaDeletionInterface.get_all_referenced_names()
+        stored = set(MediaDeletionInterface.walk_storage())
+        cutoff = timezone.now() - timedelta(hours=options["min_age"])
+
+        orphans = sorted(stored - referenced)
+        deleted = 0
+        for name in orphans:
+            if default_storage.get_modified_time(name) > cutoff:
+                continue
+
+            if options["dry_run"]:
+                self.stdout.write(name)
+            else:
+                default_storage.delete(name)
+            deleted += 1
+
+        action = "Found" if options["dry_run"] else "Deleted"
+        self.stdout.write(
+            f"{action} {deleted} orphaned file(s) out of {len(stored)} stored file(s)."
+        )
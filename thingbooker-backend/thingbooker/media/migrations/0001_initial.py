@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-17 01:38
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaDeletionJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(editable=False)),
+                ('updated_at', models.DateTimeField(editable=False)),
+                ('name', models.CharField(max_length=255)),
+                ('status', models.TextField(choices=[('queued', 'File is waiting to be deleted'), ('failed', 'File could not be deleted and will not be retried')], default='queued', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['next_attempt_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='mediadeletionjob',
+            index=models.Index(condition=models.Q(('status', 'queued')), fields=['next_attempt_at'], name='media_deletion_queued_idx'),
+        ),
+    ]
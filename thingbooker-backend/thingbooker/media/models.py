@@ -0,0 +1,39 @@
+from django.db import models
+from django.utils import timezone
+
+from thingbooker.base_models import ThingbookerModel
+from thingbooker.media.enums import MediaDeletionStatusEnum
+
+
+class MediaDeletionJob(ThingbookerModel):
+    """
+    Model for a file that should be removed from the storage.
+
+    The job is inserted in the same transaction as the change that makes the file unused, so it
+    only exists if that change is committed. The delete_media management command removes the
+    file and its variants, and then the job.
+    """
+
+    name = models.CharField(max_length=255)
+
+    status = models.TextField(
+        max_length=10,
+        choices=MediaDeletionStatusEnum.choices,
+        default=MediaDeletionStatusEnum.QUEUED,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["next_attempt_at"]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status=MediaDeletionStatusEnum.QUEUED),
+                name="media_deletion_queued_idx",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"Delete {self.name} ({self.status})"
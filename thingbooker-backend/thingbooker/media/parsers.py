@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from rest_framework.parsers import MultiPartParser
+
+from thingbooker.media.uploadhandlers import ImageUploadHandler
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class ImageUploadMultiPartParser(MultiPartParser):
+    """
+    Multipart parser that receives files through the ImageUploadHandler first.
+
+    The handler is added here instead of in FILE_UPLOAD_HANDLERS, so the validation error it
+    raises is only used by the API, and uploads in the django admin keep working as before.
+    """
+
+    def parse(self, stream, media_type=None, parser_context: dict[str, Any] | None = None):
+        """Puts the image upload handler in front of the configured upload handlers"""
+
+        request = (parser_context or {})["request"]
+        handlers = request.upload_handlers
+        if not any(isinstance(handler, ImageUploadHandler) for handler in handlers):
+            handlers.insert(0, ImageUploadHandler(request._request))
+
+        return super().parse(stream, media_type, parser_context)
@@ -0,0 +1,58 @@
+"""
+Image variant rendering.
+
+This module only depends on Pillow, so it can be imported by the worker processes of the
+process pool without setting up Django.
+"""
+
+from __future__ import annotations
+
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+# encoder options per format
+SAVE_OPTIONS: dict[str, dict] = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+
+def render_variants(
+    data: bytes, sizes: dict[str, int], formats: list[str]
+) -> dict[tuple[str, str], bytes]:
+    """
+    Renders an image in the given sizes and formats.
+
+    Sizes maps a label to the maximum width and height of the variant. Images are never
+    scaled up. Returns the encoded variants keyed by (label, format).
+    """
+
+    largest = max(sizes.values())
+
+    with Image.open(BytesIO(data)) as original:
+        # let the JPEG decoder scale down while decoding, which is much faster than a full decode
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    variants: dict[tuple[str, str], bytes] = {}
+
+    # render the largest size first, and make each smaller size from the previous one
+    for label, size in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        image = image.copy()
+        image.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        for image_format in formats:
+            variant = image
+            if image_format == "jpeg" and variant.mode != "RGB":
+                variant = variant.convert("RGB")
+
+            buffer = BytesIO()
+            variant.save(buffer, **SAVE_OPTIONS[image_format])
+            variants[(label, image_format)] = buffer.getvalue()
+
+    return variants
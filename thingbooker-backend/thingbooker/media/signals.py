@@ -0,0 +1,82 @@
+"""Signal receivers that generate image variants and clean up images that are replaced."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from thingbooker.media.interface import IMAGE_FIELDS, ImageVariantInterface, MediaDeletionInterface
+from thingbooker.things.models import Thing
+from thingbooker.users.models import ThingbookerGroup, ThingbookerUser
+
+if TYPE_CHECKING:
+    from django.db.models import Model
+
+
+def get_image_names(instance: Model) -> dict[str, str | None]:
+    """
+    Returns the names of the images of the instance, for the fields that are loaded.
+
+    Deferred fields are skipped, accessing them would fetch them from the database.
+    """
+
+    names: dict[str, str | None] = {}
+    for field_name in IMAGE_FIELDS[type(instance)]:
+        if field_name not in instance.__dict__:
+            continue
+
+        value = instance.__dict__[field_name]
+        if isinstance(value, str):
+            names[field_name] = value or None
+        elif isinstance(value, FieldFile) and value._committed:
+            names[field_name] = value.name or None
+        else:
+            # a file that has not been saved to the storage yet
+            names[field_name] = None
+    return names
+
+
+@receiver(post_init, sender=Thing)
+@receiver(post_init, sender=ThingbookerUser)
+@receiver(post_init, sender=ThingbookerGroup)
+def remember_image_names(sender, instance: Model, **kwargs):
+    """Remembers the image names the instance was loaded with."""
+
+    instance._loaded_image_names = get_image_names(instance)
+
+
+@receiver(post_save, sender=Thing)
+@receiver(post_save, sender=ThingbookerUser)
+@receiver(post_save, sender=ThingbookerGroup)
+def schedule_image_variants(sender, instance: Model, **kwargs):
+    """
+    Generates variants for the images that changed since the instance was loaded, and queues
+    the images they replaced for deletion.
+    """
+
+    loaded: dict[str, str | None] = getattr(instance, "_loaded_image_names", {})
+    current = get_image_names(instance)
+
+    changed = [field_name for field_name, name in current.items() if name != loaded.get(field_name)]
+    ImageVariantInterface.schedule_variants(
+        current[field_name] for field_name in changed if current[field_name]
+    )
+    MediaDeletionInterface.queue_deletion(
+        loaded[field_name] for field_name in changed if loaded.get(field_name)
+    )
+
+    instance._loaded_image_names = current
+
+
+@receiver(post_delete, sender=Thing)
+@receiver(post_delete, sender=ThingbookerUser)
+@receiver(post_delete, sender=ThingbookerGroup)
+def queue_image_deletion(sender, instance: Model, **kwargs):
+    """Queues the images of the deleted instance for deletion, once the delete is committed."""
+
+    MediaDeletionInterface.queue_deletion(
+        name for name in get_image_names(instance).values() if name
+    )
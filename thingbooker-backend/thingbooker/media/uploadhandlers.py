@@ -0,0 +1,132 @@
+"""Upload handler that checks the size and format of images while they are being received."""
+
+from __future__ import annotations
+
+import posixpath
+from dataclasses import dataclass
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image
+from rest_framework import serializers
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+    from thingbooker.base_types import ThingbookerRequest
+
+# the header of all supported formats fits well within this many bytes
+PROBE_BYTES = 256 * 1024
+
+NOT_AN_IMAGE = (
+    "Upload a valid image. The file you uploaded was either not an image or a corrupted image."
+)
+
+
+@dataclass(frozen=True)
+class ImageProbe:
+    """Format and dimensions of an uploaded image, read from its header."""
+
+    format: str | None
+    width: int
+    height: int
+
+
+def get_image_probe(request: ThingbookerRequest | None, field_name: str) -> ImageProbe | None:
+    """Returns the probe of the image uploaded in the given field, if there is one."""
+
+    if request is None:
+        return None
+    return getattr(request, "image_probes", {}).get(field_name)
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Rejects images as soon as they pass MEGABYTE_LIMIT, and probes the image header.
+
+    Only files in IMAGE_UPLOAD_FIELDS are checked, other files are passed on untouched. The
+    handler passes the data on unchanged, so the next handlers still build the uploaded file.
+    Without it, the whole file is received and buffered before the serializers get to check its
+    size. The format and dimensions are read by Pillow from the first bytes, which is stored in
+    request.image_probes by field name. Files that are not in IMAGE_UPLOAD_FORMATS, or whose
+    extension does not match their format, are rejected, since the extension is kept when the
+    file is stored.
+    """
+
+    def __init__(self, request: HttpRequest | None = None) -> None:
+        super().__init__(request)
+        self.limit = settings.MEGABYTE_LIMIT * 1024 * 1024
+        if request is not None and not hasattr(request, "image_probes"):
+            request.image_probes = {}
+
+    def reject(self, message: str | None = None):
+        """Stops the upload with a validation error for the field being received."""
+
+        raise serializers.ValidationError(
+            {self.field_name: [message or f"Image is over max file size (>{self.limit})"]}
+        )
+
+    def new_file(self, field_name, file_name, content_type, content_length, *args, **kwargs):
+        """Resets the counters, and rejects the image if its declared length is too big."""
+
+        super().new_file(field_name, file_name, content_type, content_length, *args, **kwargs)
+        self.checking = field_name in settings.IMAGE_UPLOAD_FIELDS
+        self.received = 0
+        self.header = bytearray()
+        self.probing = self.checking
+
+        if self.checking and content_length is not None and content_length > self.limit:
+            self.reject()
+
+    def check_format(self, image_format: str | None) -> None:
+        """Rejects formats that are not allowed, or that do not match the file extension."""
+
+        if image_format not in settings.IMAGE_UPLOAD_FORMATS:
+            self.reject(f"Unsupported image format, use one of {settings.IMAGE_UPLOAD_FORMATS}.")
+
+        extension = posixpath.splitext(self.file_name or "")[1].lower()
+        if Image.registered_extensions().get(extension) != image_format:
+            self.reject(f"The file extension does not match the image format ({image_format}).")
+
+    def probe(self, raw_data: bytes) -> None:
+        """Tries reading the format and dimensions from the data received so far."""
+
+        self.header.extend(raw_data)
+        try:
+            with Image.open(BytesIO(self.header)) as image:
+                probe = ImageProbe(format=image.format, width=image.width, height=image.height)
+        except Exception:
+            # the header is incomplete, or this is not an image
+            if len(self.header) >= PROBE_BYTES:
+                self.reject(NOT_AN_IMAGE)
+            return
+
+        self.check_format(probe.format)
+        if self.request is not None:
+            self.request.image_probes[self.field_name] = probe
+        self.probing = False
+        self.header = bytearray()
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> bytes:
+        """Counts the received bytes and probes the header, then passes the data on."""
+
+        if not self.checking:
+            return raw_data
+
+        self.received += len(raw_data)
+        if self.received > self.limit:
+            self.reject()
+
+        if self.probing:
+            self.probe(raw_data)
+
+        return raw_data
+
+    def file_complete(self, file_size: int) -> None:
+        """Rejects images that ended before a header was recognized"""
+
+        if self.probing:
+            self.reject(NOT_AN_IMAGE)
+        return None
@@ -34,6 +34,7 @@ WSGI_APPLICATION = "thingbooker.wsgi.application"
 
 LOCAL_APPS = [
     "thingbooker.mail",
+    "thingbooker.media",
     "thingbooker.things",
     "thingbooker.users",
 ]
@@ -59,6 +60,7 @@ DJANGO_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.sites",
+    "django.contrib.postgres",
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -114,6 +116,36 @@ DATABASES = {
     }
 }
 
+##########
+# Caches #
+##########
+
+CACHE_BACKEND = config("CACHE_BACKEND", default="thingbooker.cache_backends.CountingLocMemCache")
+CACHE_MAX_ENTRIES = config("CACHE_MAX_ENTRIES", default=1000, cast=int)
+
+# Django only culls these backends itself. Redis and Memcached evict entries on their own, and
+# pass the options on to their client, which does not accept MAX_ENTRIES and CULL_FREQUENCY.
+CULLED_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.filebased.FileBasedCache",
+    "thingbooker.cache_backends.CountingLocMemCache",
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": config("CACHE_LOCATION", default="thingbooker"),
+        "TIMEOUT": config("CACHE_TIMEOUT", default=300, cast=int),
+    }
+}
+
+if CACHE_BACKEND in CULLED_CACHE_BACKENDS:
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": CACHE_MAX_ENTRIES,
+        # evict only the least recently used entry when the cache is full
+        "CULL_FREQUENCY": CACHE_MAX_ENTRIES,
+    }
+
 ##################
 # AUTHENTICATION #
 ##################
@@ -193,6 +225,50 @@ CLIENT_BASE_URL = config("FRONTEND_URL")
 
 MEGABYTE_LIMIT = 2
 
+# The multipart fields that take images, their uploads are limited and probed while received
+IMAGE_UPLOAD_FIELDS = ["avatar", "picture", "group_picture"]
+# The Pillow formats that can be uploaded
+IMAGE_UPLOAD_FORMATS = ["JPEG", "PNG", "WEBP", "GIF"]
+
+# Image variants, the sizes are the maximum width and height in pixels
+IMAGE_VARIANT_SIZES = {"thumbnail": 128, "small": 320, "medium": 800}
+IMAGE_VARIANT_FORMATS = ["webp", "jpeg"]
+IMAGE_PROCESSING_WORKERS = config("IMAGE_PROCESSING_WORKERS", default=2, cast=int)
+
+# Pagination
+BOOKING_PAGE_SIZE = 50
+BOOKING_MAX_PAGE_SIZE = 500
+
+# Number of bookings fetched per round trip when streaming calendar feeds
+CALENDAR_CHUNK_SIZE = 500
+
+# Number of bookings fetched per round trip, and written per chunk, by the booking export
+EXPORT_CHUNK_SIZE = 2000
+
+# Cache alias for the all-bookings and all-rules responses of a thing
+THING_RESPONSE_CACHE_ALIAS = "default"
+
+# Mail outbox
+MAIL_OUTBOX_BATCH_SIZE = 100
+MAIL_OUTBOX_MAX_ATTEMPTS = 5
+MAIL_OUTBOX_RETRY_BACKOFF = 60  # in seconds, doubled for each failed attempt
+MAIL_OUTBOX_POLL_INTERVAL = 5  # in seconds
+
+# Media deletion queue
+MEDIA_DELETION_BATCH_SIZE = 100
+MEDIA_DELETION_MAX_ATTEMPTS = 5
+MEDIA_DELETION_RETRY_BACKOFF = 60  # in seconds, doubled for each failed attempt
+MEDIA_DELETION_POLL_INTERVAL = 5  # in seconds
+
+# Maximum number of emails in one bulk invite
+BULK_INVITE_MAX_EMAILS = 500
+
+# Maximum number of bookings in one bulk status update
+BULK_BOOKING_STATUS_MAX = 500
+
+# Maximum number of occurrences of one recurring booking
+RECURRING_BOOKING_MAX_OCCURRENCES = 200
+
 # Tokens
 TOKEN_BYTE_LENGTH = config("TOKEN_BYTE_LENGTH", cast=int)
 TOKEN_EXPIRY = config("TOKEN_EXPIRY", cast=int)  # in days
@@ -212,7 +288,12 @@ REST_FRAMEWORK = {
         "dj_rest_auth.jwt_auth.JWTCookieAuthentication",
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.BasicAuthentication",
-    )
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "thingbooker.media.parsers.ImageUploadMultiPartParser",
+    ),
 }
 
 ###################
@@ -6,3 +6,8 @@ class ThingsConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "thingbooker.things"
+
+    def ready(self) -> None:
+        """Connects the signal receivers"""
+
+        from thingbooker.things import signals  # noqa: F401
@@ -0,0 +1,125 @@
+"""Versioned cache for responses that are built from the bookings and rules of a thing."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+    from uuid import UUID
+
+    from django.core.cache.backends.base import BaseCache
+
+
+class ThingResponseCache:
+    """
+    Caches response data per thing, keyed by a version counter for that thing.
+
+    Changing a booking or rule bumps the version of its thing, which makes every cached
+    response for the thing unreachable. Old entries are never deleted explicitly, they are
+    evicted by the cache backend. The version starts at a random value, so a version key that
+    has been evicted can not bring old entries back to life.
+
+    With a per-process backend like LocMemCache, a bump only reaches the process that made the
+    change. Keys should therefore also include a validator read from the database, like the
+    ETag of the response.
+    """
+
+    def __init__(self, alias: str, prefix: str) -> None:
+        self.alias = alias
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self) -> BaseCache:
+        """Returns the cache backend."""
+
+        return caches[self.alias]
+
+    def _version_key(self, thing_id: UUID) -> str:
+        return f"{self.prefix}:{thing_id}:version"
+
+    @staticmethod
+    def _initial_version() -> int:
+        return uuid4().int >> 80
+
+    def get_version(self, thing_id: UUID) -> int:
+        """Returns the current version for the thing, creating it if it does not exist."""
+
+        key = self._version_key(thing_id)
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, self._initial_version(), timeout=None)
+            version = self.cache.get(key)
+        return version
+
+    def bump(self, thing_id: UUID) -> None:
+        """Invalidates all cached responses for the thing."""
+
+        key = self._version_key(thing_id)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # the version was never created or has been evicted
+            self.cache.set(key, self._initial_version(), timeout=None)
+
+    def invalidate(self, thing_id: UUID) -> None:
+        """
+        Bumps the version of the thing once the current transaction commits.
+
+        Bumping before the commit would let a concurrent request cache the old rows under the
+        new version. Queryset updates and bulk operations do not send signals, so code using
+        them has to call this.
+        """
+
+        transaction.on_commit(lambda: self.bump(thing_id))
+
+    def get_or_set(self, thing_id: UUID, key: str, build: Callable[[], Any]) -> Any:
+        """
+        Returns the cached data for the thing and key, or builds and caches it.
+
+        The key must identify the response, e.g the absolute url and the media type.
+        """
+
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        cache_key = f"{self.prefix}:{thing_id}:{self.get_version(thing_id)}:{digest}"
+
+        data = self.cache.get(cache_key)
+        if data is not None:
+            with self._lock:
+                self.hits += 1
+            return data
+
+        with self._lock:
+            self.misses += 1
+        data = build()
+        self.cache.set(cache_key, data)
+        return data
+
+    def stats(self) -> dict[str, int | None]:
+        """
+        Returns the hit and miss counters of this process, and the number of evictions if the
+        cache backend counts them.
+        """
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": getattr(self.cache, "evictions", None),
+            }
+
+
+thing_responses = ThingResponseCache(
+    alias=settings.THING_RESPONSE_CACHE_ALIAS, prefix="thing-responses"
+)
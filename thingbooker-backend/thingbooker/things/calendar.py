@@ -0,0 +1,106 @@
+"""Streaming iCalendar (RFC 5545) feeds of bookings."""
+
+from __future__ import annotations
+
+from datetime import UTC
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+
+from thingbooker.things.enums import BookingStatusEnum
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from datetime import datetime
+
+    from django.db.models.query import QuerySet
+
+    from thingbooker.things.models import Booking
+
+# the maximum length of a content line in octets, excluding the line break
+LINE_LENGTH = 75
+
+EVENT_STATUS = {
+    BookingStatusEnum.WAITING.value: "TENTATIVE",
+    BookingStatusEnum.ACCEPTED.value: "CONFIRMED",
+    BookingStatusEnum.DECLINED.value: "CANCELLED",
+}
+
+
+def escape_text(value: str) -> str:
+    """Escapes a value of the TEXT type."""
+
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Folds a content line into lines of at most 75 octets, without splitting characters."""
+
+    if len(line.encode("utf-8")) <= LINE_LENGTH:
+        return line + "\r\n"
+
+    folded: list[str] = []
+    current = ""
+    current_length = 0
+    # continuation lines start with a space, which counts towards the length
+    limit = LINE_LENGTH
+    for char in line:
+        char_length = len(char.encode("utf-8"))
+        if current_length + char_length > limit:
+            folded.append(current)
+            current = ""
+            current_length = 0
+            limit = LINE_LENGTH - 1
+        current += char
+        current_length += char_length
+    folded.append(current)
+
+    return "\r\n ".join(folded) + "\r\n"
+
+
+def format_datetime(value: datetime) -> str:
+    """Formats a datetime in UTC, as required for DTSTAMP and allowed for DTSTART and DTEND."""
+
+    return value.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
+def generate_calendar(
+    bookings: QuerySet[Booking], name: str, summary: Callable[[Booking], str]
+) -> Iterator[str]:
+    """
+    Yields an iCalendar feed with one event per booking.
+
+    The bookings are read with a server-side cursor in chunks, and each event is yielded as
+    soon as it is formatted, so memory use does not grow with the number of bookings.
+    """
+
+    yield (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//Thingbooker//Thingbooker//NO\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "METHOD:PUBLISH\r\n"
+    )
+    yield fold_line(f"X-WR-CALNAME:{escape_text(name)}")
+
+    for booking in bookings.iterator(chunk_size=settings.CALENDAR_CHUNK_SIZE):
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{booking.id}@thingbooker",
+            f"DTSTAMP:{format_datetime(booking.updated_at)}",
+            f"LAST-MODIFIED:{format_datetime(booking.updated_at)}",
+            f"DTSTART:{format_datetime(booking.start_date)}",
+            f"DTEND:{format_datetime(booking.end_date)}",
+            f"SUMMARY:{escape_text(summary(booking))}",
+            f"STATUS:{EVENT_STATUS[booking.status]}",
+            "END:VEVENT",
+        ]
+        yield "".join(fold_line(line) for line in lines)
+
+    yield "END:VCALENDAR\r\n"
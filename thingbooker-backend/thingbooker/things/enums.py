@@ -13,3 +13,13 @@ class BookingStatusEnum(TextChoices):
         """Returns choices for when updating a booking"""
 
         return [choice for choice in cls.choices if choice[0] != cls.WAITING]
+
+
+class BookingStatusOutcomeEnum(TextChoices):
+    """Enum for the outcome of one booking in a bulk status update"""
+
+    ACCEPTED = ("accepted", "Booking was accepted")
+    DECLINED = ("declined", "Booking was declined")
+    UNCHANGED = ("unchanged", "Booking already had the requested status")
+    CONFLICT = ("conflict", "Booking overlaps an accepted booking, and was not accepted")
+    NOT_FOUND = ("not_found", "Booking does not exist on this thing")
@@ -0,0 +1,97 @@
+"""Streaming exports of bookings as CSV and newline delimited JSON."""
+
+from __future__ import annotations
+
+import csv
+import json
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from django.db.models.query import QuerySet
+
+    from thingbooker.things.models import Booking
+
+# column name and lookup for each exported field
+EXPORT_FIELDS = [
+    ("id", "id"),
+    ("thing_id", "thing_id"),
+    ("thing_name", "thing__name"),
+    ("booker_id", "booker_id"),
+    ("booker_username", "booker__username"),
+    ("status", "status"),
+    ("num_people", "num_people"),
+    ("start_date", "start_date"),
+    ("end_date", "end_date"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+]
+
+
+class Echo:
+    """File-like object that returns what is written, so csv.writer can be used in a stream."""
+
+    def write(self, value: str) -> str:
+        """Returns the value instead of storing it"""
+
+        return value
+
+
+def export_rows(bookings: QuerySet[Booking]) -> Iterator[tuple]:
+    """
+    Yields the exported fields of each booking.
+
+    The thing and booker are joined in the same query and the rows are read as tuples with a
+    server-side cursor, so no model instances are created and memory use stays bounded.
+    """
+
+    rows = bookings.values_list(*(lookup for _, lookup in EXPORT_FIELDS))
+    yield from rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def buffer_lines(lines: Iterator[str]) -> Iterator[str]:
+    """Joins lines into larger pieces, so the response is not written one row at a time."""
+
+    buffer: list[str] = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= settings.EXPORT_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def csv_lines(bookings: QuerySet[Booking]) -> Iterator[str]:
+    """Yields the bookings as CSV lines, starting with a header row."""
+
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in EXPORT_FIELDS])
+    for row in export_rows(bookings):
+        yield writer.writerow(
+            [value.isoformat() if hasattr(value, "isoformat") else value for value in row]
+        )
+
+
+def ndjson_lines(bookings: QuerySet[Booking]) -> Iterator[str]:
+    """Yields the bookings as one JSON object per line."""
+
+    names = [name for name, _ in EXPORT_FIELDS]
+    for row in export_rows(bookings):
+        yield json.dumps(dict(zip(names, row, strict=True)), cls=DjangoJSONEncoder) + "\n"
+
+
+def generate_csv(bookings: QuerySet[Booking]) -> Iterator[str]:
+    """Streams the bookings as CSV."""
+
+    return buffer_lines(csv_lines(bookings))
+
+
+def generate_ndjson(bookings: QuerySet[Booking]) -> Iterator[str]:
+    """Streams the bookings as newline delimited JSON."""
+
+    return buffer_lines(ndjson_lines(bookings))
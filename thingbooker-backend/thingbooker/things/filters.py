@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from rest_framework.filters import BaseFilterBackend
+
+from thingbooker.things.interface import ThingInterface
+from thingbooker.things.serializers import TimeWindowSerializer
+
+if TYPE_CHECKING:
+    from django.db.models.query import QuerySet
+    from rest_framework.views import APIView
+
+    from thingbooker.base_types import ThingbookerRequest
+
+
+class BookingTimeWindowFilter(BaseFilterBackend):
+    """Filters bookings on the start and end query parameters."""
+
+    def filter_queryset(
+        self, request: ThingbookerRequest, queryset: QuerySet, view: APIView
+    ) -> QuerySet:
+        """Keeps the bookings that overlap the time window given in the query parameters"""
+
+        serializer = TimeWindowSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        return ThingInterface.filter_bookings_by_window(queryset, **serializer.validated_data)
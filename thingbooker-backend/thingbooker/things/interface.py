@@ -1,31 +1,104 @@
 from __future__ import annotations
 
+from bisect import bisect_left
 from typing import TYPE_CHECKING
 
 from django.conf import settings
-from django.db.models import Q
+from django.db import IntegrityError, connection, transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import Exists, Max, OuterRef, Q
 from django.utils import timezone
 
 from thingbooker.base_types import ThingbookerResponse
 from thingbooker.mail.interface import EmailInterface
-from thingbooker.things.enums import BookingStatusEnum
+from thingbooker.things.cache import thing_responses
+from thingbooker.things.enums import BookingStatusEnum, BookingStatusOutcomeEnum
+from thingbooker.things.models import Booking, Rule, Thing, booking_period
+from thingbooker.things.occupancy import (
+    get_free_windows,
+    get_occupancy_steps,
+    get_peak_occupancy,
+)
+from thingbooker.users.interface import GroupMembershipInterface
+from thingbooker.users.models import ThingbookerGroup
 
 if TYPE_CHECKING:
-    from datetime import datetime
+    from collections.abc import Iterable
+    from datetime import datetime, timedelta
+    from typing import Any
+    from uuid import UUID
 
-    from thingbooker.things.models import Booking, Thing
-    from thingbooker.things.serializers import BookingSerializer
+    from django.db.models.query import QuerySet
+
+    from thingbooker.things.occupancy import Interval
+    from thingbooker.things.serializers import BookingSerializer, RecurringBookingSerializer
     from thingbooker.users.models import ThingbookerUser
 
 
 class ThingInterface:
     """Helper methods relating to things."""
 
+    @staticmethod
+    def is_member(user: ThingbookerUser, thing_ref: str = "pk") -> Exists:
+        """
+        Returns an EXISTS expression that is true when the user is a member of the thing
+        referenced by thing_ref.
+
+        Unlike filtering through the members relation, this never duplicates rows, and it is
+        answered by the indexes on the membership table.
+        """
+
+        return Exists(
+            Thing.members.through.objects.filter(
+                thing_id=OuterRef(thing_ref), thingbookeruser_id=user.pk
+            )
+        )
+
+    @classmethod
+    def get_visible_things(cls, user: ThingbookerUser) -> QuerySet[Thing]:
+        """Fetches the things the user owns or is a member of."""
+
+        return Thing.objects.filter(Q(owner_id=user.pk) | cls.is_member(user))
+
+    @staticmethod
+    def get_visible_bookings(user: ThingbookerUser) -> QuerySet[Booking]:
+        """
+        Fetches the bookings the user has made, or that are made on things they are member of.
+
+        The two cases are combined with UNION instead of OR. Each branch is then answered by
+        its own index, on the booker and on the thing, so a user who can only see a few
+        bookings does not make the database test every booking.
+        """
+
+        made = Booking.objects.filter(booker_id=user.pk).order_by().values("pk")
+        on_member_things = (
+            Booking.objects.filter(
+                thing_id__in=Thing.members.through.objects.filter(
+                    thingbookeruser_id=user.pk
+                ).values("thing_id")
+            )
+            .order_by()
+            .values("pk")
+        )
+        return Booking.objects.filter(pk__in=made.union(on_member_things))
+
+    @classmethod
+    def get_visible_rules(cls, user: ThingbookerUser) -> QuerySet[Rule]:
+        """Fetches the rules of the things the user owns or is a member of."""
+
+        owns_thing = Exists(Thing.objects.filter(pk=OuterRef("thing_id"), owner_id=user.pk))
+        return Rule.objects.filter(owns_thing | cls.is_member(user, "thing_id"))
+
     @staticmethod
     def get_overlapping_bookings(
         thing: Thing, booking: Booking = None, start: datetime = None, end: datetime = None
     ):
-        """Finds and returns bookings that overlap with the given status query."""
+        """
+        Finds and returns bookings that overlap with the given booking or time frame.
+
+        Overlap is checked on the half-open booking period, which is backed by a GiST index
+        on (thing, period).
+        """
 
         if booking:
             start = booking.start_date
@@ -34,13 +107,145 @@ class ThingInterface:
         if not (start and end):
             return thing.bookings.none()
 
-        bookings = thing.bookings.filter(start_date__lte=end, end_date__gte=start)
+        bookings = thing.bookings.alias(period=booking_period()).filter(
+            period__overlap=DateTimeTZRange(start, end)
+        )
 
         if booking:
             bookings = bookings.exclude(pk=booking.pk)
 
         return bookings
 
+    @staticmethod
+    def filter_bookings_by_window(
+        bookings: QuerySet[Booking], start: datetime = None, end: datetime = None
+    ) -> QuerySet[Booking]:
+        """Keeps the bookings that overlap the time window. Both ends of the window are optional."""
+
+        if start:
+            bookings = bookings.filter(end_date__gt=start)
+        if end:
+            bookings = bookings.filter(start_date__lt=end)
+
+        return bookings
+
+    @staticmethod
+    def get_occupancy(thing: Thing, num_people: int) -> int:
+        """
+        Returns how much of the thing's capacity a booking takes up.
+
+        A thing without a capacity fits one booking at a time, so each booking takes up all of it.
+        """
+
+        return num_people if thing.capacity is not None else 1
+
+    @staticmethod
+    def get_capacity(thing: Thing) -> int:
+        """Returns the capacity of the thing, a thing without one has room for one booking."""
+
+        return thing.capacity if thing.capacity is not None else 1
+
+    @classmethod
+    def get_accepted_intervals(
+        cls, thing: Thing, start: datetime, end: datetime, exclude: Booking | None = None
+    ) -> list[Interval]:
+        """
+        Fetches the accepted bookings overlapping the window with one query.
+
+        Returns them as (start, end, occupancy) sorted by start, for the occupancy sweeps.
+        """
+
+        bookings = cls.get_overlapping_bookings(thing, start=start, end=end).filter(
+            status=BookingStatusEnum.ACCEPTED.value
+        )
+        if exclude is not None:
+            bookings = bookings.exclude(pk=exclude.pk)
+
+        rows = bookings.order_by("start_date").values_list("start_date", "end_date", "num_people")
+        return [(s, e, cls.get_occupancy(thing, n)) for s, e, n in rows]
+
+    @classmethod
+    def fits(
+        cls,
+        thing: Thing,
+        intervals: list[Interval],
+        start: datetime,
+        end: datetime,
+        num_people: int,
+    ) -> bool:
+        """
+        Returns True if a booking fits next to the accepted intervals at every instant.
+
+        The occupancy is computed with one sweep over the intervals that overlap the booking,
+        instead of comparing the intervals pairwise.
+        """
+
+        steps = get_occupancy_steps(i for i in intervals if i[0] < end and i[1] > start)
+        peak = get_peak_occupancy(steps, start, end)
+        return peak + cls.get_occupancy(thing, num_people) <= cls.get_capacity(thing)
+
+    @classmethod
+    def check_capacity_change(cls, thing: Thing, capacity: int | None) -> str | None:
+        """
+        Returns why the thing cannot get the new capacity, or None if it can.
+
+        Without a capacity, accepted bookings may not overlap at all, also in the past, as the
+        exclusion constraint applies again. A lower capacity must fit the upcoming accepted
+        bookings. Either way the accepted bookings are swept once.
+        """
+
+        accepted = thing.bookings.filter(status=BookingStatusEnum.ACCEPTED.value)
+        if capacity is None:
+            rows = accepted.values_list("start_date", "end_date").iterator()
+            steps = get_occupancy_steps((start, end, 1) for start, end in rows)
+            if any(occupancy > 1 for _, occupancy in steps):
+                return "Accepted bookings overlap, so the capacity cannot be removed."
+            return None
+
+        rows = (
+            accepted.filter(end_date__gt=timezone.now())
+            .values_list("start_date", "end_date", "num_people")
+            .iterator()
+        )
+        if any(occupancy > capacity for _, occupancy in get_occupancy_steps(rows)):
+            return f"Upcoming accepted bookings have more than {capacity} people at the same time."
+        return None
+
+    @staticmethod
+    def capacity_changed(thing: Thing, previous_capacity: int | None) -> None:
+        """Updates the is_shared copy on the bookings when the thing gets or loses a capacity."""
+
+        if (previous_capacity is None) != (thing.capacity is None):
+            Booking.objects.filter(thing=thing).update(is_shared=thing.capacity is not None)
+
+    @classmethod
+    def get_free_intervals(
+        cls,
+        thing: Thing,
+        start: datetime,
+        end: datetime,
+        min_duration: timedelta,
+        num_people: int = 1,
+    ) -> list[dict[str, datetime]]:
+        """
+        Finds the intervals between start and end where a booking for num_people fits.
+
+        For a thing without a capacity, these are the intervals without an accepted booking.
+        Fetches the accepted bookings overlapping the window in one query, and sweeps over their
+        starts and ends once. Intervals shorter than min_duration are left out.
+        """
+
+        max_occupancy = cls.get_capacity(thing) - cls.get_occupancy(thing, num_people)
+        if max_occupancy < 0:
+            return []
+
+        steps = get_occupancy_steps(cls.get_accepted_intervals(thing, start, end))
+        return [
+            {"start": free_start, "end": free_end}
+            for free_start, free_end in get_free_windows(steps, start, end, max_occupancy)
+            if free_end - free_start >= min_duration
+        ]
+
     @classmethod
     def add_new_booking(cls, thing: Thing, user: ThingbookerUser, serializer: BookingSerializer):
         """Tries creating a new booking on the given dates, returns either an error dictionary, or
@@ -51,72 +256,651 @@ class ThingInterface:
 
         start: datetime = serializer.validated_data["start_date"]
         end: datetime = serializer.validated_data["end_date"]
+        num_people: int = serializer.validated_data.get("num_people", 1)
         bookings = cls.get_overlapping_bookings(thing, start=start, end=end)
         bookings = bookings.filter(
             Q(start_date__gte=timezone.now()) & Q(status=BookingStatusEnum.ACCEPTED.value)
         )
 
-        if bookings.exists():
+        if thing.capacity is not None:
+            intervals = cls.get_accepted_intervals(thing, start, end)
+            if not cls.fits(thing, intervals, start, end, num_people):
+                return ThingbookerResponse(
+                    code=400,
+                    payload={"num_people": "There is not room for this many people at this time."},
+                )
+        elif bookings.exists():
             overlapping_booking = bookings.first()
             payload = {}
-            if overlapping_booking.start_date <= end and overlapping_booking.end_date >= end:
+            if overlapping_booking.start_date < end <= overlapping_booking.end_date:
                 payload.update({"end_date": "Cannot end booking after another starts."})
-            if overlapping_booking.end_date >= start and overlapping_booking.start_date <= start:
+            if overlapping_booking.start_date <= start < overlapping_booking.end_date:
                 payload.update({"start_date": "Cannot start booking before another ends."})
 
             return ThingbookerResponse(code=400, payload=payload)
 
-        booking = serializer.save(thing=thing, booker=user)
+        with transaction.atomic():
+            booking = serializer.save(thing=thing, booker=user)
 
-        url = f"{settings.CLIENT_BASE_URL}things/{thing.name}/"
-        context = {"booking": booking, "thing": thing, "update_status_url": url}
-        EmailInterface.send_mail(
-            template_name="things/notify_owner_of_new_booking",
-            context=context,
-            to_address=thing.owner.username,
-            subject="[Thingbooker] Ny booking",
-        )
+            url = f"{settings.CLIENT_BASE_URL}things/{thing.name}/"
+            context = {"booking": booking, "thing": thing, "update_status_url": url}
+            EmailInterface.queue_mail(
+                template_name="things/notify_owner_of_new_booking",
+                context=context,
+                to_address=thing.owner.username,
+                subject="[Thingbooker] Ny booking",
+            )
 
         return ThingbookerResponse(code=201, payload=booking)
 
     @classmethod
-    def accept_booking(cls, thing: Thing, booking: Booking, decline_overlapping: bool = True):
-        """Accepts a booking, and declines all other bookings that overlap."""
+    def find_conflicts(
+        cls, thing: Thing, occurrences: list[tuple[datetime, datetime]], num_people: int = 1
+    ) -> list[tuple[datetime, datetime]]:
+        """
+        Returns the occurrences that do not fit next to the accepted bookings of the thing.
+
+        Fetches the accepted bookings in the span of the occurrences with one query, sorted by
+        start. The occurrences are sorted and do not overlap, so one pass over both lists keeps
+        the accepted bookings that overlap the current occurrence, and only those are swept.
+        """
+
+        if not occurrences:
+            return []
+
+        accepted = cls.get_accepted_intervals(thing, occurrences[0][0], occurrences[-1][1])
+
+        conflicts: list[tuple[datetime, datetime]] = []
+        active: list[Interval] = []
+        i = 0
+        for start, end in occurrences:
+            while i < len(accepted) and accepted[i][0] < end:
+                active.append(accepted[i])
+                i += 1
+            # drop accepted bookings that end before this occurrence starts
+            active = [interval for interval in active if interval[1] > start]
+            if not cls.fits(thing, active, start, end, num_people):
+                conflicts.append((start, end))
+        return conflicts
 
-        bookings = cls.get_overlapping_bookings(thing, booking=booking).select_related(
-            "thing", "booker"
+    @classmethod
+    def add_recurring_booking(
+        cls, thing: Thing, user: ThingbookerUser, serializer: RecurringBookingSerializer
+    ) -> ThingbookerResponse:
+        """
+        Creates a waiting booking for each occurrence, or none if any of them has a conflict.
+
+        The bookings are created with one bulk_create, and the owner gets one summary email.
+        Assumes the serializer is valid.
+        """
+
+        occurrences: list[tuple[datetime, datetime]] = serializer.validated_data["occurrences"]
+        conflicts = cls.find_conflicts(
+            thing, occurrences, serializer.validated_data.get("num_people", 1)
         )
-        if bookings.filter(status=BookingStatusEnum.ACCEPTED.value).exists():
+        if conflicts:
             return ThingbookerResponse(
-                code=409,
-                payload={"error": "There is already an accepted booking in this time frame"},
+                code=400,
+                payload={
+                    "recurrence": "Some occurrences do not fit next to accepted bookings.",
+                    "conflicts": [
+                        {"start_date": start, "end_date": end} for start, end in conflicts
+                    ],
+                },
+            )
+
+        now = timezone.now()
+        bookings = [
+            Booking(
+                thing=thing,
+                booker=user,
+                num_people=serializer.validated_data.get("num_people", 1),
+                start_date=start,
+                end_date=end,
+                created_at=now,
+                updated_at=now,
+            )
+            for start, end in occurrences
+        ]
+
+        with transaction.atomic():
+            bookings = Booking.objects.bulk_create(bookings)
+            # bulk_create does not send post_save
+            thing_responses.invalidate(thing.pk)
+
+            url = f"{settings.CLIENT_BASE_URL}things/{thing.name}/"
+            context = {
+                "bookings": bookings,
+                "booker": user,
+                "thing": thing,
+                "recurrence": serializer.validated_data["recurrence"],
+                "update_status_url": url,
+            }
+            EmailInterface.queue_mail(
+                template_name="things/notify_owner_of_new_recurring_booking",
+                context=context,
+                to_address=thing.owner.username,
+                subject="[Thingbooker] Ny gjentakende booking",
+            )
+
+        return ThingbookerResponse(code=201, payload=bookings)
+
+    @staticmethod
+    def create_rules(thing: Thing, rules_data: list[dict[str, Any]]) -> list[Rule]:
+        """
+        Creates the rules of a thing in one statement, ordered after any existing rules.
+
+        bulk_create does not call save, so the order and the timestamps are set here.
+        """
+
+        if not rules_data:
+            return []
+
+        now = timezone.now()
+        # like Model.save, continue after the highest order, which can exceed the number of rules
+        last_order = Rule.objects.filter(thing=thing).aggregate(Max("_order"))["_order__max"]
+        first_order = 0 if last_order is None else last_order + 1
+        rules = [
+            Rule(thing=thing, _order=first_order + i, created_at=now, updated_at=now, **data)
+            for i, data in enumerate(rules_data)
+        ]
+        created = Rule.objects.bulk_create(rules)
+        # bulk_create does not send post_save
+        thing_responses.invalidate(thing.pk)
+        return created
+
+    @classmethod
+    def reorder_rules(cls, thing: Thing, rule_ids: list[UUID]) -> ThingbookerResponse:
+        """
+        Orders the rules of the thing as in rule_ids, which must list each rule exactly once.
+
+        The new order is written with a single UPDATE statement. The thing is locked, so rules
+        cannot be added while the ids are checked and the order is changed.
+        """
+
+        with transaction.atomic():
+            cls.lock_thing(thing)
+
+            existing = set(thing.rules.values_list("pk", flat=True))
+            if len(rule_ids) != len(existing) or set(rule_ids) != existing:
+                return ThingbookerResponse(
+                    code=400,
+                    payload={"rules": ["Must list all rules of the thing, each exactly once."]},
+                )
+
+            now = timezone.now()
+            Rule.objects.filter(thing=thing).bulk_update(
+                [Rule(pk=pk, _order=order, updated_at=now) for order, pk in enumerate(rule_ids)],
+                ["_order", "updated_at"],
+            )
+            # bulk_update does not send post_save
+            thing_responses.invalidate(thing.pk)
+
+        return ThingbookerResponse(code=200, payload=thing.rules.all())
+
+    @staticmethod
+    def lock_thing(thing: Thing) -> Thing:
+        """
+        Takes a row lock on the thing until the surrounding transaction ends, and returns the
+        locked row.
+
+        Used to serialize changes to the status of a thing's bookings, while bookings of other
+        things can be changed in parallel. Decisions that depend on the thing, like its
+        capacity, must be made on the returned row, as the given instance may be stale.
+        """
+
+        return Thing.objects.select_for_update().get(pk=thing.pk)
+
+    @classmethod
+    def get_bookings_that_no_longer_fit(cls, thing: Thing, waiting: list[Booking]) -> list[Booking]:
+        """
+        Returns the waiting bookings that do not fit next to the accepted bookings.
+
+        The accepted bookings in the span of the waiting bookings are fetched with one query.
+        """
+
+        if not waiting:
+            return []
+
+        intervals = cls.get_accepted_intervals(
+            thing, min(b.start_date for b in waiting), max(b.end_date for b in waiting)
+        )
+        return [
+            b
+            for b in waiting
+            if not cls.fits(thing, intervals, b.start_date, b.end_date, b.num_people)
+        ]
+
+    @classmethod
+    def accept_booking(cls, thing: Thing, booking: Booking, decline_overlapping: bool = True):
+        """
+        Accepts a booking, and declines all other bookings that overlap.
+
+        For a thing with a capacity, the booking is accepted as long as the people of the
+        overlapping accepted bookings never pass the capacity, and only the overlapping waiting
+        bookings that no longer fit are declined.
+
+        The thing is locked while accepting, so concurrent accepts for the same thing are done
+        one at a time. The exclusion constraint on Booking is a last line of defence, and a
+        violation of it is reported as a conflict as well.
+        """
+
+        conflict = ThingbookerResponse(
+            code=409,
+            payload={"error": "There is already an accepted booking in this time frame"},
+        )
+
+        with transaction.atomic():
+            thing = cls.lock_thing(thing)
+
+            bookings = cls.get_overlapping_bookings(thing, booking=booking).select_related(
+                "thing", "booker"
             )
+            if thing.capacity is not None:
+                intervals = cls.get_accepted_intervals(
+                    thing, booking.start_date, booking.end_date, exclude=booking
+                )
+                if not cls.fits(
+                    thing, intervals, booking.start_date, booking.end_date, booking.num_people
+                ):
+                    return ThingbookerResponse(
+                        code=409,
+                        payload={"error": "There is not room for this booking in this time frame"},
+                    )
+            elif bookings.filter(status=BookingStatusEnum.ACCEPTED.value).exists():
+                return conflict
 
-        booking.status = BookingStatusEnum.ACCEPTED
-        booking.save()
-        payload = {"accepted": "Booking was accepted"}
-        if decline_overlapping:
-            declined = bookings.update(status=BookingStatusEnum.DECLINED)
-            payload.update({"num_declined": declined})
-
-            for b in bookings:
-                if b.booker == thing.owner:
-                    continue
-                context = {"declined": True, "booking": b}
-                EmailInterface.send_mail(
+            previous_status = booking.status
+            booking.status = BookingStatusEnum.ACCEPTED
+            booking.is_shared = thing.capacity is not None
+            payload = {"accepted": "Booking was accepted"}
+            try:
+                with transaction.atomic():
+                    booking.save()
+            except IntegrityError:
+                booking.status = previous_status
+                return conflict
+
+            if decline_overlapping:
+                # capture the rows once, so the same bookings are updated and notified
+                if thing.capacity is not None:
+                    to_decline = cls.get_bookings_that_no_longer_fit(
+                        thing, list(bookings.filter(status=BookingStatusEnum.WAITING.value))
+                    )
+                else:
+                    to_decline = list(bookings.exclude(status=BookingStatusEnum.DECLINED.value))
+                declined = Booking.objects.filter(pk__in=[b.pk for b in to_decline]).update(
+                    status=BookingStatusEnum.DECLINED, updated_at=timezone.now()
+                )
+                payload.update({"num_declined": declined})
+                # queryset updates do not send post_save
+                thing_responses.invalidate(thing.pk)
+
+                recipients = []
+                for b in to_decline:
+                    b.status = BookingStatusEnum.DECLINED
+                    if b.booker_id != thing.owner_id:
+                        recipients.append(({"declined": True, "booking": b}, b.booker.username))
+
+                EmailInterface.queue_mass_mail(
                     template_name="things/notify_booking_status_changed",
-                    context=context,
-                    to_address=b.booker.username,
+                    recipients=recipients,
                     subject="[Thingbooker] Bookingen din er avist",
                 )
 
-        if booking.booker != thing.owner:
-            context = {"declined": False, "booking": booking}
-            EmailInterface.send_mail(
+            if booking.booker_id != thing.owner_id:
+                context = {"declined": False, "booking": booking}
+                EmailInterface.queue_mail(
+                    template_name="things/notify_booking_status_changed",
+                    context=context,
+                    to_address=booking.booker.username,
+                    subject="[Thingbooker] Bookingen din er godtatt",
+                )
+
+        return ThingbookerResponse(code=200, payload=payload)
+
+    @staticmethod
+    def _overlaps(starts: list[datetime], ends: list[datetime], start: datetime, end: datetime):
+        """
+        Returns True if [start, end) overlaps one of the intervals.
+
+        The intervals must not overlap each other and be sorted, so the ends are sorted as well.
+        Only the last interval that starts before end can overlap.
+        """
+
+        i = bisect_left(starts, end)
+        return i > 0 and ends[i - 1] > start
+
+    @classmethod
+    def update_booking_statuses(
+        cls,
+        thing: Thing,
+        changes: list[tuple[UUID, BookingStatusEnum]],
+        decline_overlapping: bool = True,
+    ) -> ThingbookerResponse:
+        """
+        Accepts and declines several bookings of the thing in one transaction.
+
+        The requested bookings are fetched, and then the bookings that overlap the ones to
+        accept with one interval query. Conflicts are resolved in memory, in the order the
+        changes are given: a booking is not accepted if it overlaps an accepted booking,
+        including one accepted earlier in the same request. For a thing with a capacity, it is
+        not accepted if it does not fit next to them. All changes are written with one
+        bulk_update, and the notifications are queued. Returns the outcome per booking.
+        """
+
+        requested_ids = [booking_id for booking_id, _ in changes]
+        new_statuses = dict(changes)
+        accept_ids = [
+            booking_id
+            for booking_id, new_status in changes
+            if new_status == BookingStatusEnum.ACCEPTED
+        ]
+
+        with transaction.atomic():
+            thing = cls.lock_thing(thing)
+
+            bookings: dict[UUID, Booking] = {
+                booking.pk: booking
+                for booking in thing.bookings.filter(pk__in=requested_ids).select_related("booker")
+            }
+
+            to_accept = [bookings[pk] for pk in accept_ids if pk in bookings]
+            if to_accept:
+                window = DateTimeTZRange(
+                    min(b.start_date for b in to_accept), max(b.end_date for b in to_accept)
+                )
+                overlapping = (
+                    thing.bookings.alias(period=booking_period())
+                    .filter(
+                        period__overlap=window,
+                        status__in=[BookingStatusEnum.ACCEPTED, BookingStatusEnum.WAITING],
+                    )
+                    .exclude(pk__in=requested_ids)
+                    .select_related("booker")
+                )
+                bookings.update((booking.pk, booking) for booking in overlapping)
+
+            # accepted bookings that stay accepted, sorted by start
+            accepted = sorted(
+                (
+                    b
+                    for b in bookings.values()
+                    if b.status == BookingStatusEnum.ACCEPTED
+                    and new_statuses.get(b.pk, BookingStatusEnum.ACCEPTED)
+                    == BookingStatusEnum.ACCEPTED
+                ),
+                key=lambda b: b.start_date,
+            )
+            starts = [b.start_date for b in accepted]
+            ends = [b.end_date for b in accepted]
+            new_starts: list[datetime] = []
+            new_ends: list[datetime] = []
+            # with a capacity, accepted bookings can overlap, so they are swept instead
+            intervals: list[Interval] = [
+                (b.start_date, b.end_date, cls.get_occupancy(thing, b.num_people)) for b in accepted
+            ]
+            new_intervals: list[Interval] = []
+
+            outcomes: dict[UUID, BookingStatusOutcomeEnum] = {}
+            changed: list[Booking] = []
+            for booking_id, new_status in changes:
+                booking = bookings.get(booking_id)
+                if booking is None:
+                    outcomes[booking_id] = BookingStatusOutcomeEnum.NOT_FOUND
+                elif booking.status == new_status:
+                    outcomes[booking_id] = BookingStatusOutcomeEnum.UNCHANGED
+                elif new_status == BookingStatusEnum.DECLINED:
+                    outcomes[booking_id] = BookingStatusOutcomeEnum.DECLINED
+                    changed.append(booking)
+                elif (
+                    thing.capacity is None
+                    and cls._overlaps(starts, ends, booking.start_date, booking.end_date)
+                ) or (
+                    thing.capacity is not None
+                    and not cls.fits(
+                        thing, intervals, booking.start_date, booking.end_date, booking.num_people
+                    )
+                ):
+                    outcomes[booking_id] = BookingStatusOutcomeEnum.CONFLICT
+                else:
+                    outcomes[booking_id] = BookingStatusOutcomeEnum.ACCEPTED
+                    changed.append(booking)
+                    interval = (
+                        booking.start_date,
+                        booking.end_date,
+                        cls.get_occupancy(thing, booking.num_people),
+                    )
+                    intervals.append(interval)
+                    new_intervals.append(interval)
+                    i = bisect_left(starts, booking.start_date)
+                    starts.insert(i, booking.start_date)
+                    ends.insert(i, booking.end_date)
+                    i = bisect_left(new_starts, booking.start_date)
+                    new_starts.insert(i, booking.start_date)
+                    new_ends.insert(i, booking.end_date)
+
+            now = timezone.now()
+            for booking in changed:
+                booking.status = new_statuses[booking.pk]
+                booking.is_shared = thing.capacity is not None
+                booking.updated_at = now
+
+            def no_longer_fits(b: Booking) -> bool:
+                if thing.capacity is None:
+                    return cls._overlaps(new_starts, new_ends, b.start_date, b.end_date)
+                # only bookings in the fetched window are known, so this never declines a
+                # booking that still fits
+                return any(i[0] < b.end_date and i[1] > b.start_date for i in new_intervals) and (
+                    not cls.fits(thing, intervals, b.start_date, b.end_date, b.num_people)
+                )
+
+            declined_overlapping: list[Booking] = []
+            if decline_overlapping and new_starts:
+                for booking in bookings.values():
+                    if (
+                        booking.pk not in new_statuses
+                        and booking.status == BookingStatusEnum.WAITING
+                        and no_longer_fits(booking)
+                    ):
+                        booking.status = BookingStatusEnum.DECLINED
+                        booking.updated_at = now
+                        declined_overlapping.append(booking)
+
+            try:
+                with transaction.atomic():
+                    Booking.objects.bulk_update(
+                        changed + declined_overlapping, ["status", "is_shared", "updated_at"]
+                    )
+            except IntegrityError:
+                # the exclusion constraint is a last line of defence
+                return ThingbookerResponse(
+                    code=409,
+                    payload={"error": "There is already an accepted booking in this time frame"},
+                )
+            # bulk_update does not send post_save
+            thing_responses.invalidate(thing.pk)
+
+            notify = [b for b in changed + declined_overlapping if b.booker_id != thing.owner_id]
+            EmailInterface.queue_mass_mail(
                 template_name="things/notify_booking_status_changed",
-                context=context,
-                to_address=booking.booker.username,
+                recipients=[
+                    ({"declined": False, "booking": b}, b.booker.username)
+                    for b in notify
+                    if b.status == BookingStatusEnum.ACCEPTED
+                ],
                 subject="[Thingbooker] Bookingen din er godtatt",
             )
+            EmailInterface.queue_mass_mail(
+                template_name="things/notify_booking_status_changed",
+                recipients=[
+                    ({"declined": True, "booking": b}, b.booker.username)
+                    for b in notify
+                    if b.status == BookingStatusEnum.DECLINED
+                ],
+                subject="[Thingbooker] Bookingen din er avist",
+            )
 
+        payload = {
+            "results": [
+                {"id": booking_id, "outcome": outcomes[booking_id]} for booking_id in requested_ids
+            ],
+            "num_declined": len(declined_overlapping),
+        }
         return ThingbookerResponse(code=200, payload=payload)
+
+
+class ThingGroupInterface:
+    """
+    Keeps the members of things in sync with the group they are shared with.
+
+    All changes are single INSERT ... SELECT or DELETE statements against the membership
+    tables, so the size of the group does not decide the number of queries, and the members
+    of a thing are never rewritten as a whole. The owner of a thing is never removed.
+    """
+
+    @staticmethod
+    def _get_thing_member_columns() -> tuple[str, str, str]:
+        """Returns the table, thing column and user column of the thing members table."""
+
+        through = Thing.members.through
+        return (
+            through._meta.db_table,
+            through._meta.get_field("thing").column,
+            through._meta.get_field("thingbookeruser").column,
+        )
+
+    @classmethod
+    def add_group_members(cls, thing: Thing) -> None:
+        """Adds the members of the thing's group that are not members of the thing yet."""
+
+        if thing.group_id is None:
+            return
+
+        members, thing_column, member_column = cls._get_thing_member_columns()
+        groups, group_column, user_column = GroupMembershipInterface.get_membership_columns()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {members} ({thing_column}, {member_column})
+                SELECT %s, m.{user_column}
+                FROM {groups} m
+                JOIN {ThingbookerGroup._meta.db_table} tg ON tg.group_id = m.{group_column}
+                WHERE tg.id = %s
+                ON CONFLICT ({thing_column}, {member_column}) DO NOTHING
+                """,
+                [thing.pk, thing.group_id],
+            )
+
+    @classmethod
+    def remove_group_members(cls, thing: Thing, group_id: UUID) -> None:
+        """
+        Removes the members of the given group from the thing.
+
+        Used when a thing is no longer shared with the group. Users that are also in the group
+        the thing is shared with now are kept.
+        """
+
+        members, thing_column, member_column = cls._get_thing_member_columns()
+        groups, group_column, user_column = GroupMembershipInterface.get_membership_columns()
+        thingbooker_groups = ThingbookerGroup._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                DELETE FROM {members} tm
+                USING {groups} m, {thingbooker_groups} tg
+                WHERE tm.{thing_column} = %s
+                AND tm.{member_column} = m.{user_column}
+                AND m.{group_column} = tg.group_id
+                AND tg.id = %s
+                AND tm.{member_column} <> %s
+                AND NOT EXISTS (
+                    SELECT 1 FROM {groups} current
+                    JOIN {thingbooker_groups} current_tg
+                    ON current_tg.group_id = current.{group_column}
+                    WHERE current_tg.id = %s
+                    AND current.{user_column} = tm.{member_column}
+                )
+                """,
+                [thing.pk, group_id, thing.owner_id, thing.group_id],
+            )
+
+    @classmethod
+    def group_changed(cls, thing: Thing, previous_group_id: UUID | None) -> None:
+        """Syncs the members after the group of the thing was set, changed or removed."""
+
+        if thing.group_id == previous_group_id:
+            return
+
+        with transaction.atomic():
+            if previous_group_id is not None:
+                cls.remove_group_members(thing, previous_group_id)
+            cls.add_group_members(thing)
+
+    @classmethod
+    def add_memberships(cls, instance_is_group: bool, pk: object, others: Iterable) -> None:
+        """
+        Adds users that joined a group to the things shared with that group.
+
+        Takes the arguments of m2m_changed on the user/group membership table, see
+        GroupMembershipInterface.get_changed_filter. Call this after the memberships are added.
+        """
+
+        others = list(others)
+        if not others:
+            return
+
+        members, thing_column, member_column = cls._get_thing_member_columns()
+        groups, group_column, user_column = GroupMembershipInterface.get_membership_columns()
+        changed_filter, params = GroupMembershipInterface.get_changed_filter(
+            "m", instance_is_group, pk, others
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {members} ({thing_column}, {member_column})
+                SELECT t.id, m.{user_column}
+                FROM {Thing._meta.db_table} t
+                JOIN {ThingbookerGroup._meta.db_table} tg ON tg.id = t.group_id
+                JOIN {groups} m ON m.{group_column} = tg.group_id
+                WHERE {changed_filter}
+                ON CONFLICT ({thing_column}, {member_column}) DO NOTHING
+                """,
+                params,
+            )
+
+    @classmethod
+    def remove_memberships(
+        cls, instance_is_group: bool, pk: object, others: Iterable | None
+    ) -> None:
+        """
+        Removes users that leave a group from the things shared with that group.
+
+        Like add_memberships, but others can be None for all memberships of the instance. Call
+        this before the memberships are removed, in the same transaction.
+        """
+
+        if others is not None:
+            others = list(others)
+            if not others:
+                return
+
+        members, thing_column, member_column = cls._get_thing_member_columns()
+        groups, group_column, user_column = GroupMembershipInterface.get_membership_columns()
+        changed_filter, params = GroupMembershipInterface.get_changed_filter(
+            "m", instance_is_group, pk, others
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                DELETE FROM {members} tm
+                USING {Thing._meta.db_table} t, {ThingbookerGroup._meta.db_table} tg, {groups} m
+                WHERE tm.{thing_column} = t.id
+                AND tg.id = t.group_id
+                AND m.{group_column} = tg.group_id
+                AND m.{user_column} = tm.{member_column}
+                AND tm.{member_column} <> t.owner_id
+                AND {changed_filter}
+                """,
+                params,
+            )
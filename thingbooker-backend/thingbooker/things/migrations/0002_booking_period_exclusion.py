@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-17 01:17
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import BtreeGistExtension
+import django.core.validators
+from django.db import migrations, models
+import django.utils.timezone
+import thingbooker.things.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('things', '0001_initial'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AlterField(
+            model_name='booking',
+            name='end_date',
+            field=models.DateTimeField(validators=[django.core.validators.MinValueValidator(django.utils.timezone.now)]),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='num_people',
+            field=models.PositiveIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1, "Can't make a booking with 0 or less persons")], verbose_name='Number of guests using the thing'),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='start_date',
+            field=models.DateTimeField(validators=[django.core.validators.MinValueValidator(django.utils.timezone.now)]),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='status',
+            field=models.TextField(blank=True, choices=[('declined', 'Booking is declined'), ('accepted', 'Booking is accepted'), ('waiting', 'Booking is waiting for approval')], default='waiting', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=django.contrib.postgres.indexes.GistIndex(models.F('thing'), thingbooker.things.models.TsTzRange('start_date', 'end_date', django.contrib.postgres.fields.ranges.RangeBoundary()), name='booking_thing_period_gist'),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status', 'accepted')), expressions=[('thing', '='), (thingbooker.things.models.TsTzRange('start_date', 'end_date', django.contrib.postgres.fields.ranges.RangeBoundary()), '&&')], name='exclude_overlapping_accepted_bookings'),
+        ),
+    ]
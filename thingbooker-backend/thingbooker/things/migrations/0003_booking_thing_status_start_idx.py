@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-17 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('things', '0002_booking_period_exclusion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['thing', 'status', 'start_date'], name='booking_thing_status_start_idx'),
+        ),
+    ]
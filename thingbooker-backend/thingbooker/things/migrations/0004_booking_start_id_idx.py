@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-17 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('things', '0003_booking_thing_status_start_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['start_date', 'id'], name='booking_start_id_idx'),
+        ),
+    ]
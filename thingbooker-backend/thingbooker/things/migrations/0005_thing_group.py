@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-17 01:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_backfill_known_users'),
+        ('things', '0004_booking_start_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thing',
+            name='group',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='things', to='users.thingbookergroup'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-17 01:50
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.core.validators
+from django.db import migrations, models
+import thingbooker.things.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('things', '0005_thing_group'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='booking',
+            name='exclude_overlapping_accepted_bookings',
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='is_shared',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='thing',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Number of people that can use the thing at the same time. Empty means only one booking at a time.', null=True, validators=[django.core.validators.MinValueValidator(1, 'Capacity must be at least 1')]),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('is_shared', False), ('status', 'accepted')), expressions=[('thing', '='), (thingbooker.things.models.TsTzRange('start_date', 'end_date', django.contrib.postgres.fields.ranges.RangeBoundary()), '&&')], name='exclude_overlapping_accepted_bookings'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-17 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('things', '0006_thing_capacity'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_thing_status_start_idx',
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ['waiting', 'accepted'])), fields=['thing', 'start_date', 'id'], name='booking_thing_active_start_idx'),
+        ),
+    ]
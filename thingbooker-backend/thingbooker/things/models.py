@@ -3,6 +3,9 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeBoundary, RangeOperators
+from django.contrib.postgres.indexes import GistIndex
 from django.core.validators import MinValueValidator, validate_image_file_extension
 from django.db import models
 from django.utils import timezone
@@ -13,7 +16,7 @@ from thingbooker.things.enums import BookingStatusEnum
 if TYPE_CHECKING:
     from django.db.models.manager import ManyToManyRelatedManager, RelatedManager
 
-    from thingbooker.users.models import ThingbookerUser
+    from thingbooker.users.models import ThingbookerGroup, ThingbookerUser
 
 
 def thing_picture_upload_path(instance: Thing, filename: str):
@@ -24,12 +27,37 @@ def thing_picture_upload_path(instance: Thing, filename: str):
     return f"things/pictures/{instance.id}.{extension}"
 
 
+class TsTzRange(models.Func):
+    """Builds a tstzrange from a start and end timestamp."""
+
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+def booking_period():
+    """
+    Returns the expression for the period a booking covers.
+
+    The range is half-open ([start, end)), so a booking may start at the same time another ends.
+    The expression is used by the GiST index and exclusion constraint on Booking, and queries
+    must use the same expression for Postgres to pick the index.
+    """
+
+    return TsTzRange("start_date", "end_date", RangeBoundary())
+
+
 class Thing(ThingbookerModel):
     """
     Model for a thing.
 
     A thing is something that can be booked. A think has a collection of members
     which is derived from the group which is connected to it.
+
+    The members of the group are added as members of the thing, and users that leave the group
+    are removed again, see ThingGroupInterface. Members can also be added directly.
+
+    Without a capacity, only one booking can be accepted at a time. With a capacity, bookings
+    can be accepted as long as the number of people at the same time stays within it.
     """
 
     if TYPE_CHECKING:
@@ -51,6 +79,20 @@ class Thing(ThingbookerModel):
     members: ManyToManyRelatedManager[ThingbookerUser] = models.ManyToManyField(
         get_user_model(), related_name="things"
     )
+    capacity = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1, "Capacity must be at least 1")],
+        help_text="Number of people that can use the thing at the same time. "
+        "Empty means only one booking at a time.",
+    )
+    group: ThingbookerGroup | None = models.ForeignKey(
+        "users.ThingbookerGroup",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="things",
+    )
 
     objects: ThingbookerManager = ThingbookerManager()
 
@@ -89,12 +131,35 @@ class Booking(ThingbookerModel):
     start_date = models.DateTimeField(validators=[MinValueValidator(timezone.now)])
     end_date = models.DateTimeField(validators=[MinValueValidator(timezone.now)])
 
+    # copy of whether the thing has a capacity, which exempts it from the exclusion constraint
+    is_shared = models.BooleanField(default=False, editable=False)
+
     class Meta:
         ordering = ["thing", "start_date"]
+        indexes = [
+            GistIndex(models.F("thing"), booking_period(), name="booking_thing_period_gist"),
+            # the listings of a thing only show waiting and accepted bookings, by start date and id
+            models.Index(
+                fields=["thing", "start_date", "id"],
+                condition=models.Q(
+                    status__in=[BookingStatusEnum.WAITING, BookingStatusEnum.ACCEPTED]
+                ),
+                name="booking_thing_active_start_idx",
+            ),
+            models.Index(fields=["start_date", "id"], name="booking_start_id_idx"),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(end_date__gt=models.F("start_date")), name="end_date__gt__start_date"
-            )
+            ),
+            ExclusionConstraint(
+                name="exclude_overlapping_accepted_bookings",
+                expressions=[
+                    ("thing", RangeOperators.EQUAL),
+                    (booking_period(), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(status=BookingStatusEnum.ACCEPTED, is_shared=False),
+            ),
         ]
 
     def __str__(self) -> str:
@@ -0,0 +1,88 @@
+"""
+Sweep-line helpers for the number of people using a thing over time.
+
+Bookings are half-open intervals, so a booking that ends at the same instant as another starts
+is never counted together with it.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from datetime import datetime
+
+    # (start, end, number of people)
+    Interval = tuple[datetime, datetime, int]
+    # (instant, occupancy from this instant until the next step)
+    Step = tuple[datetime, int]
+
+
+def get_occupancy_steps(intervals: Iterable[Interval]) -> list[Step]:
+    """
+    Returns the occupancy over time as a step function, sorted by instant.
+
+    The start and end of each interval are sorted once and swept in a single pass. Ends sort
+    before starts at the same instant, since the change is negative.
+    """
+
+    events: list[tuple[datetime, int]] = []
+    for start, end, people in intervals:
+        events.append((start, people))
+        events.append((end, -people))
+    events.sort()
+
+    steps: list[Step] = []
+    occupancy = 0
+    for instant, change in events:
+        occupancy += change
+        if steps and steps[-1][0] == instant:
+            steps[-1] = (instant, occupancy)
+        else:
+            steps.append((instant, occupancy))
+    return steps
+
+
+def get_peak_occupancy(steps: list[Step], start: datetime, end: datetime) -> int:
+    """Returns the highest occupancy within [start, end)."""
+
+    peak = 0
+    for instant, occupancy in steps:
+        if instant >= end:
+            break
+        if instant <= start:
+            # the occupancy at start, until a later step replaces it
+            peak = occupancy
+        else:
+            peak = max(peak, occupancy)
+    return peak
+
+
+def get_free_windows(
+    steps: list[Step], start: datetime, end: datetime, max_occupancy: int
+) -> list[tuple[datetime, datetime]]:
+    """Returns the windows within [start, end) where the occupancy is at most max_occupancy."""
+
+    windows: list[tuple[datetime, datetime]] = []
+    occupancy_at_start = 0
+    later_steps: list[Step] = []
+    for instant, occupancy in steps:
+        if instant >= end:
+            break
+        if instant <= start:
+            occupancy_at_start = occupancy
+        else:
+            later_steps.append((instant, occupancy))
+
+    free_from = start if occupancy_at_start <= max_occupancy else None
+    for instant, occupancy in later_steps:
+        if occupancy > max_occupancy and free_from is not None:
+            windows.append((free_from, instant))
+            free_from = None
+        elif occupancy <= max_occupancy and free_from is None:
+            free_from = instant
+
+    if free_from is not None:
+        windows.append((free_from, end))
+    return windows
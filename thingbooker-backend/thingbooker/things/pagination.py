@@ -0,0 +1,11 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class BookingCursorPagination(CursorPagination):
+    """Cursor pagination for bookings, ordered by start date and then id."""
+
+    ordering = ("start_date", "id")
+    page_size = settings.BOOKING_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.BOOKING_MAX_PAGE_SIZE
@@ -4,15 +4,63 @@ from typing import TYPE_CHECKING
 
 from rest_framework.permissions import BasePermission
 
+from thingbooker.things.interface import ThingInterface
 from thingbooker.things.models import Thing
 
 if TYPE_CHECKING:
     from typing import Any
+    from uuid import UUID
 
     from rest_framework.viewsets import ViewSet
 
     from thingbooker.base_types import ThingbookerRequest
     from thingbooker.things.models import Booking, Rule
+    from thingbooker.users.models import ThingbookerUser
+
+
+class ThingAccess:
+    """
+    The things a user is a member or owner of.
+
+    Fetched with a single query, so permission checks afterwards are set lookups.
+    """
+
+    def __init__(self, user: ThingbookerUser) -> None:
+        self.user_id = user.pk
+
+        rows = (
+            ThingInterface.get_visible_things(user)
+            .annotate(is_member=ThingInterface.is_member(user))
+            .values_list("pk", "owner_id", "is_member")
+        )
+
+        self.member_of: set[UUID] = set()
+        self.owner_of: set[UUID] = set()
+        for thing_id, owner_id, member in rows:
+            if member:
+                self.member_of.add(thing_id)
+            if owner_id == user.pk:
+                self.owner_of.add(thing_id)
+
+    def is_member(self, thing_id: UUID) -> bool:
+        """Returns True if the user is a member of the thing"""
+
+        return thing_id in self.member_of
+
+    def is_owner(self, thing_id: UUID) -> bool:
+        """Returns True if the user owns the thing"""
+
+        return thing_id in self.owner_of
+
+
+def get_thing_access(request: ThingbookerRequest) -> ThingAccess:
+    """Returns the thing access of the requesting user. It is cached for the rest of the request."""
+
+    access: ThingAccess | None = getattr(request, "_thing_access", None)
+    if access is None or access.user_id != request.user.pk:
+        access = ThingAccess(request.user)
+        request._thing_access = access
+    return access
 
 
 class IsMemberOfThing(BasePermission):
@@ -26,11 +74,10 @@ class IsMemberOfThing(BasePermission):
         if user.is_admin_user:
             return True
 
-        if hasattr(obj, "thing"):
-            thing: Thing = obj.thing
-            return thing.members.contains(user)
+        if hasattr(obj, "thing_id"):
+            return get_thing_access(request).is_member(obj.thing_id)
         elif isinstance(obj, Thing):
-            return obj.members.contains(user)
+            return get_thing_access(request).is_member(obj.pk)
         return False
 
 
@@ -45,7 +92,11 @@ class BookingPermission(BasePermission):
         user = request.user
 
         if view.action in ["update", "partial_update", "destroy"]:
-            return user == obj.thing.owner or user == obj.booker or user.is_admin_user
+            return (
+                user.is_admin_user
+                or obj.booker_id == user.pk
+                or get_thing_access(request).is_owner(obj.thing_id)
+            )
         return True
 
 
@@ -58,7 +109,7 @@ class RulePermission(BasePermission):
         user = request.user
 
         if view.action in ["update", "partial_update", "destroy"]:
-            return user == obj.thing.owner or user.is_admin_user
+            return user.is_admin_user or get_thing_access(request).is_owner(obj.thing_id)
         return True
 
 
@@ -78,8 +129,10 @@ class ThingPermission(BasePermission):
             "partial_update",
             "destroy",
             "add_rule",
+            "reorder_rules",
             "update_booking_status",
+            "update_booking_statuses",
         ]:
-            return obj.owner == user
+            return get_thing_access(request).is_owner(obj.pk)
 
         return True
@@ -0,0 +1,178 @@
+"""
+Expands a subset of iCalendar recurrence rules (RFC 5545 RRULE) into booking periods.
+
+Supported are FREQ (DAILY, WEEKLY or MONTHLY), INTERVAL, COUNT, UNTIL and, for weekly rules,
+BYDAY with plain weekdays. Either COUNT or UNTIL is required, so the rule always ends.
+"""
+
+from __future__ import annotations
+
+import calendar
+from dataclasses import dataclass
+from datetime import MAXYEAR, UTC, datetime, time, timedelta
+from typing import TYPE_CHECKING
+
+from django.utils import timezone
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+FREQUENCIES = {"DAILY", "WEEKLY", "MONTHLY"}
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    """A parsed recurrence rule."""
+
+    freq: str
+    interval: int = 1
+    count: int | None = None
+    until: datetime | None = None
+    by_day: tuple[int, ...] = ()
+
+
+def parse_until(value: str) -> datetime:
+    """Parses an UNTIL value, a date includes the whole day in the current time zone."""
+
+    try:
+        if value.endswith("Z"):
+            return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=UTC)
+        if "T" in value:
+            return timezone.make_aware(datetime.strptime(value, "%Y%m%dT%H%M%S"))
+        day = datetime.strptime(value, "%Y%m%d").date()
+    except ValueError:
+        raise ValueError(f"Invalid UNTIL: {value}") from None
+    return timezone.make_aware(datetime.combine(day, time.max))
+
+
+def parse_positive_int(name: str, value: str) -> int:
+    """Parses a positive integer rule part."""
+
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError(f"{name} must be a positive integer")
+    return int(value)
+
+
+def parse_rrule(value: str) -> RecurrenceRule:
+    """Parses a recurrence rule like FREQ=WEEKLY;BYDAY=FR;COUNT=12. Raises ValueError."""
+
+    value = value.strip()
+    if value.upper().startswith("RRULE:"):
+        value = value[len("RRULE:") :]
+
+    parts: dict[str, str] = {}
+    for part in value.split(";"):
+        name, separator, part_value = part.partition("=")
+        name = name.strip().upper()
+        if not separator or not name or name in parts:
+            raise ValueError(f"Invalid rule part: {part}")
+        parts[name] = part_value.strip().upper()
+
+    unsupported = set(parts) - {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY"}
+    if unsupported:
+        raise ValueError(f"Unsupported rule parts: {', '.join(sorted(unsupported))}")
+
+    freq = parts.get("FREQ")
+    if freq not in FREQUENCIES:
+        raise ValueError(f"FREQ must be one of {', '.join(sorted(FREQUENCIES))}")
+
+    if ("COUNT" in parts) == ("UNTIL" in parts):
+        raise ValueError("Exactly one of COUNT and UNTIL is required")
+
+    by_day: tuple[int, ...] = ()
+    if "BYDAY" in parts:
+        if freq != "WEEKLY":
+            raise ValueError("BYDAY is only supported for weekly rules")
+        try:
+            by_day = tuple(sorted({WEEKDAYS[day] for day in parts["BYDAY"].split(",")}))
+        except KeyError:
+            raise ValueError(f"Invalid BYDAY: {parts['BYDAY']}") from None
+
+    return RecurrenceRule(
+        freq=freq,
+        interval=parse_positive_int("INTERVAL", parts.get("INTERVAL", "1")),
+        count=parse_positive_int("COUNT", parts["COUNT"]) if "COUNT" in parts else None,
+        until=parse_until(parts["UNTIL"]) if "UNTIL" in parts else None,
+        by_day=by_day,
+    )
+
+
+def add_months(value: datetime, months: int) -> datetime | None:
+    """Returns the same day and time the given number of months later, or None if it is missing."""
+
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    if year > MAXYEAR:
+        raise OverflowError("date value out of range")
+    if value.day > calendar.monthrange(year, month)[1]:
+        return None
+    return value.replace(year=year, month=month)
+
+
+def iter_local_starts(rule: RecurrenceRule, start: datetime) -> Iterator[datetime]:
+    """
+    Yields the naive local start times of the occurrences, in order and without end.
+
+    The first one is always the start itself, like DTSTART in iCalendar.
+    """
+
+    yield start
+    if rule.freq == "DAILY":
+        step = 1
+        while True:
+            yield start + timedelta(days=step * rule.interval)
+            step += 1
+    elif rule.freq == "WEEKLY":
+        days = rule.by_day or (start.weekday(),)
+        week = start - timedelta(days=start.weekday())
+        while True:
+            for day in days:
+                occurrence = week + timedelta(days=day)
+                if occurrence > start:
+                    yield occurrence
+            week += timedelta(weeks=rule.interval)
+    else:
+        step = 1
+        while True:
+            occurrence = add_months(start, step * rule.interval)
+            if occurrence is not None:
+                yield occurrence
+            step += 1
+
+
+def expand(
+    rule: RecurrenceRule, start: datetime, end: datetime, limit: int
+) -> list[tuple[datetime, datetime]]:
+    """
+    Returns the (start, end) of each occurrence, sorted by start.
+
+    Occurrences keep the wall clock time in the current time zone, so a booking every Friday at
+    18:00 stays at 18:00 across daylight saving changes. Each occurrence lasts as long as the
+    first one. Raises ValueError if there are no occurrences or more than limit, if they overlap,
+    or if they go past the latest date that can be represented.
+    """
+
+    duration = end - start
+    local_start = timezone.localtime(start).replace(tzinfo=None)
+
+    occurrences: list[tuple[datetime, datetime]] = []
+    try:
+        for naive_start in iter_local_starts(rule, local_start):
+            occurrence_start = timezone.make_aware(naive_start)
+            if rule.until is not None and occurrence_start > rule.until:
+                break
+            if rule.count is not None and len(occurrences) == rule.count:
+                break
+            if len(occurrences) == limit:
+                raise ValueError(f"The rule gives more than {limit} occurrences")
+            if occurrences and occurrences[-1][1] > occurrence_start:
+                raise ValueError("The occurrences overlap each other")
+            occurrences.append((occurrence_start, occurrence_start + duration))
+    except OverflowError:
+        # a large INTERVAL steps past the last date Python can represent
+        raise ValueError("The occurrences go past the latest supported date") from None
+
+    if not occurrences:
+        raise ValueError("The rule gives no occurrences")
+    return occurrences
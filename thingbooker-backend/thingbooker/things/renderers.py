@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from rest_framework.renderers import BaseRenderer
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Base renderer for media types that are streamed by the views.
+
+    The views return a StreamingHttpResponse, so the renderer only lets content negotiation
+    accept the media type and its ?format= value, and renders error responses as plain text.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data: Any, accepted_media_type=None, renderer_context=None) -> bytes:
+        """Renders error details as lines of text"""
+
+        if data is None:
+            return b""
+        if isinstance(data, dict):
+            data = "\n".join(f"{key}: {self.to_text(value)}" for key, value in data.items())
+        return self.to_text(data).encode(self.charset)
+
+    @staticmethod
+    def to_text(value: Any) -> str:
+        """Joins lists of error messages"""
+
+        if isinstance(value, list):
+            return " ".join(str(item) for item in value)
+        return str(value)
+
+
+class ICalendarRenderer(StreamingRenderer):
+    """Renderer for the text/calendar media type."""
+
+    media_type = "text/calendar"
+    format = "ics"
+
+
+class CSVRenderer(StreamingRenderer):
+    """Renderer for the text/csv media type."""
+
+    media_type = "text/csv"
+    format = "csv"
+
+
+class NDJSONRenderer(StreamingRenderer):
+    """Renderer for newline delimited JSON."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
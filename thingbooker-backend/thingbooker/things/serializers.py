@@ -1,17 +1,26 @@
 from __future__ import annotations
 
+from datetime import timedelta
 from typing import TYPE_CHECKING
 
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
 
+from thingbooker.media.fields import ImageVariantsField
 from thingbooker.things.enums import BookingStatusEnum
+from thingbooker.things.interface import ThingGroupInterface, ThingInterface
 from thingbooker.things.models import Booking, Rule, Thing
+from thingbooker.things.recurrence import expand, parse_rrule
 
 if TYPE_CHECKING:
     from typing import Any
 
-    from thingbooker.users.models import ThingbookerUser
+    from django.db.models.query import QuerySet
+
+    from thingbooker.users.models import ThingbookerGroup, ThingbookerUser
 
 
 class BookingSerializer(serializers.HyperlinkedModelSerializer):
@@ -30,6 +39,36 @@ class BookingSerializer(serializers.HyperlinkedModelSerializer):
         return super().validate(data)
 
 
+class RecurringBookingSerializer(BookingSerializer):
+    """
+    Serializer for a booking that repeats, described by a recurrence rule.
+
+    The start and end date are those of the first occurrence. The rule is a subset of the
+    iCalendar RRULE, for example FREQ=WEEKLY;BYDAY=FR;COUNT=12. The occurrences are expanded
+    while validating, and put in validated_data as a list of (start, end) tuples.
+    """
+
+    recurrence = serializers.CharField(write_only=True, max_length=200)
+
+    class Meta(BookingSerializer.Meta):
+        fields = [*BookingSerializer.Meta.fields, "recurrence"]
+
+    def validate(self, data: dict[str, Any]) -> Any:
+        """Validates the recurrence rule and expands the occurrences"""
+
+        data = super().validate(data)
+        try:
+            data["occurrences"] = expand(
+                parse_rrule(data["recurrence"]),
+                data["start_date"],
+                data["end_date"],
+                settings.RECURRING_BOOKING_MAX_OCCURRENCES,
+            )
+        except ValueError as error:
+            raise serializers.ValidationError({"recurrence": str(error)}) from None
+        return data
+
+
 class EditBookingStatusSerializer(serializers.Serializer):
     """Serializer for editing status"""
 
@@ -40,11 +79,73 @@ class EditBookingStatusSerializer(serializers.Serializer):
         """Returns a tuple of an enum instance and a boolean"""
 
         return (
-            BookingStatusEnum[validated_data["new_status"]],
+            BookingStatusEnum(validated_data["new_status"]),
             validated_data["decline_overlapping"],
         )
 
 
+class BookingStatusChangeSerializer(serializers.Serializer):
+    """Serializer for the new status of one booking"""
+
+    id = serializers.UUIDField()
+    new_status = serializers.ChoiceField(choices=BookingStatusEnum.update_choices())
+
+
+class BulkBookingStatusSerializer(serializers.Serializer):
+    """Serializer for changing the status of several bookings of a thing at once"""
+
+    bookings = serializers.ListField(
+        child=BookingStatusChangeSerializer(),
+        allow_empty=False,
+        max_length=settings.BULK_BOOKING_STATUS_MAX,
+    )
+    decline_overlapping = serializers.BooleanField(default=True)
+
+    def validate_bookings(self, value: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Validates that each booking is listed once"""
+
+        if len({change["id"] for change in value}) != len(value):
+            raise serializers.ValidationError("Each booking can only be listed once.")
+        return value
+
+
+class TimeWindowSerializer(serializers.Serializer):
+    """Serializer for query parameters describing an (optionally open-ended) time window"""
+
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+
+    def validate(self, data: dict[str, Any]) -> Any:
+        """Validates start is before end"""
+
+        if "start" in data and "end" in data and data["start"] >= data["end"]:
+            raise serializers.ValidationError("End must be after start")
+        return super().validate(data)
+
+
+class BookingExportSerializer(TimeWindowSerializer):
+    """Serializer for the query parameters of the booking export"""
+
+    thing = serializers.UUIDField(required=False)
+    status = serializers.ChoiceField(choices=BookingStatusEnum.choices, required=False)
+
+
+class AvailabilitySerializer(TimeWindowSerializer):
+    """Serializer for the query parameters of the availability action"""
+
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    min_duration = serializers.DurationField(default=timedelta(0), min_value=timedelta(0))
+    num_people = serializers.IntegerField(default=1, min_value=1)
+
+
+class FreeIntervalSerializer(serializers.Serializer):
+    """Serializer for a time interval where a thing is not booked"""
+
+    start = serializers.DateTimeField(read_only=True)
+    end = serializers.DateTimeField(read_only=True)
+
+
 class RuleSerializer(serializers.HyperlinkedModelSerializer):
     """Serializer for Rule model"""
 
@@ -54,9 +155,31 @@ class RuleSerializer(serializers.HyperlinkedModelSerializer):
         read_only_fields = ["id", "url", "thing"]
 
 
-class ThingSerializer(serializers.HyperlinkedModelSerializer):
+class RuleOrderSerializer(serializers.Serializer):
+    """Serializer for the new order of a thing's rules"""
+
+    rules = serializers.ListField(child=serializers.UUIDField(), allow_empty=True)
+
+
+class ThingGroupValidationMixin:
+    """Validates the group a thing is shared with"""
+
+    def validate_group(self, value: ThingbookerGroup | None):
+        """Validates that the user is a member of the group"""
+
+        request = self.context.get("request", None)
+        if value is None or request is None or request.user.is_admin_user:
+            return value
+        if not value.user_is_member(request.user):
+            raise serializers.ValidationError("You can only share things with your own groups.")
+        return value
+
+
+class ThingSerializer(ThingGroupValidationMixin, serializers.HyperlinkedModelSerializer):
     """Serializer for Thing model"""
 
+    picture_variants = ImageVariantsField(source="picture")
+
     class Meta:
         model = Thing
         fields = [
@@ -65,22 +188,70 @@ class ThingSerializer(serializers.HyperlinkedModelSerializer):
             "name",
             "description",
             "picture",
+            "picture_variants",
             "owner",
+            "capacity",
+            "group",
             "members",
             "bookings",
             "rules",
         ]
         read_only_fields = ["id", "url", "owner", "members", "bookings", "rules"]
 
+    def update(self, instance: Thing, validated_data: Any) -> Thing:
+        """
+        Updates the thing, and syncs the members if the group changed.
+
+        A new capacity is checked against the accepted bookings while the thing is locked, so
+        no booking is accepted in between.
+        """
+
+        previous_group_id = instance.group_id
+        previous_capacity = instance.capacity
+
+        with transaction.atomic():
+            if "capacity" in validated_data:
+                # the capacity may have changed since the instance was loaded
+                previous_capacity = ThingInterface.lock_thing(instance).capacity
+                capacity = validated_data["capacity"]
+                if capacity != previous_capacity:
+                    error = ThingInterface.check_capacity_change(instance, capacity)
+                    if error:
+                        raise serializers.ValidationError({"capacity": [error]})
+
+            thing: Thing = super().update(instance, validated_data)
+            ThingInterface.capacity_changed(thing, previous_capacity)
+            ThingGroupInterface.group_changed(thing, previous_group_id)
+        return thing
+
+    @staticmethod
+    def prefetch_queryset(queryset: QuerySet[Thing]) -> QuerySet[Thing]:
+        """
+        Prefetches the related objects that are serialized as hyperlinks.
 
-class CreateThingSerializer(serializers.ModelSerializer):
-    """Serializer for creating a thing, has a nested serializer for rules"""
+        Only the primary keys are needed to build the links, so that is all that is fetched.
+        """
+
+        return queryset.prefetch_related(
+            Prefetch("members", queryset=get_user_model().objects.only("id")),
+            Prefetch("bookings", queryset=Booking.objects.only("id", "thing_id")),
+            Prefetch("rules", queryset=Rule.objects.only("id", "thing_id")),
+        )
+
+
+class CreateThingSerializer(ThingGroupValidationMixin, serializers.ModelSerializer):
+    """
+    Serializer for creating a thing, has a nested serializer for rules.
+
+    The thing can be shared with a group instead of, or in addition to, listing the members.
+    """
 
     rules = RuleSerializer(many=True, required=False)
 
     class Meta:
         model = Thing
-        fields = ["name", "description", "picture", "members", "rules"]
+        fields = ["name", "description", "picture", "capacity", "group", "members", "rules"]
+        extra_kwargs = {"members": {"required": False}}
 
     def validate_picture(self, value):
         """Validates image is filesize is low enough."""
@@ -102,6 +273,7 @@ class CreateThingSerializer(serializers.ModelSerializer):
         owner: ThingbookerUser = self.context.get("request", {"user": None}).user
         if owner and owner.things.filter(name=value).exists():
             raise serializers.ValidationError(f"Already part of a group with name: {value}.")
+        return value
 
     def create(self, validated_data: Any) -> Thing:
         """Creates the thing along with related rules"""
@@ -116,9 +288,9 @@ class CreateThingSerializer(serializers.ModelSerializer):
         if owner:
             members.append(owner)
         thing.members.add(*members)
+        ThingGroupInterface.add_group_members(thing)
 
         if rules_data:
-            for rule_data in rules_data:
-                Rule.objects.create(thing=thing, **rule_data)
+            ThingInterface.create_rules(thing, rules_data)
 
         return thing
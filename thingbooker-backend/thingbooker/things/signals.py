@@ -0,0 +1,33 @@
+"""Signal receivers for the things app."""
+
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from thingbooker.things.cache import thing_responses
+from thingbooker.things.interface import ThingGroupInterface
+from thingbooker.things.models import Booking, Rule
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=Rule)
+@receiver(post_delete, sender=Rule)
+def invalidate_thing_responses(sender, instance: Booking | Rule, **kwargs):
+    """Invalidates the cached responses of the thing the booking or rule belongs to."""
+
+    thing_responses.invalidate(instance.thing_id)
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def sync_group_things(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    """Adds users that join a group to its things, and removes users that leave it."""
+
+    if action == "post_add":
+        ThingGroupInterface.add_memberships(reverse, instance.pk, pk_set)
+    elif action == "pre_remove":
+        ThingGroupInterface.remove_memberships(reverse, instance.pk, pk_set)
+    elif action == "pre_clear":
+        ThingGroupInterface.remove_memberships(reverse, instance.pk, None)
@@ -3,30 +3,48 @@ from __future__ import annotations
 import uuid
 from typing import TYPE_CHECKING
 
-from django.db.models import Q
+from django.http import StreamingHttpResponse
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from thingbooker.base_permissions import IsAdminUser
+from thingbooker.base_views import ConditionalGetMixin
+from thingbooker.things.cache import thing_responses
+from thingbooker.things.calendar import generate_calendar
 from thingbooker.things.enums import BookingStatusEnum
+from thingbooker.things.export import generate_csv, generate_ndjson
+from thingbooker.things.filters import BookingTimeWindowFilter
 from thingbooker.things.interface import ThingInterface
 from thingbooker.things.models import Booking, Rule, Thing
+from thingbooker.things.pagination import BookingCursorPagination
 from thingbooker.things.permissions import (
     BookingPermission,
     IsMemberOfThing,
     RulePermission,
     ThingPermission,
 )
+from thingbooker.things.renderers import CSVRenderer, ICalendarRenderer, NDJSONRenderer
 from thingbooker.things.serializers import (
+    AvailabilitySerializer,
+    BookingExportSerializer,
     BookingSerializer,
+    BulkBookingStatusSerializer,
     CreateThingSerializer,
     EditBookingStatusSerializer,
+    FreeIntervalSerializer,
+    RecurringBookingSerializer,
+    RuleOrderSerializer,
     RuleSerializer,
     ThingSerializer,
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
     from django.db.models.query import QuerySet
 
     from thingbooker.base_types import ThingbookerRequest
@@ -34,16 +52,23 @@ if TYPE_CHECKING:
 
 
 class BookingViewSet(
+    ConditionalGetMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     viewsets.GenericViewSet,
 ):
-    """List, retrieve, update and destroy methods for Booking model"""
+    """
+    List, retrieve, update and destroy methods for Booking model.
+
+    The list is paginated with a cursor and can be filtered with the start and end query params.
+    """
 
     serializer_class = BookingSerializer
     permission_classes = [BookingPermission, IsAuthenticated, IsMemberOfThing]
+    pagination_class = BookingCursorPagination
+    filter_backends = [BookingTimeWindowFilter]
 
     def get_queryset(self) -> QuerySet:
         """Fetches the queryset"""
@@ -53,7 +78,86 @@ class BookingViewSet(
         if user.is_admin_user:
             return Booking.objects.all()
 
-        return Booking.objects.filter(Q(booker=user) | Q(thing__members=user))
+        return ThingInterface.get_visible_bookings(user)
+
+    def get_conditional_querysets(self) -> list[QuerySet] | None:
+        """Returns the bookings the list or detail response is built from."""
+
+        if self.action == "list":
+            return [self.filter_queryset(self.get_queryset())]
+        if self.action == "retrieve":
+            return [Booking.objects.filter(pk=self.get_conditional_object().pk)]
+        if self.action == "calendar":
+            return [self.get_calendar_queryset()]
+        return None
+
+    def get_calendar_queryset(self) -> QuerySet[Booking]:
+        """Returns the waiting and accepted bookings of the user, for the personal feed."""
+
+        user: ThingbookerUser = self.request.user
+        return (
+            user.bookings.filter(
+                status__in=[BookingStatusEnum.WAITING.value, BookingStatusEnum.ACCEPTED.value]
+            )
+            .select_related("thing")
+            .only("id", "status", "start_date", "end_date", "updated_at", "thing__name")
+            .order_by("start_date", "id")
+        )
+
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="calendar.ics",
+        renderer_classes=[ICalendarRenderer, JSONRenderer],
+    )
+    def calendar(self, request: ThingbookerRequest, *args, **kwargs):
+        """Streams an iCalendar feed of the user's waiting and accepted bookings."""
+
+        feed = generate_calendar(
+            self.get_calendar_queryset(),
+            name="Thingbooker",
+            summary=lambda booking: booking.thing.name,
+        )
+        return StreamingHttpResponse(feed, content_type="text/calendar; charset=utf-8")
+
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="export",
+        permission_classes=[IsAuthenticated, IsAdminUser],
+        renderer_classes=[CSVRenderer, NDJSONRenderer],
+    )
+    def export(self, request: ThingbookerRequest, *args, **kwargs):
+        """
+        Streams all bookings as CSV (?format=csv) or newline delimited JSON (?format=ndjson).
+
+        Takes the optional query parameters thing, status, start and end. Other media types
+        are answered with 406, and errors are rendered as plain text by the streaming renderers.
+        """
+
+        serializer = BookingExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = serializer.validated_data
+
+        bookings = Booking.objects.order_by("start_date", "id")
+        if "thing" in filters:
+            bookings = bookings.filter(thing_id=filters["thing"])
+        if "status" in filters:
+            bookings = bookings.filter(status=filters["status"])
+        bookings = ThingInterface.filter_bookings_by_window(
+            bookings, start=filters.get("start"), end=filters.get("end")
+        )
+
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            content, extension = generate_ndjson(bookings), "ndjson"
+        else:
+            content, extension = generate_csv(bookings), "csv"
+
+        response = StreamingHttpResponse(
+            content, content_type=f"{request.accepted_renderer.media_type}; charset=utf-8"
+        )
+        response["Content-Disposition"] = f'attachment; filename="bookings.{extension}"'
+        return response
 
 
 class RuleViewSet(
@@ -75,10 +179,10 @@ class RuleViewSet(
 
         if user.is_admin_user:
             return Rule.objects.all()
-        return Rule.objects.filter(Q(thing__owner=user) | Q(thing__members=user))
+        return ThingInterface.get_visible_rules(user)
 
 
-class ThingViewSet(viewsets.ModelViewSet):
+class ThingViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Create, list, retrieve, update and destroy methods for thing.
 
@@ -93,8 +197,74 @@ class ThingViewSet(viewsets.ModelViewSet):
         user: ThingbookerUser = self.request.user
 
         if user.is_admin_user:
-            return Thing.objects.all()
-        return Thing.objects.filter(Q(members=user) | Q(owner=user))
+            queryset = Thing.objects.all()
+        else:
+            queryset = ThingInterface.get_visible_things(user)
+
+        if self.action in ["list", "retrieve", "update", "partial_update"]:
+            queryset = ThingSerializer.prefetch_queryset(queryset)
+
+        return queryset
+
+    def get_conditional_querysets(self) -> list[QuerySet] | None:
+        """
+        Returns the querysets the response of a read action is built from.
+
+        A thing links to its members, bookings and rules, so those are part of the validators.
+        """
+
+        if self.action == "list":
+            things = self.get_queryset()
+        elif self.action == "retrieve":
+            things = Thing.objects.filter(pk=self.get_conditional_object().pk)
+        elif self.action == "all_bookings":
+            return [self.get_all_bookings_queryset(self.get_object())]
+        elif self.action == "all_rules":
+            return [self.get_object().rules.all()]
+        elif self.action == "availability":
+            thing = self.get_object()
+            return [
+                Thing.objects.filter(pk=thing.pk),
+                thing.bookings.filter(status=BookingStatusEnum.ACCEPTED),
+            ]
+        elif self.action == "calendar":
+            thing = self.get_object()
+            return [Thing.objects.filter(pk=thing.pk), self.get_calendar_queryset(thing)]
+        else:
+            return None
+
+        return [
+            things,
+            Thing.members.through.objects.filter(thing__in=things),
+            Booking.objects.filter(thing__in=things),
+            Rule.objects.filter(thing__in=things),
+        ]
+
+    def get_all_bookings_queryset(self, thing: Thing) -> QuerySet[Booking]:
+        """Returns the waiting and accepted bookings of the thing, filtered by time window."""
+
+        bookings = thing.bookings.filter(
+            status__in=[BookingStatusEnum.WAITING.value, BookingStatusEnum.ACCEPTED.value]
+        )
+        return BookingTimeWindowFilter().filter_queryset(self.request, bookings, self)
+
+    def get_calendar_queryset(self, thing: Thing) -> QuerySet[Booking]:
+        """Returns the accepted bookings of the thing, for the calendar feed."""
+
+        return (
+            thing.bookings.filter(status=BookingStatusEnum.ACCEPTED.value)
+            .select_related("booker")
+            .only(
+                "id",
+                "status",
+                "start_date",
+                "end_date",
+                "updated_at",
+                "booker__first_name",
+                "booker__username",
+            )
+            .order_by("start_date", "id")
+        )
 
     def get_serializer_class(self):
         """Returns specific serializer for create action"""
@@ -103,8 +273,14 @@ class ThingViewSet(viewsets.ModelViewSet):
             return CreateThingSerializer
         elif self.action == "add_rule":
             return RuleSerializer
-        elif self.action == "add_booking":
+        elif self.action == "reorder_rules":
+            return RuleOrderSerializer
+        elif self.action == "update_booking_statuses":
+            return BulkBookingStatusSerializer
+        elif self.action in ["add_booking", "all_bookings"]:
             return BookingSerializer
+        elif self.action == "add_recurring_booking":
+            return RecurringBookingSerializer
         return ThingSerializer
 
     def perform_create(self, serializer: CreateThingSerializer) -> None:
@@ -126,6 +302,24 @@ class ThingViewSet(viewsets.ModelViewSet):
             return Response(data=self.get_serializer(rule).data, status=status.HTTP_201_CREATED)
         return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=["POST"], url_path="reorder-rules")
+    def reorder_rules(self, request: ThingbookerRequest, *args, **kwargs):
+        """Action for changing the order of the thing's rules. Returns the rules in the new order"""
+
+        thing: Thing = self.get_object()
+
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        response = ThingInterface.reorder_rules(thing, serializer.validated_data["rules"])
+        if response.code != status.HTTP_200_OK:
+            return Response(data=response.payload, status=response.code)
+
+        context = self.get_serializer_context()
+        data = RuleSerializer(instance=response.payload, many=True, context=context).data
+        return Response(data=data, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=["POST"], url_path="add-booking/")
     def add_booking(self, request: ThingbookerRequest, *args, **kwargs):
         """Action for adding a new booking to the thing."""
@@ -146,8 +340,28 @@ class ThingViewSet(viewsets.ModelViewSet):
             return Response(data=response.payload, status=status.HTTP_400_BAD_REQUEST)
         return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=["POST"], url_path="add-recurring-booking")
+    def add_recurring_booking(self, request: ThingbookerRequest, *args, **kwargs):
+        """Action for adding a booking that repeats, one booking is created per occurrence."""
+
+        thing: Thing = self.get_object()
+
+        serializer: RecurringBookingSerializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        response = ThingInterface.add_recurring_booking(
+            thing=thing, user=request.user, serializer=serializer
+        )
+        if response.code != status.HTTP_201_CREATED:
+            return Response(data=response.payload, status=response.code)
+
+        context = self.get_serializer_context()
+        data = BookingSerializer(instance=response.payload, many=True, context=context).data
+        return Response(data=data, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=["POST"], url_path="update-booking-status/(?P<booking_id>.+)")
-    def update_booking_status(self, request: ThingbookerRequest, booking_id: str):
+    def update_booking_status(self, request: ThingbookerRequest, booking_id: str, **kwargs):
         """Action for updating the booking status."""
 
         thing: Thing = self.get_object()
@@ -171,23 +385,121 @@ class ThingViewSet(viewsets.ModelViewSet):
         booking.save()
         return Response(data={"declined": "Booking was declined"}, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=["POST"], url_path="update-booking-statuses")
+    def update_booking_statuses(self, request: ThingbookerRequest, *args, **kwargs):
+        """Action for accepting and declining several bookings at once."""
+
+        thing: Thing = self.get_object()
+
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = [
+            (change["id"], BookingStatusEnum(change["new_status"]))
+            for change in serializer.validated_data["bookings"]
+        ]
+        response = ThingInterface.update_booking_statuses(
+            thing, changes, serializer.validated_data["decline_overlapping"]
+        )
+        return Response(data=response.payload, status=response.code)
+
+    def get_cached_data(self, thing: Thing, build: Callable[[], Any]) -> Any:
+        """
+        Returns the response data for this request from the thing's response cache.
+
+        The ETag is part of the key. It is computed from the database, so a body cached before
+        a change is never returned with the new ETag, even when the version bump happened in
+        another process with its own cache.
+        """
+
+        etag = self.conditional_etag or ""
+        key = f"{self.request.build_absolute_uri()}|{self.request.accepted_media_type}|{etag}"
+        return thing_responses.get_or_set(thing.pk, key, build)
+
     @action(detail=True, methods=["GET"], url_path="all-rules/")
-    def all_rules(self):
+    def all_rules(self, request: ThingbookerRequest, *args, **kwargs):
         """Fetches all rules for the thing"""
 
         thing: Thing = self.get_object()
 
-        serializer = RuleSerializer(instance=thing.rules.all(), many=True)
+        def build():
+            context = self.get_serializer_context()
+            return RuleSerializer(instance=thing.rules.all(), many=True, context=context).data
 
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        return Response(data=self.get_cached_data(thing, build), status=status.HTTP_200_OK)
 
-    @action(detail=True, methods=["GET"], url_path="all-bookings")
-    def all_bookings(self):
-        """Fetches all bookings (waiting or accepted) for the thing"""
+    @action(
+        detail=True,
+        methods=["GET"],
+        url_path="all-bookings",
+        pagination_class=BookingCursorPagination,
+    )
+    def all_bookings(self, request: ThingbookerRequest, *args, **kwargs):
+        """
+        Fetches all bookings (waiting or accepted) for the thing.
+
+        The bookings are paginated with a cursor and can be filtered with the start and end
+        query params.
+        """
 
         thing: Thing = self.get_object()
-        bookings = thing.bookings.exclude(status=BookingStatusEnum.DECLINED.value)
 
-        serializer = BookingSerializer(instance=bookings, many=True)
+        def build():
+            page = self.paginate_queryset(self.get_all_bookings_queryset(thing))
+            serializer = self.get_serializer(instance=page, many=True)
+            return self.get_paginated_response(serializer.data).data
+
+        return Response(data=self.get_cached_data(thing, build), status=status.HTTP_200_OK)
+
+    @action(
+        detail=True,
+        methods=["GET"],
+        url_path="calendar.ics",
+        renderer_classes=[ICalendarRenderer, JSONRenderer],
+    )
+    def calendar(self, request: ThingbookerRequest, *args, **kwargs):
+        """Streams an iCalendar feed of the accepted bookings of the thing."""
+
+        thing: Thing = self.get_object()
+
+        feed = generate_calendar(
+            self.get_calendar_queryset(thing),
+            name=thing.name,
+            summary=lambda booking: booking.booker.first_name or booking.booker.username,
+        )
+        return StreamingHttpResponse(feed, content_type="text/calendar; charset=utf-8")
+
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="cache-stats",
+        permission_classes=[IsAuthenticated, IsAdminUser],
+    )
+    def cache_stats(self, request: ThingbookerRequest, *args, **kwargs):
+        """Returns the hit, miss and eviction counters of the thing response cache."""
+
+        return Response(data=thing_responses.stats(), status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["GET"], url_path="availability")
+    def availability(self, request: ThingbookerRequest, *args, **kwargs):
+        """
+        Fetches the free intervals of the thing within a time window.
+
+        Takes the query parameters start, end and optionally min_duration and num_people. For
+        a thing with a capacity, the intervals are where num_people more people fit.
+        """
+
+        thing: Thing = self.get_object()
+
+        serializer = AvailabilitySerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        intervals = ThingInterface.get_free_intervals(thing=thing, **serializer.validated_data)
 
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        return Response(
+            data=FreeIntervalSerializer(instance=intervals, many=True).data,
+            status=status.HTTP_200_OK,
+        )
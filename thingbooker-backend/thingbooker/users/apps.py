@@ -6,3 +6,8 @@ class UsersConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "thingbooker.users"
+
+    def ready(self) -> None:
+        """Connects the signal receivers"""
+
+        from thingbooker.users import signals  # noqa: F401
@@ -3,14 +3,18 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 from uuid import uuid4
 
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.db import connection, transaction
 from django.utils import timezone
 
 from thingbooker.mail.interface import EmailInterface
 from thingbooker.users.enums import GroupMemberStatusEnum, InviteStatusEnum
-from thingbooker.users.models import AcceptInviteToken, ThingbookerGroup
+from thingbooker.users.models import AcceptInviteToken, KnownUser, ThingbookerGroup
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from thingbooker.users.models import ThingbookerUser
 
 
@@ -49,16 +53,77 @@ class ThingbookerGroupInterface:
         ):
             return GroupMemberStatusEnum.ALREADY_INVITED
 
-        invite_token: AcceptInviteToken = AcceptInviteToken.objects.create(user=user, group=group)
-        context = {"token": invite_token, "group": group, "invited_by": inviter, "user": user}
-        EmailInterface.send_mail(
-            template_name="invite_user_to_group",
-            context=context,
-            to_address=user.username,
-            subject=cls.DEFAULT_INVITE_SUBJECT,
-        )
+        with transaction.atomic():
+            invite_token: AcceptInviteToken = AcceptInviteToken.objects.create(
+                user=user, group=group
+            )
+            context = {"token": invite_token, "group": group, "invited_by": inviter, "user": user}
+            EmailInterface.queue_mail(
+                template_name="invite_user_to_group",
+                context=context,
+                to_address=user.username,
+                subject=cls.DEFAULT_INVITE_SUBJECT,
+            )
         return GroupMemberStatusEnum.SENT_INVITE
 
+    @classmethod
+    def invite_users_to_group(
+        cls, emails: list[str], group: ThingbookerGroup, inviter: ThingbookerUser
+    ) -> dict[str, GroupMemberStatusEnum]:
+        """
+        Invites several users to a group, and queues the invite emails.
+
+        Uses one query each to find the users, the members and the pending invites, and creates
+        all tokens in one statement. Returns the result per email, NOT_MEMBER means there is no
+        user with that email.
+        """
+
+        emails = list(dict.fromkeys(emails))
+        now = timezone.now()
+        users: dict[str, ThingbookerUser] = {
+            user.username: user for user in get_user_model().objects.filter(username__in=emails)
+        }
+        user_ids = [user.pk for user in users.values()]
+
+        members = set(group.members.filter(pk__in=user_ids).values_list("pk", flat=True))
+        invited = set(
+            AcceptInviteToken.objects.filter(
+                group=group, user_id__in=user_ids, expires_at__gt=now
+            ).values_list("user_id", flat=True)
+        )
+
+        results: dict[str, GroupMemberStatusEnum] = {}
+        tokens: list[AcceptInviteToken] = []
+        for email in emails:
+            user = users.get(email)
+            if user is None:
+                results[email] = GroupMemberStatusEnum.NOT_MEMBER
+            elif user.pk in members:
+                results[email] = GroupMemberStatusEnum.MEMBER
+            elif user.pk in invited:
+                results[email] = GroupMemberStatusEnum.ALREADY_INVITED
+            else:
+                results[email] = GroupMemberStatusEnum.SENT_INVITE
+                token = AcceptInviteToken(user=user, group=group)
+                token.set_defaults()
+                tokens.append(token)
+
+        with transaction.atomic():
+            AcceptInviteToken.objects.bulk_create(tokens)
+            EmailInterface.queue_mass_mail(
+                template_name="invite_user_to_group",
+                recipients=[
+                    (
+                        {"token": token, "group": group, "invited_by": inviter, "user": token.user},
+                        token.user.username,
+                    )
+                    for token in tokens
+                ],
+                subject=cls.DEFAULT_INVITE_SUBJECT,
+            )
+
+        return results
+
     @classmethod
     def accept_group_invite(
         cls, user: ThingbookerUser, token: AcceptInviteToken
@@ -80,3 +145,181 @@ class ThingbookerGroupInterface:
         token.save()
 
         return InviteStatusEnum.TOKEN_CONSUMED
+
+
+class GroupMembershipInterface:
+    """Helpers for writing SQL against the user/group membership table."""
+
+    @staticmethod
+    def get_membership_columns() -> tuple[str, str, str]:
+        """Returns the table, group column and user column of the membership table."""
+
+        through = get_user_model().groups.through
+        return (
+            through._meta.db_table,
+            through._meta.get_field("group").column,
+            through._meta.get_field(get_user_model()._meta.model_name).column,
+        )
+
+    @classmethod
+    def get_changed_filter(
+        cls, alias: str, instance_is_group: bool, pk: object, others: list | None
+    ) -> tuple[str, list]:
+        """
+        Returns a condition on the membership table alias that matches the changed memberships.
+
+        These are the memberships of the group or user with the given pk, as sent by
+        m2m_changed, limited to the users or groups in others unless others is None. Returns
+        the SQL and its parameters.
+        """
+
+        _, group_column, user_column = cls.get_membership_columns()
+        fixed_column, other_column = (
+            (group_column, user_column) if instance_is_group else (user_column, group_column)
+        )
+
+        sql = f"{alias}.{fixed_column} = %s"
+        params: list = [str(pk)]
+        if others is not None:
+            other_model = get_user_model() if instance_is_group else Group
+            array_type = f"{other_model._meta.pk.db_type(connection)}[]"
+            sql += f" AND {alias}.{other_column} = ANY(%s::{array_type})"
+            # passed as strings, psycopg2 does not adapt lists of uuids
+            params.append([str(other) for other in others])
+        return sql, params
+
+
+class KnownUserInterface:
+    """
+    Keeps the KnownUser table in sync with the group memberships.
+
+    The changes are applied with one statement per membership change, which counts the pairs of
+    members in the affected groups where at least one of the two is in the changed memberships.
+    Each group a pair shares adds one to their shared_groups.
+
+    The affected groups are locked before counting. Otherwise two transactions that add users
+    to the same group would each miss the other user, as neither sees the other's membership.
+    """
+
+    @staticmethod
+    def _lock_groups(instance_is_group: bool, pk: object, others: list | None) -> None:
+        """Locks the groups of the changed memberships, in a fixed order to avoid deadlocks."""
+
+        if instance_is_group:
+            groups = Group.objects.filter(pk=pk)
+        elif others is None:
+            groups = Group.objects.filter(user=pk)
+        else:
+            groups = Group.objects.filter(pk__in=others)
+        # a separate statement, so the counting sees memberships committed while waiting
+        list(groups.order_by("pk").select_for_update().values_list("pk", flat=True))
+
+    @staticmethod
+    def _get_changed_pairs(
+        instance_is_group: bool, pk: object, others: list | None
+    ) -> tuple[str, list]:
+        """
+        Returns a query for the pairs affected by the changed memberships, and its parameters.
+
+        Rows are (user, known user, shared groups).
+        """
+
+        table, group_column, user_column = GroupMembershipInterface.get_membership_columns()
+        changed_filter, params = GroupMembershipInterface.get_changed_filter(
+            "c", instance_is_group, pk, others
+        )
+
+        sql = f"""
+            SELECT a.{user_column}, b.{user_column}, COUNT(*)
+            FROM {table} a
+            JOIN {table} b ON b.{group_column} = a.{group_column}
+            WHERE EXISTS (
+                SELECT 1 FROM {table} c
+                WHERE {changed_filter}
+                AND c.{group_column} = a.{group_column}
+                AND c.{user_column} IN (a.{user_column}, b.{user_column})
+            )
+            GROUP BY a.{user_column}, b.{user_column}
+        """
+        return sql, params
+
+    @classmethod
+    def add_memberships(cls, instance_is_group: bool, pk: object, others: Iterable) -> None:
+        """
+        Counts the memberships that were just added.
+
+        The memberships are those of the group with the given pk and the given users, or of the
+        user with the given pk and the given groups. Call this after the memberships are added.
+        """
+
+        others = list(others)
+        if not others:
+            return
+
+        changed_sql, params = cls._get_changed_pairs(instance_is_group, pk, others)
+        table = KnownUser._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cls._lock_groups(instance_is_group, pk, others)
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (user_id, known_user_id, shared_groups)
+                {changed_sql}
+                ON CONFLICT (user_id, known_user_id)
+                DO UPDATE SET shared_groups = {table}.shared_groups + EXCLUDED.shared_groups
+                """,
+                params,
+            )
+
+    @classmethod
+    def remove_memberships(
+        cls, instance_is_group: bool, pk: object, others: Iterable | None
+    ) -> None:
+        """
+        Uncounts memberships that are about to be removed.
+
+        Like add_memberships, but others can be None for all memberships of the instance. Call
+        this before the memberships are removed, in the same transaction.
+        """
+
+        if others is not None:
+            others = list(others)
+            if not others:
+                return
+
+        changed_sql, params = cls._get_changed_pairs(instance_is_group, pk, others)
+        table = KnownUser._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cls._lock_groups(instance_is_group, pk, others)
+            cursor.execute(
+                f"""
+                WITH changed (user_id, known_user_id, shared_groups) AS ({changed_sql})
+                UPDATE {table} known
+                SET shared_groups = known.shared_groups - changed.shared_groups
+                FROM changed
+                WHERE known.user_id = changed.user_id
+                AND known.known_user_id = changed.known_user_id
+                RETURNING known.id, known.shared_groups
+                """,
+                params,
+            )
+            unknown = [pk for pk, shared_groups in cursor.fetchall() if shared_groups <= 0]
+            if unknown:
+                cursor.execute(f"DELETE FROM {table} WHERE id = ANY(%s)", [unknown])
+
+    @classmethod
+    def rebuild(cls) -> None:
+        """Recomputes the whole table from the group memberships."""
+
+        table, group_column, user_column = GroupMembershipInterface.get_membership_columns()
+        known_table = KnownUser._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {known_table}")
+            cursor.execute(
+                f"""
+                INSERT INTO {known_table} (user_id, known_user_id, shared_groups)
+                SELECT a.{user_column}, b.{user_column}, COUNT(*)
+                FROM {table} a
+                JOIN {table} b ON b.{group_column} = a.{group_column}
+                GROUP BY a.{user_column}, b.{user_column}
+                """
+            )
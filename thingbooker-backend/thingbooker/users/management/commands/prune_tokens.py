@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from thingbooker.users.models import AcceptInviteToken
+
+
+class Command(BaseCommand):
+    """Deletes expired and used tokens."""
+
+    help = (
+        "Deletes expired or used invite tokens and expired JWT outstanding and blacklisted "
+        "tokens in chunks. Safe to run repeatedly, e.g from cron."
+    )
+
+    def add_arguments(self, parser):
+        """Adds arguments for the chunk size and the pause between chunks."""
+
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of rows deleted per statement.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to wait between chunks, to leave room for other queries.",
+        )
+
+    def delete_in_chunks(self, queryset, label: str, chunk_size: int, pause: float) -> int:
+        """
+        Deletes the rows of the queryset, one chunk per statement.
+
+        Each chunk is deleted in its own short transaction, so locks are only held on the rows
+        of one chunk at a time. Returns the number of deleted rows, including cascaded rows.
+        """
+
+        model = queryset.model
+        total = 0
+        started = time.monotonic()
+
+        while True:
+            chunk = list(queryset.order_by().values_list("pk", flat=True)[:chunk_size])
+            if not chunk:
+                break
+
+            # rows that cascade, like blacklist entries, are deleted in the same transaction
+            _, deleted = model.objects.filter(pk__in=chunk).delete()
+            total += sum(deleted.values())
+
+            if len(chunk) < chunk_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+        elapsed = time.monotonic() - started
+        rate = total / elapsed if elapsed > 0 else 0
+        self.stdout.write(f"Deleted {total} {label} in {elapsed:.2f}s ({rate:.0f} rows/s).")
+        return total
+
+    def handle(self, *args, **options):
+        """Prunes the invite tokens, and the outstanding JWT tokens with their blacklist entries."""
+
+        now = timezone.now()
+        chunk_size: int = options["chunk_size"]
+        pause: float = options["pause"]
+
+        self.delete_in_chunks(
+            AcceptInviteToken.objects.filter(Q(expires_at__lte=now) | Q(used_at__isnull=False)),
+            "invite token(s)",
+            chunk_size,
+            pause,
+        )
+        self.delete_in_chunks(
+            OutstandingToken.objects.filter(expires_at__lte=now),
+            "outstanding and blacklisted JWT token(s)",
+            chunk_size,
+            pause,
+        )
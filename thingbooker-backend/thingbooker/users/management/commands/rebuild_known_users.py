@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from thingbooker.users.interface import KnownUserInterface
+from thingbooker.users.models import KnownUser
+
+
+class Command(BaseCommand):
+    """Recomputes the known users from the group memberships."""
+
+    help = (
+        "Rebuilds the known users table. Only needed if memberships were changed without "
+        "signals, e.g. with raw SQL or bulk_create on the membership table."
+    )
+
+    def handle(self, *args, **options):
+        """Rebuilds the table and reports the number of rows."""
+
+        KnownUserInterface.rebuild()
+        self.stdout.write(f"Rebuilt known users, {KnownUser.objects.count()} row(s).")
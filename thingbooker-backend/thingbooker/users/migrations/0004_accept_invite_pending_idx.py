@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-17 01:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_thingbookeruser_managers_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='acceptinvitetoken',
+            index=models.Index(fields=['user', 'group', 'expires_at'], name='accept_invite_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-17 01:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_accept_invite_pending_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KnownUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shared_groups', models.PositiveIntegerField(default=0)),
+                ('known_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='known_by', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='known_users', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='knownuser',
+            constraint=models.UniqueConstraint(fields=('user', 'known_user'), name='known_user_unique_pair'),
+        ),
+    ]
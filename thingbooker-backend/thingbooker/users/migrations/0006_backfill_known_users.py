@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def backfill_known_users(apps, schema_editor):
+    """Counts the shared groups of every pair of users that are in a group together."""
+
+    user_model = apps.get_model("users", "ThingbookerUser")
+    known_user_model = apps.get_model("users", "KnownUser")
+    through = user_model.groups.through
+    table = through._meta.db_table
+    group_column = through._meta.get_field("group").column
+    user_column = through._meta.get_field("thingbookeruser").column
+
+    schema_editor.execute(
+        f"""
+        INSERT INTO {known_user_model._meta.db_table} (user_id, known_user_id, shared_groups)
+        SELECT a.{user_column}, b.{user_column}, COUNT(*)
+        FROM {table} a
+        JOIN {table} b ON b.{group_column} = a.{group_column}
+        GROUP BY a.{user_column}, b.{user_column}
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_knownuser"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_known_users, migrations.RunPython.noop),
+    ]
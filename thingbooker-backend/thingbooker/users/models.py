@@ -15,6 +15,7 @@ from thingbooker.base_models import ThingbookerManager, ThingbookerModel
 from thingbooker.utils import create_token
 
 if TYPE_CHECKING:
+    from django.db.models import QuerySet
     from django.db.models.manager import ManyToManyRelatedManager, RelatedManager
 
     from thingbooker.things.models import Booking, Thing
@@ -72,6 +73,13 @@ class ThingbookerUser(AbstractUser, ThingbookerModel):
 
         return ThingbookerGroup.objects.filter(group__user=self)
 
+    def get_thingbooker_groups(self) -> list[ThingbookerGroup] | QuerySet[ThingbookerGroup]:
+        """Returns the thingbooker groups, from prefetched_groups if they were prefetched."""
+
+        if hasattr(self, "prefetched_groups"):
+            return [group.thingbooker_group for group in self.prefetched_groups]
+        return self.thingbooker_groups
+
     @property
     def is_admin_user(self):
         """Returns true if this user is an admin user"""
@@ -86,9 +94,14 @@ class ThingbookerUser(AbstractUser, ThingbookerModel):
         return super().save(*args, **kwargs)
 
     def get_all_known_users(self):
-        """Fetches the users that this user 'knows', i.e is in a group with."""
+        """
+        Fetches the users that this user 'knows', i.e is in a group with.
+
+        Reads the precomputed KnownUser rows, so each user is returned once no matter how many
+        groups they share. This user is included as long as they are in a group.
+        """
 
-        return get_user_model().objects.filter(groups__in=self.groups.all())
+        return get_user_model().objects.filter(known_by__user=self)
 
     def get_group_or_none(self, group_id: int) -> Group | None:
         """Fetches the group (only looks at this users group)."""
@@ -138,6 +151,30 @@ class ThingbookerGroup(ThingbookerModel):
         return f"{self.name} with owner {str(self.owner)}"
 
 
+class KnownUser(models.Model):
+    """
+    A user that another user shares at least one group with.
+
+    This is a denormalized copy of the group memberships, kept up to date by the signal
+    receivers in thingbooker.users.signals. There is a row for both directions of each pair,
+    and a row from each user to themselves for as long as they are in a group.
+    """
+
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="known_users")
+    known_user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="known_by"
+    )
+    shared_groups = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "known_user"], name="known_user_unique_pair")
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} knows {self.known_user_id} ({self.shared_groups} groups)"
+
+
 class GenericToken(ThingbookerModel):
     """Generic abstract token class."""
 
@@ -168,15 +205,26 @@ class GenericToken(ThingbookerModel):
     def __str__(self) -> str:
         return f"Token: {self.token}, Created: {self.created_at}, Expires: {self.expires_at}"
 
-    def save(self, *args, **kwargs):
-        """Generate the token on save."""
+    def set_defaults(self):
+        """
+        Sets the timestamps, expiry and token if they are not set.
+
+        save does this, bulk_create does not, so call this on tokens before bulk creating them.
+        """
 
         if not self.created_at:
             self.created_at = timezone.now()
+        if not self.updated_at:
+            self.updated_at = self.created_at
         if not self.expires_at:
             self.expires_at = self.created_at + timezone.timedelta(days=settings.TOKEN_EXPIRY)
         if not self.token:
             self.token = create_token()
+
+    def save(self, *args, **kwargs):
+        """Generate the token on save."""
+
+        self.set_defaults()
         super().save(*args, **kwargs)
 
     def get_clickable_url(self, token_action: str) -> str:
@@ -212,6 +260,10 @@ class AcceptInviteToken(GenericToken):
 
     class Meta:
         unique_together = ("user", "token")
+        indexes = [
+            # used when checking if a user already has a pending invite to a group
+            models.Index(fields=["user", "group", "expires_at"], name="accept_invite_pending_idx")
+        ]
 
     def get_clickable_url(self) -> str:
         """Returns a 'clickable' url that is sent in the mail to the user being invited."""
@@ -30,7 +30,7 @@ class ThingbookerGroupPermission(permissions.BasePermission):
         if view.action in ["update", "partial_update", "destroy"]:
             return obj.owner == user
 
-        elif view.action in ["retrieve", "invite_member"]:
+        elif view.action in ["retrieve", "invite_member", "invite_members"]:
             return obj.user_is_member(user)
 
         return True
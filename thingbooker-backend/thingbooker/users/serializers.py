@@ -4,24 +4,26 @@ from typing import TYPE_CHECKING, Any
 
 from dj_rest_auth.registration.serializers import RegisterSerializer
 from dj_rest_auth.serializers import UserDetailsSerializer
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.core.files.images import get_image_dimensions
+from django.db.models import Prefetch
 from rest_framework import serializers
 
+from thingbooker.media.fields import ImageVariantsField
+from thingbooker.media.uploadhandlers import get_image_probe
 from thingbooker.users.interface import ThingbookerGroupInterface
 from thingbooker.users.models import AcceptInviteToken, ThingbookerGroup
 from thingbooker.utils import hash_token
 
 if TYPE_CHECKING:
+    from django.db.models.query import QuerySet
     from rest_framework.request import Request
 
     from thingbooker.users.models import ThingbookerUser
 
 
-MEGABYTE_LIMIT = 2
-
-
 class ThingbookerRegisterSerializer(RegisterSerializer, serializers.ModelSerializer):
     """Custom register for thingbooker."""
 
@@ -54,8 +56,22 @@ class ThingbookerUserSerializer(UserDetailsSerializer, serializers.HyperlinkedMo
     """Serializer for thingbooker user."""
 
     thingbooker_groups: serializers.HyperlinkedRelatedField = serializers.HyperlinkedRelatedField(
-        "thingbookergroup-detail", many=True, read_only=True
+        "thingbookergroup-detail", many=True, read_only=True, source="get_thingbooker_groups"
     )
+    avatar_variants = ImageVariantsField(source="avatar")
+
+    @staticmethod
+    def prefetch_queryset(queryset: QuerySet[ThingbookerUser]) -> QuerySet[ThingbookerUser]:
+        """Prefetches the thingbooker groups of the users, which are serialized as hyperlinks."""
+
+        groups = (
+            Group.objects.filter(thingbooker_group__isnull=False)
+            .select_related("thingbooker_group")
+            .order_by("-thingbooker_group__created_at")
+        )
+        return queryset.prefetch_related(
+            Prefetch("groups", queryset=groups, to_attr="prefetched_groups")
+        )
 
     class Meta:
         model = get_user_model()
@@ -65,6 +81,7 @@ class ThingbookerUserSerializer(UserDetailsSerializer, serializers.HyperlinkedMo
             "username",
             "email",
             "avatar",
+            "avatar_variants",
             "thingbooker_groups",
             "first_name",
             "last_name",
@@ -77,14 +94,20 @@ class ThingbookerUserSerializer(UserDetailsSerializer, serializers.HyperlinkedMo
             return value
 
         filesize = value.size
-        width, height = get_image_dimensions(value)
+
+        # the upload handler has read the dimensions from the header, decode it if it did not
+        probe = get_image_probe(self.context.get("request", None), "avatar")
+        if probe is not None:
+            width, height = probe.width, probe.height
+        else:
+            width, height = get_image_dimensions(value)
 
         if width != height:
             raise serializers.ValidationError("Image must be squared.")
 
-        if filesize > MEGABYTE_LIMIT * 1024 * 1024:
+        if filesize > settings.MEGABYTE_LIMIT * 1024 * 1024:
             raise serializers.ValidationError(
-                f"Image is over max file size (>{MEGABYTE_LIMIT * 1024 * 1024})"
+                f"Image is over max file size (>{settings.MEGABYTE_LIMIT * 1024 * 1024})"
             )
 
         return value
@@ -93,9 +116,11 @@ class ThingbookerUserSerializer(UserDetailsSerializer, serializers.HyperlinkedMo
 class ThingbookerShortUserSerializer(serializers.ModelSerializer):
     """Serializer that gives a summary of a user"""
 
+    avatar_variants = ImageVariantsField(source="avatar")
+
     class Meta:
         model = get_user_model()
-        fields = ["id", "username", "avatar", "first_name"]
+        fields = ["id", "username", "avatar", "avatar_variants", "first_name"]
 
 
 class GroupSerializer(serializers.ModelSerializer):
@@ -112,12 +137,29 @@ class ThingbookerGroupSerializer(serializers.HyperlinkedModelSerializer):
     members: serializers.HyperlinkedRelatedField = serializers.HyperlinkedRelatedField(
         view_name="thingbookeruser-detail", many=True, read_only=True
     )
+    group_picture_variants = ImageVariantsField(source="group_picture")
 
     class Meta:
         model = ThingbookerGroup
-        fields = ["url", "id", "name", "group_picture", "owner", "members"]
+        fields = [
+            "url",
+            "id",
+            "name",
+            "group_picture",
+            "group_picture_variants",
+            "owner",
+            "members",
+        ]
         read_only_fields = ["owner"]
 
+    @staticmethod
+    def prefetch_queryset(queryset: QuerySet[ThingbookerGroup]) -> QuerySet[ThingbookerGroup]:
+        """Prefetches the ids of the members, which are serialized as hyperlinks."""
+
+        return queryset.select_related("group").prefetch_related(
+            Prefetch("group__user_set", queryset=get_user_model().objects.only("id"))
+        )
+
     def validate_group_picture(self, value):
         """Validates the size of the group picture."""
 
@@ -126,9 +168,9 @@ class ThingbookerGroupSerializer(serializers.HyperlinkedModelSerializer):
 
         filesize = value.size
 
-        if filesize > MEGABYTE_LIMIT * 1024 * 1024:
+        if filesize > settings.MEGABYTE_LIMIT * 1024 * 1024:
             raise serializers.ValidationError(
-                f"Image is over max file size (>{MEGABYTE_LIMIT * 1024 * 1024})"
+                f"Image is over max file size (>{settings.MEGABYTE_LIMIT * 1024 * 1024})"
             )
 
         return value
@@ -141,6 +183,16 @@ class ThingbookerGroupSerializer(serializers.HyperlinkedModelSerializer):
         return ThingbookerGroupInterface.create_with_group(owner=owner, **validated_data)
 
 
+class BulkInviteSerializer(serializers.Serializer):
+    """Serializer for inviting several emails to a group at once."""
+
+    emails = serializers.ListField(
+        child=serializers.EmailField(),
+        allow_empty=False,
+        max_length=settings.BULK_INVITE_MAX_EMAILS,
+    )
+
+
 class InviteTokenSerializer(serializers.HyperlinkedModelSerializer):
     """Serializer class for AcceptInviteToken model."""
 
@@ -0,0 +1,35 @@
+"""Signal receivers that keep the known users in sync with the group memberships."""
+
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, pre_delete
+from django.dispatch import receiver
+
+from thingbooker.users.interface import KnownUserInterface
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def update_known_users(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    """
+    Updates the known users when memberships are added, removed or cleared.
+
+    Covers both user.groups and group.user_set (ThingbookerGroup.members). reverse is True when
+    the instance is the group. Removals are counted before the rows are deleted, when the
+    memberships that go away can still be joined.
+    """
+
+    if action == "post_add":
+        KnownUserInterface.add_memberships(reverse, instance.pk, pk_set)
+    elif action == "pre_remove":
+        KnownUserInterface.remove_memberships(reverse, instance.pk, pk_set)
+    elif action == "pre_clear":
+        KnownUserInterface.remove_memberships(reverse, instance.pk, None)
+
+
+@receiver(pre_delete, sender=Group)
+def forget_group_members(sender, instance: Group, **kwargs):
+    """Uncounts the memberships of a group that is deleted, they are removed without signals."""
+
+    KnownUserInterface.remove_memberships(True, instance.pk, None)
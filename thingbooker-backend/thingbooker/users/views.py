@@ -3,17 +3,20 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from thingbooker.base_permissions import IsAdminUser
+from thingbooker.base_views import ConditionalGetMixin
 from thingbooker.users.enums import GroupMemberStatusEnum
 from thingbooker.users.interface import ThingbookerGroupInterface
-from thingbooker.users.models import AcceptInviteToken, ThingbookerUser
+from thingbooker.users.models import AcceptInviteToken, ThingbookerGroup, ThingbookerUser
 from thingbooker.users.permissions import ThingbookerGroupPermission
 from thingbooker.users.serializers import (
+    BulkInviteSerializer,
     InviteTokenSerializer,
     ThingbookerGroupSerializer,
     ThingbookerShortUserSerializer,
@@ -26,7 +29,6 @@ if TYPE_CHECKING:
     from django.db.models.query import QuerySet
 
     from thingbooker.base_types import ThingbookerRequest
-    from thingbooker.users.models import ThingbookerGroup
 
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
@@ -51,11 +53,16 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
 
         # check if user is admin
         if user.is_admin_user:
-            return get_user_model().objects.all()
-        return user.get_all_known_users()
+            queryset = get_user_model().objects.all()
+        else:
+            queryset = user.get_all_known_users()
 
+        if self.get_serializer_class() is ThingbookerUserSerializer:
+            queryset = ThingbookerUserSerializer.prefetch_queryset(queryset)
+        return queryset
 
-class GroupViewSet(viewsets.ModelViewSet):
+
+class GroupViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Provides list, retrieve, create, update, partial_update and delete methods
     for thingbooker groups.
@@ -68,8 +75,42 @@ class GroupViewSet(viewsets.ModelViewSet):
         """Return only the groups the user is related to."""
 
         user: ThingbookerUser = self.request.user
+        queryset = user.thingbooker_groups
+
+        if self.action in ["list", "retrieve", "update", "partial_update"]:
+            queryset = ThingbookerGroupSerializer.prefetch_queryset(queryset)
+
+        return queryset
+
+    def get_conditional_querysets(self) -> list[QuerySet] | None:
+        """Returns the groups and memberships the list or detail response is built from."""
+
+        if self.action == "list":
+            groups = self.get_queryset()
+        elif self.action == "retrieve":
+            groups = ThingbookerGroup.objects.filter(pk=self.get_conditional_object().pk)
+        else:
+            return None
 
-        return user.thingbooker_groups
+        return [
+            groups,
+            Group.user_set.through.objects.filter(group__thingbooker_group__in=groups),
+        ]
+
+    @staticmethod
+    def get_invite_message(result: GroupMemberStatusEnum) -> str:
+        """
+        Returns the message for the result of an invite.
+
+        Emails that are not registered get the same message as a sent invite, so that the
+        endpoint cannot be used to check which users exist.
+        """
+
+        if result == GroupMemberStatusEnum.MEMBER:
+            return "User is already a member of the group"
+        elif result == GroupMemberStatusEnum.ALREADY_INVITED:
+            return "User is already invited to the group"
+        return "The user has been invited if they are registered on thingbooker"
 
     @action(detail=True, methods=["POST"], url_path="invite-member/")
     def invite_member(self, request: ThingbookerRequest, pk: UUID | None = None, format=None):
@@ -84,28 +125,46 @@ class GroupViewSet(viewsets.ModelViewSet):
                 return Response(
                     {"message": "No email supplied"}, status=status.HTTP_400_BAD_REQUEST
                 )
-            invite_successful_msg = {
-                "message": "The user has been invited if they are registered on thingbooker"
-            }
 
             invited_user: ThingbookerUser = ThingbookerUser.objects.get_or_none(username=email)
             if not invited_user:
                 # give a generic response so that a user cannot spam the endpoint to check
                 # which users exists
-                return Response(invite_successful_msg, status=status.HTTP_200_OK)
+                return Response(
+                    {"message": self.get_invite_message(GroupMemberStatusEnum.NOT_MEMBER)},
+                    status=status.HTTP_200_OK,
+                )
 
             result = ThingbookerGroupInterface.invite_user_to_group(invited_user, group, user)
-            if result == GroupMemberStatusEnum.MEMBER:
-                msg = {"message": "User is already a member of the group"}
-            elif result == GroupMemberStatusEnum.ALREADY_INVITED:
-                msg = {"message": "User is already invited to the group"}
-            else:
-                msg = invite_successful_msg
 
-            return Response(msg, status=status.HTTP_200_OK)
+            return Response({"message": self.get_invite_message(result)}, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=["POST"], url_path="invite-members")
+    def invite_members(self, request: ThingbookerRequest, pk: UUID | None = None, format=None):
+        """Invites a list of emails to a group, and returns a message per email."""
+
+        group: ThingbookerGroup = self.get_object()
+        serializer = BulkInviteSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        results = ThingbookerGroupInterface.invite_users_to_group(
+            serializer.validated_data["emails"], group, request.user
+        )
+
+        return Response(
+            {
+                "results": [
+                    {"email": email, "message": self.get_invite_message(result)}
+                    for email, result in results.items()
+                ]
+            },
+            status=status.HTTP_200_OK,
+        )
+
 
 class InviteTokenViewSet(viewsets.ReadOnlyModelViewSet):
     """Provides list and retrieve actions for AcceptInviteToken model."""